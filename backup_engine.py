@@ -0,0 +1,130 @@
+# file: backup_engine.py
+"""
+پشتیبان‌گیری آنلاین از دیتابیس با API پشتیبان SQLite (sqlite3.Connection.backup).
+برخلاف کپی فایل، نسخه پشتیبان همیشه یک تصویر سازگار از دیتابیس است (حتی اگر هم‌زمان
+فاکتوری ثبت شود) و کپی صفحه‌به‌صفحه و در گام‌های کوچک انجام می‌شود؛ بین گام‌ها قفلی
+نگه داشته نمی‌شود و برنامه می‌تواند به نوشتن ادامه دهد. کار روی تردهای کارگر
+دیتابیس (db_worker) اجرا می‌شود و رابط کاربری قفل نمی‌شود.
+"""
+import os
+import sqlite3
+import time
+
+from db_worker import ProgressJob
+
+# تعداد صفحه‌های دیتابیس که در هر گام کپی می‌شوند (با صفحه ۴ کیلوبایتی حدود ۱ مگابایت).
+BACKUP_PAGES_PER_STEP = 256
+# مکث کوتاه بین گام‌ها تا دیسک و قفل‌ها برای ثبت فاکتور آزاد بمانند (ثانیه).
+BACKUP_STEP_SLEEP = 0.002
+# زمان انتظار برای قفل دیتابیس هنگام شروع پشتیبان‌گیری (ثانیه).
+BACKUP_BUSY_TIMEOUT = 30
+
+
+class BackupError(Exception):
+    pass
+
+
+class BackupCancelled(Exception):
+    pass
+
+
+def check_database_integrity(db_path, quick=False):
+    """
+    PRAGMA integrity_check (یا quick_check) را روی فایل اجرا می‌کند. لیست پیام‌های
+    خطا را برمی‌گرداند که برای فایل سالم خالی است.
+    """
+    pragma = "quick_check" if quick else "integrity_check"
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute(f"PRAGMA {pragma}").fetchall()
+    finally:
+        conn.close()
+    messages = [row[0] for row in rows]
+    return [] if messages == ["ok"] else messages
+
+
+def backup_database(
+    source_path,
+    target_path,
+    progress=None,
+    is_cancelled=None,
+    pages_per_step=BACKUP_PAGES_PER_STEP,
+    step_sleep=BACKUP_STEP_SLEEP,
+):
+    """
+    از دیتابیس source_path یک نسخه پشتیبان در target_path می‌سازد. نسخه ابتدا با
+    پسوند .part نوشته، سپس صحت آن با integrity_check بررسی و در پایان جایگزین مسیر
+    نهایی می‌شود؛ پس فایل پشتیبان ناقص یا خرابی باقی نمی‌ماند.
+    progress(صفحه‌های کپی شده، کل صفحه‌ها) پس از هر گام فراخوانی می‌شود و اگر
+    is_cancelled() درست باشد کار با BackupCancelled متوقف می‌شود.
+    دیکشنری path، pages، size و seconds را برمی‌گرداند.
+    """
+    started = time.monotonic()
+    temp_path = target_path + ".part"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    source = sqlite3.connect(
+        source_path, timeout=BACKUP_BUSY_TIMEOUT, isolation_level=None
+    )
+    target = None
+    try:
+        source.execute("PRAGMA query_only = ON")
+        # در حالت WAL یک تراکنش خواندن باز، تصویر ثابتی از دیتابیس نگه می‌دارد:
+        # نوشتن‌های هم‌زمان در فایل WAL ادامه پیدا می‌کنند و کپی لازم نیست با هر
+        # commit از ابتدا شروع شود.
+        source.execute("BEGIN")
+        source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        target = sqlite3.connect(temp_path)
+
+        def on_step(status, remaining, total):
+            if is_cancelled is not None and is_cancelled():
+                # استثنای داخل progress، backup را متوقف کرده و به بیرون می‌رسد.
+                raise BackupCancelled()
+            if progress is not None:
+                progress(total - remaining, total)
+            if remaining and step_sleep:
+                time.sleep(step_sleep)
+
+        source.backup(target, pages=pages_per_step, progress=on_step)
+        source.execute("ROLLBACK")
+
+        # نسخه پشتیبان یک فایل مستقل و بدون فایل‌های -wal و -shm است.
+        target.execute("PRAGMA journal_mode = DELETE").fetchone()
+        page_count = target.execute("PRAGMA page_count").fetchone()[0]
+        problems = [row[0] for row in target.execute("PRAGMA integrity_check")]
+        target.close()
+        target = None
+        if problems != ["ok"]:
+            raise BackupError(
+                "بررسی صحت نسخه پشتیبان ناموفق بود:\n" + "\n".join(problems[:10])
+            )
+        os.replace(temp_path, target_path)
+    except BaseException:
+        if target is not None:
+            target.close()
+            target = None
+        for path in (temp_path, temp_path + "-journal"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        raise
+    finally:
+        source.close()
+
+    return {
+        "path": target_path,
+        "pages": page_count,
+        "size": os.path.getsize(target_path),
+        "seconds": time.monotonic() - started,
+    }
+
+
+class DatabaseBackup(ProgressJob):
+    """
+    backup_database را روی ترد کارگر اجرا می‌کند؛ finished دیکشنری نتیجه را می‌دهد.
+    """
+
+    def start(self, target_path):
+        self.run(backup_database, self.db_manager.db_name, target_path)
@@ -0,0 +1,457 @@
+# file: backup_scheduler.py
+"""
+پشتیبان‌گیری خودکار در پس‌زمینه. هر چند ساعت یک بار (وقتی مدتی اطلاعاتی ثبت نشده
+باشد) و در صورت تمایل هنگام بستن برنامه، یک تصویر سازگار از دیتابیس با backup_engine
+گرفته شده و به صورت استریمی با gzip فشرده در پوشه پشتیبان‌ها ذخیره می‌شود. کنار هر
+فایل یک فایل .sha256 (قالب sha256sum) نوشته می‌شود و نسخه‌های قدیمی طبق سیاست نگهداری
+(آخرین K نسخه روزانه، هفتگی و ماهانه) حذف می‌شوند.
+
+کار روی ترد پس‌زمینه جداگانه (نه تردهای کارگر صفحه‌ها)، با کمترین اولویت ترد و با
+مکث بین گام‌ها اجرا می‌شود تا با ثبت فاکتور رقابت نکند.
+"""
+import datetime
+import gzip
+import hashlib
+import os
+import re
+import time
+
+import jdatetime
+from PySide6.QtCore import QEventLoop, QObject, QSettings, Qt, QThread, QTimer
+from PySide6.QtWidgets import QProgressDialog
+
+from backup_engine import (
+    BACKUP_PAGES_PER_STEP,
+    BACKUP_STEP_SLEEP,
+    BackupCancelled,
+    backup_database,
+)
+from db_worker import ProgressJob, get_background_thread_pool
+from signal_bus import signal_bus
+from utils import get_app_data_path
+
+ARCHIVE_PREFIX = "hesabyar_"
+ARCHIVE_SUFFIX = ".db.gz"
+CHECKSUM_SUFFIX = ".sha256"
+ARCHIVE_NAME_RE = re.compile(r"^hesabyar_(\d{8}-\d{6})\.db\.gz$")
+ARCHIVE_TIME_FORMAT = "%Y%m%d-%H%M%S"
+SHA256_HEX_RE = re.compile(r"^[0-9a-f]{64}$")
+
+COMPRESS_CHUNK_SIZE = 1024 * 1024
+COMPRESS_LEVEL = 6
+# پشتیبان‌گیری زمان‌بندی شده آرام‌تر از پشتیبان‌گیری دستی پیش می‌رود.
+SCHEDULED_PAGES_PER_STEP = 64
+SCHEDULED_STEP_SLEEP = 0.01
+COMPRESS_CHUNK_SLEEP = 0.005
+
+# فاصله بررسی زمان‌بندی و مدت بی‌کاری لازم پیش از شروع پشتیبان‌گیری (ثانیه).
+SCHEDULER_TICK_MS = 60 * 1000
+IDLE_SECONDS = 5 * 60
+
+SETTINGS_GROUP = "backup"
+DEFAULT_SCHEDULE = {
+    "enabled": False,
+    "interval_hours": 6,
+    "on_exit": False,
+    "folder": "",
+    "keep_daily": 7,
+    "keep_weekly": 4,
+    "keep_monthly": 6,
+}
+
+
+def default_backup_folder():
+    return get_app_data_path("backups")
+
+
+def load_backup_schedule():
+    """تنظیمات پشتیبان‌گیری خودکار از QSettings (گروه backup)."""
+    settings = QSettings("MySoft", "HesabYar")
+    settings.beginGroup(SETTINGS_GROUP)
+    schedule = {
+        key: settings.value(key, default, type=type(default))
+        for key, default in DEFAULT_SCHEDULE.items()
+    }
+    last_run = settings.value("last_run", "")
+    settings.endGroup()
+    schedule["folder"] = schedule["folder"] or default_backup_folder()
+    schedule["last_run"] = (
+        datetime.datetime.fromisoformat(last_run) if last_run else None
+    )
+    return schedule
+
+
+def save_backup_schedule(schedule):
+    settings = QSettings("MySoft", "HesabYar")
+    settings.beginGroup(SETTINGS_GROUP)
+    for key in DEFAULT_SCHEDULE:
+        settings.setValue(key, schedule[key])
+    settings.endGroup()
+
+
+def _save_last_run(when):
+    QSettings("MySoft", "HesabYar").setValue(
+        f"{SETTINGS_GROUP}/last_run", when.isoformat(timespec="seconds")
+    )
+
+
+def list_archives(folder):
+    """لیست (زمان، مسیر) فایل‌های پشتیبان فشرده پوشه، از جدید به قدیم."""
+    if not os.path.isdir(folder):
+        return []
+    archives = []
+    for name in os.listdir(folder):
+        match = ARCHIVE_NAME_RE.match(name)
+        if match:
+            created = datetime.datetime.strptime(match.group(1), ARCHIVE_TIME_FORMAT)
+            archives.append((created, os.path.join(folder, name)))
+    archives.sort(reverse=True)
+    return archives
+
+
+def _week_key(moment):
+    # هفته از شنبه شروع می‌شود.
+    return moment.date() - datetime.timedelta(days=(moment.weekday() + 2) % 7)
+
+
+def _month_key(moment):
+    date = jdatetime.date.fromgregorian(date=moment.date())
+    return date.year, date.month
+
+
+def archives_to_keep(timestamps, keep_daily, keep_weekly, keep_monthly):
+    """
+    سیاست نگهداری: جدیدترین نسخه هر کدام از K روز، K هفته و K ماه (شمسی) اخیر که
+    نسخه‌ای دارند نگه داشته می‌شود. جدیدترین نسخه هرگز حذف نمی‌شود.
+    """
+    ordered = sorted(timestamps, reverse=True)
+    keep = set(ordered[:1])
+    for key, count in (
+        (datetime.datetime.date, keep_daily),
+        (_week_key, keep_weekly),
+        (_month_key, keep_monthly),
+    ):
+        periods = set()
+        for moment in ordered:
+            period = key(moment)
+            if period in periods:
+                continue
+            if len(periods) >= count:
+                break
+            periods.add(period)
+            keep.add(moment)
+    return keep
+
+
+def apply_retention(folder, keep_daily, keep_weekly, keep_monthly):
+    """نسخه‌های خارج از سیاست نگهداری را همراه فایل checksum حذف می‌کند."""
+    archives = list_archives(folder)
+    keep = archives_to_keep(
+        [created for created, _ in archives], keep_daily, keep_weekly, keep_monthly
+    )
+    removed = []
+    for created, path in archives:
+        if created in keep:
+            continue
+        for file_path in (path, path + CHECKSUM_SUFFIX):
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+        removed.append(path)
+    return removed
+
+
+def write_compressed_backup(
+    db_path,
+    folder,
+    keep_daily,
+    keep_weekly,
+    keep_monthly,
+    low_priority=True,
+    progress=None,
+    is_cancelled=None,
+):
+    """
+    یک نسخه فشرده از دیتابیس در folder می‌سازد، فایل checksum آن را می‌نویسد و سیاست
+    نگهداری را اعمال می‌کند. با low_priority کار با کمترین اولویت ترد و با مکث بین
+    گام‌ها اجرا می‌شود. دیکشنری path، size، removed و seconds را برمی‌گرداند.
+    """
+    started = time.monotonic()
+    os.makedirs(folder, exist_ok=True)
+    thread = QThread.currentThread()
+    previous_priority = thread.priority()
+    if previous_priority == QThread.Priority.InheritPriority:
+        previous_priority = QThread.Priority.NormalPriority
+    if low_priority:
+        # نسخه خروج با اولویت عادی روی همین ترد اجرا می‌شود؛ اولویت پس از پایان کار
+        # برگردانده می‌شود.
+        thread.setPriority(QThread.Priority.LowestPriority)
+        pages_per_step, step_sleep = SCHEDULED_PAGES_PER_STEP, SCHEDULED_STEP_SLEEP
+    else:
+        pages_per_step, step_sleep = BACKUP_PAGES_PER_STEP, BACKUP_STEP_SLEEP
+    now = datetime.datetime.now()
+    name = f"{ARCHIVE_PREFIX}{now.strftime(ARCHIVE_TIME_FORMAT)}{ARCHIVE_SUFFIX}"
+    archive_path = os.path.join(folder, name)
+    staging_path = os.path.join(folder, f".{name}.staging.db")
+    temp_path = archive_path + ".part"
+    replaced = False
+    try:
+        pages = backup_database(
+            db_path,
+            staging_path,
+            progress=(
+                (lambda done, total: progress(done, total * 2)) if progress else None
+            ),
+            is_cancelled=is_cancelled,
+            pages_per_step=pages_per_step,
+            step_sleep=step_sleep,
+        )["pages"]
+
+        # پیشرفت فشرده‌سازی هم بر حسب صفحه گزارش می‌شود (بایت‌ها در int سیگنال جا نمی‌شوند).
+        total = max(os.path.getsize(staging_path), 1)
+        done = 0
+        digest = hashlib.sha256()
+        with open(staging_path, "rb") as source, open(temp_path, "wb") as raw:
+            # hash روی بایت‌های فشرده محاسبه می‌شود تا با sha256sum فایل قابل بررسی باشد.
+            hashing = _HashingWriter(raw, digest)
+            with gzip.GzipFile(
+                filename=os.path.basename(db_path),
+                mode="wb",
+                compresslevel=COMPRESS_LEVEL,
+                fileobj=hashing,
+                mtime=int(now.timestamp()),
+            ) as archive:
+                while True:
+                    if is_cancelled is not None and is_cancelled():
+                        raise BackupCancelled()
+                    chunk = source.read(COMPRESS_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    archive.write(chunk)
+                    done += len(chunk)
+                    if progress is not None:
+                        progress(pages + pages * done // total, pages * 2)
+                    if low_priority:
+                        time.sleep(COMPRESS_CHUNK_SLEEP)
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(temp_path, archive_path)
+        replaced = True
+        with open(archive_path + CHECKSUM_SUFFIX, "w", encoding="utf-8") as f:
+            f.write(f"{digest.hexdigest()}  {name}\n")
+    except BaseException:
+        # نسخه هم‌نامی که پیش‌تر (در همان ثانیه) ساخته شده، فقط وقتی حذف می‌شود که
+        # این کار آن را جایگزین کرده باشد.
+        written = [temp_path]
+        if replaced:
+            written += [archive_path, archive_path + CHECKSUM_SUFFIX]
+        for path in written:
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    finally:
+        if os.path.exists(staging_path):
+            os.remove(staging_path)
+        if low_priority:
+            thread.setPriority(previous_priority)
+
+    _save_last_run(now)
+    removed = apply_retention(folder, keep_daily, keep_weekly, keep_monthly)
+    return {
+        "path": archive_path,
+        "size": os.path.getsize(archive_path),
+        "removed": removed,
+        "seconds": time.monotonic() - started,
+    }
+
+
+class _HashingWriter:
+    """خروجی gzip را هم‌زمان در فایل می‌نویسد و در hash وارد می‌کند."""
+
+    def __init__(self, raw, digest):
+        self.raw = raw
+        self.digest = digest
+
+    def write(self, data):
+        self.digest.update(data)
+        return self.raw.write(data)
+
+    def flush(self):
+        self.raw.flush()
+
+
+def verify_archive_checksum(archive_path):
+    """
+    درست بودن فایل .sha256 کنار نسخه فشرده؛ None اگر فایل checksum وجود نداشته باشد.
+    فایل checksum خالی، ناقص یا نامعتبر هم عدم تطابق (False) حساب می‌شود.
+    """
+    checksum_path = archive_path + CHECKSUM_SUFFIX
+    if not os.path.exists(checksum_path):
+        return None
+    try:
+        with open(checksum_path, encoding="utf-8") as f:
+            fields = f.read().split()
+    except (OSError, UnicodeDecodeError):
+        return False
+    expected = fields[0].lower() if fields else ""
+    if not SHA256_HEX_RE.match(expected):
+        return False
+    digest = hashlib.sha256()
+    with open(archive_path, "rb") as f:
+        for chunk in iter(lambda: f.read(COMPRESS_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest() == expected
+
+
+class BackupScheduler(QObject):
+    """
+    زمان‌بندی پشتیبان‌گیری خودکار. هر دقیقه بررسی می‌کند که فاصله تعیین شده از آخرین
+    نسخه گذشته و برنامه بی‌کار باشد (IDLE_SECONDS ثانیه اطلاعاتی ثبت نشده باشد). اگر
+    دو برابر فاصله تعیین شده گذشته باشد، منتظر بی‌کاری نمی‌ماند. نتیجه با سیگنال
+    signal_bus.backup_completed اعلام می‌شود.
+    """
+
+    def __init__(self, db_manager, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.job = ProgressJob(db_manager, self, get_background_thread_pool)
+        self.job.finished.connect(self._on_finished)
+        self.job.failed.connect(self._on_failed)
+        self._last_activity = time.monotonic()
+        # زمان آخرین ثبت اطلاعات در این اجرای برنامه (برای نسخه هنگام خروج).
+        self._last_change = None
+        for signal in (
+            signal_bus.invoice_saved,
+            signal_bus.expense_saved,
+            signal_bus.product_saved,
+            signal_bus.customer_saved,
+            signal_bus.supplier_saved,
+            signal_bus.purchase_invoice_saved,
+        ):
+            signal.connect(self._record_activity)
+        signal_bus.backup_requested.connect(self.run_now)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(SCHEDULER_TICK_MS)
+        self.timer.timeout.connect(self.check_schedule)
+
+    def start(self):
+        self.timer.start()
+
+    def _record_activity(self, *args):
+        self._last_activity = time.monotonic()
+        self._last_change = datetime.datetime.now()
+
+    def is_running(self):
+        return self.job.is_running()
+
+    def is_due(self, schedule, now=None):
+        if not schedule["enabled"] or schedule["interval_hours"] <= 0:
+            return False
+        if schedule["last_run"] is None:
+            return True
+        now = now or datetime.datetime.now()
+        elapsed = now - schedule["last_run"]
+        interval = datetime.timedelta(hours=schedule["interval_hours"])
+        if elapsed >= interval * 2:
+            return True
+        idle = time.monotonic() - self._last_activity >= IDLE_SECONDS
+        return elapsed >= interval and idle
+
+    def check_schedule(self):
+        if self.is_running():
+            return
+        schedule = load_backup_schedule()
+        if self.is_due(schedule):
+            self._start(schedule)
+
+    def run_now(self):
+        if not self.is_running():
+            self._start(load_backup_schedule())
+
+    def has_current_archive(self, schedule, now=None):
+        """
+        آیا جدیدترین نسخه فشرده هنوز کافی است: در فاصله تعیین شده گرفته شده و از
+        آن زمان اطلاعاتی در این اجرای برنامه ثبت نشده است.
+        """
+        archives = list_archives(schedule["folder"])
+        if not archives:
+            return False
+        created = archives[0][0]
+        now = now or datetime.datetime.now()
+        if now - created >= datetime.timedelta(hours=schedule["interval_hours"]):
+            return False
+        return self._last_change is None or self._last_change < created
+
+    def _start(self, schedule, low_priority=True):
+        self.job.run(
+            write_compressed_backup,
+            self.db_manager.db_name,
+            schedule["folder"],
+            schedule["keep_daily"],
+            schedule["keep_weekly"],
+            schedule["keep_monthly"],
+            low_priority=low_priority,
+        )
+        signal_bus.backup_started.emit()
+
+    def _on_finished(self, result):
+        signal_bus.backup_completed.emit(result["path"])
+
+    def _on_failed(self, message):
+        print(f"Scheduled backup failed: {message}")
+        signal_bus.backup_failed.emit(message)
+
+    def shutdown(self):
+        """
+        هنگام بستن برنامه (پیش از توقف تردهای کارگر) فراخوانی می‌شود. اگر گزینه «هنگام
+        خروج» فعال باشد و نسخه فعلی کافی نباشد، یک نسخه (یا ادامه نسخه در حال اجرا)
+        با پنجره پیشرفت و امکان لغو گرفته می‌شود؛ در غیر این صورت پشتیبان‌گیری در حال
+        اجرا لغو می‌شود. فایل‌های نیمه‌کاره نسخه لغو شده را خود کار پیش از توقف ترد
+        پس‌زمینه پاک می‌کند.
+        """
+        self.timer.stop()
+        schedule = load_backup_schedule()
+        if not (schedule["enabled"] and schedule["on_exit"]) or (
+            not self.is_running() and self.has_current_archive(schedule)
+        ):
+            self.job.cancel()
+            return
+        if not self.is_running():
+            self._start(schedule, low_priority=False)
+        self._wait_with_progress()
+
+    def _wait_with_progress(self):
+        """تا پایان، خطا یا لغو نسخه در حال اجرا یک پنجره پیشرفت نمایش می‌دهد."""
+        dialog = QProgressDialog("در حال پشتیبان‌گیری پیش از خروج...", "لغو", 0, 0)
+        dialog.setWindowTitle("پشتیبان‌گیری خودکار")
+        dialog.setWindowModality(Qt.WindowModality.ApplicationModal)
+        dialog.setMinimumDuration(0)
+        dialog.setAutoClose(False)
+        dialog.setAutoReset(False)
+
+        def show_progress(done, total):
+            dialog.setMaximum(total)
+            dialog.setValue(done)
+
+        loop = QEventLoop()
+        connections = [
+            (self.job.progress, show_progress),
+            (self.job.finished, loop.quit),
+            (self.job.failed, loop.quit),
+            (self.job.cancelled, loop.quit),
+            (dialog.canceled, self.job.cancel),
+        ]
+        for signal, slot in connections:
+            signal.connect(slot)
+        dialog.show()
+        try:
+            # نتیجه کار با سیگنال صف‌شده می‌رسد؛ پس اگر هنوز در حال اجراست، حلقه آن را
+            # از دست نمی‌دهد.
+            if self.is_running():
+                loop.exec()
+        finally:
+            for signal, slot in connections:
+                signal.disconnect(slot)
+            dialog.close()
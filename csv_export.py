@@ -0,0 +1,94 @@
+# file: csv_export.py
+"""
+خروجی CSV استریمی جدول‌ها. ردیف‌ها تکه‌تکه (DatabaseManager.iter_export_rows) از SQLite
+خوانده و با یک بافر بزرگ نوشته می‌شوند، پس حافظه مصرفی برای جدول‌های چند میلیون
+ردیفی هم ثابت می‌ماند. کار روی تردهای کارگر دیتابیس (db_worker) اجرا می‌شود و چند
+جدول را در یک نوبت خروجی می‌گیرد.
+"""
+import csv
+import os
+import time
+
+from db_worker import ProgressJob
+
+# اندازه بافر نوشتن فایل؛ نوشتن روی دیسک در تکه‌های بزرگ انجام می‌شود.
+WRITE_BUFFER_SIZE = 1024 * 1024
+# حداقل فاصله دو گزارش پیشرفت (ثانیه).
+PROGRESS_INTERVAL = 0.1
+
+# عنوان فارسی جدول‌های قابل خروجی (کلیدهای EXPORT_QUERIES در db_manager).
+EXPORT_TABLE_TITLES = {
+    "customers": "مشتریان",
+    "products": "کالاها",
+    "invoices": "فاکتورها",
+    "invoice_items": "اقلام_فاکتورها",
+    "expenses": "هزینه‌ها",
+}
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def export_tables_to_csv(db_manager, jobs, progress=None, is_cancelled=None):
+    """
+    jobs لیست (جدول، مسیر فایل) است. هر فایل ابتدا با پسوند .part نوشته و پس از
+    کامل شدن جایگزین مسیر نهایی می‌شود تا خروجی نیمه‌کاره‌ای باقی نماند.
+    progress(ردیف‌های نوشته شده، کل ردیف‌ها) گاه‌به‌گاه فراخوانی می‌شود و اگر
+    is_cancelled() درست باشد کار با ExportCancelled متوقف می‌شود.
+    لیست (جدول، مسیر فایل، تعداد ردیف) فایل‌های ساخته شده را برمی‌گرداند.
+    """
+    total = sum(db_manager.count_export_rows(table) for table, _ in jobs)
+    done, last_report = 0, 0.0
+    results = []
+    if progress is not None:
+        progress(0, total)
+
+    for table, file_path in jobs:
+        temp_path = file_path + ".part"
+        rows_written = 0
+        try:
+            with open(
+                temp_path,
+                "w",
+                newline="",
+                encoding="utf-8-sig",
+                buffering=WRITE_BUFFER_SIZE,
+            ) as csv_file:
+                writer = csv.writer(csv_file)
+                headers, chunks = db_manager.iter_export_rows(table)
+                writer.writerow(headers)
+                for rows in chunks:
+                    if is_cancelled is not None and is_cancelled():
+                        chunks.close()
+                        raise ExportCancelled()
+                    # csv.writer مقدار None را خودش به رشته خالی تبدیل می‌کند.
+                    writer.writerows(rows)
+                    rows_written += len(rows)
+                    done += len(rows)
+                    now = time.monotonic()
+                    if progress is not None and now - last_report >= PROGRESS_INTERVAL:
+                        last_report = now
+                        progress(done, total)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        results.append((table, file_path, rows_written))
+
+    if progress is not None:
+        progress(done, total)
+    return results
+
+
+class CsvExporter(ProgressJob):
+    """
+    export_tables_to_csv را روی ترد کارگر اجرا می‌کند؛ finished لیست نتایج
+    (جدول، مسیر فایل، تعداد ردیف) را می‌دهد.
+    """
+
+    def start(self, jobs):
+        self.run(export_tables_to_csv, self.db_manager, jobs)
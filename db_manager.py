@@ -1,20 +1,162 @@
 # file: db_manager.py
+import re
 import sqlite3
 import json
 import traceback
 import jdatetime
 from auth_utils import hash_password, check_password
-from utils import get_app_data_path
+from db_pool import get_pool
+from money import Money
+from utils import get_app_data_path, date_key, normalize_search_text, to_latin_digits
+
+# وضعیت‌های فاکتور باز؛ مقادیر انگلیسی مربوط به داده‌های نسخه‌های قدیمی هستند.
+OPEN_INVOICE_STATUSES = ("پرداخت نشده", "کسری", "Unpaid", "Partially Paid")
+OPEN_STATUSES_SQL = ", ".join(f"'{status}'" for status in OPEN_INVOICE_STATUSES)
+
+# حداکثر تعداد نتایج هر جستجو؛ نتایج بر اساس رتبه bm25 مرتب می‌شوند.
+SEARCH_RESULT_LIMIT = 200
+# تعداد پیش‌فرض ردیف‌های هر صفحه در متدهای get_*_page.
+PAGE_SIZE = 100
+# تعداد ردیف‌های هر تکه در خروجی‌های استریمی (iter_export_rows).
+EXPORT_CHUNK_SIZE = 1000
+
+# کوئری خروجی CSV هر جدول، با همان ستون‌ها و ترتیب لیست‌های get_all_*.
+EXPORT_QUERIES = {
+    "customers": "SELECT * FROM customers ORDER BY name",
+    "products": "SELECT * FROM products ORDER BY name",
+    "invoices": """
+        SELECT inv.*, cust.name as customer_name
+        FROM invoices inv
+        JOIN customers cust ON inv.customer_id = cust.id
+        ORDER BY inv.status_rank DESC, inv.list_date_key DESC, inv.id DESC
+    """,
+    "invoice_items": "SELECT * FROM invoice_items ORDER BY invoice_id",
+    "expenses": """
+        SELECT exp.*, acc.name as account_name
+        FROM expenses exp
+        LEFT JOIN accounts acc ON exp.account_id = acc.id
+        ORDER BY exp.expense_date_key DESC
+    """,
+}
 
 
 class DatabaseManager:
-    def __init__(self, db_name=get_app_data_path("accounting.db")):
+    def __init__(self, db_name=get_app_data_path("accounting.db"), pragmas=None):
         self.db_name = db_name
+        self._pool = get_pool(db_name, pragmas=pragmas)
 
     def _get_connection(self):
-        conn = sqlite3.connect(self.db_name)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """
+        اتصال ماندگار ترد فعلی را از استخر اتصال برمی‌گرداند؛ db_worker نیز از آن برای
+        لغو کوئری در حال اجرا استفاده می‌کند.
+        """
+        return self._pool.connection()
+
+    def close(self):
+        """تمام اتصال‌های باز به این دیتابیس را می‌بندد."""
+        self._pool.close_all()
+
+    @staticmethod
+    def _date_range_keys(start_date, end_date):
+        """بازه تاریخ متنی را به بازه کلید عددی yyyymmdd تبدیل می‌کند."""
+        start_key, end_key = date_key(start_date), date_key(end_date)
+        if start_key is None or end_key is None:
+            raise ValueError(f"بازه تاریخ نامعتبر است: {start_date} تا {end_date}")
+        return start_key, end_key
+
+    def count_export_rows(self, table):
+        """تعداد ردیف‌های خروجی یکی از جدول‌های EXPORT_QUERIES (برای نمایش پیشرفت)."""
+        with self._get_connection() as conn:
+            return conn.execute(
+                f"SELECT COUNT(*) FROM ({EXPORT_QUERIES[table]})"
+            ).fetchone()[0]
+
+    def iter_export_rows(self, table, chunk_size=EXPORT_CHUNK_SIZE):
+        """
+        کوئری خروجی یکی از جدول‌های EXPORT_QUERIES را اجرا کرده و (نام ستون‌ها، مولد
+        تکه‌های ردیف) را برمی‌گرداند. ردیف‌ها با fetchmany تکه‌تکه از SQLite خوانده
+        می‌شوند، پس حافظه مصرفی به اندازه جدول بستگی ندارد. مولد باید روی همان ترد
+        فراخوانی خوانده شود.
+        """
+        cursor = self._get_connection().execute(EXPORT_QUERIES[table])
+        headers = [column[0] for column in cursor.description]
+
+        def chunks():
+            try:
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        return
+                    yield rows
+            finally:
+                cursor.close()
+
+        return headers, chunks()
+
+    @staticmethod
+    def _fts_query(search_term):
+        """
+        عبارت جستجوی کاربر را به کوئری MATCH تبدیل می‌کند: هر کلمه (پس از یکسان‌سازی)
+        به عنوان پیشوند جستجو می‌شود و همه کلمات باید وجود داشته باشند.
+        برای عبارت بدون کلمه None برمی‌گرداند.
+        """
+        words = re.findall(r"\w+", normalize_search_text(search_term))
+        if not words:
+            return None
+        return " ".join(f'"{word}"*' for word in words)
+
+    @staticmethod
+    def _encode_cursor(values):
+        """مقادیر مرتب‌سازی آخرین ردیف صفحه را به توکن ادامه تبدیل می‌کند."""
+        return json.dumps(list(values), ensure_ascii=False, separators=(",", ":"))
+
+    @staticmethod
+    def _decode_cursor(cursor, size):
+        try:
+            values = json.loads(cursor)
+        except (TypeError, ValueError):
+            values = None
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError(f"توکن صفحه‌بندی نامعتبر است: {cursor!r}")
+        return values
+
+    def _keyset_page(
+        self, select_sql, sort_columns, descending, filters, cursor, page_size
+    ):
+        """
+        یک صفحه از نتیجه select_sql (بدون WHERE و ORDER BY) را با صفحه‌بندی keyset
+        برمی‌گرداند. sort_columns ستون‌های مرتب‌سازی هستند که آخرینشان id است و
+        ایندکسی با همین ترتیب دارند؛ filters لیست (ستون، مقدار) شرط‌های تساوی است و
+        مقدار None نادیده گرفته می‌شود. هزینه هر صفحه به شماره صفحه بستگی ندارد.
+        خروجی: (ردیف‌ها، توکن صفحه بعد یا None)
+        """
+        conditions, params = [], []
+        for column, value in filters:
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if cursor is not None:
+            params.extend(self._decode_cursor(cursor, len(sort_columns)))
+            placeholders = ", ".join("?" * len(sort_columns))
+            operator = "<" if descending else ">"
+            conditions.append(
+                f"({', '.join(sort_columns)}) {operator} ({placeholders})"
+            )
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        direction = " DESC" if descending else ""
+        order = ", ".join(f"{column}{direction}" for column in sort_columns)
+        query = f"{select_sql} {where} ORDER BY {order} LIMIT ?"
+        params.append(page_size + 1)
+
+        with self._get_connection() as conn:
+            rows = conn.cursor().execute(query, params).fetchall()
+        if len(rows) <= page_size:
+            return rows, None
+        rows = rows[:page_size]
+        last = rows[-1]
+        return rows, self._encode_cursor(
+            last[column.split(".")[-1]] for column in sort_columns
+        )
 
     def add_user(self, username, email, password, secret_question, secret_answer):
         """کاربر جدید را به همراه سوال و پاسخ امنیتی به دیتابیس اضافه می‌کند."""
@@ -147,7 +289,6 @@ class DatabaseManager:
     def delete_customer(self, customer_id):
         try:
             with self._get_connection() as conn:
-                conn.execute("PRAGMA foreign_keys = ON;")
                 conn.cursor().execute(
                     "DELETE FROM customers WHERE id=?", (customer_id,)
                 )
@@ -161,14 +302,22 @@ class DatabaseManager:
         except Exception as e:
             return False, f"خطا در حذف: {e}"
 
-    def search_customers(self, search_term):
+    def search_customers(self, search_term, limit=SEARCH_RESULT_LIMIT):
+        """مشتریان را بر اساس نام یا کد ملی جستجو می‌کند."""
+        match = self._fts_query(search_term)
+        if match is None:
+            return []
         with self._get_connection() as conn:
-            term = f"%{search_term}%"
             return (
                 conn.cursor()
                 .execute(
-                    "SELECT * FROM customers WHERE name LIKE ? OR national_id LIKE ?",
-                    (term, term),
+                    """
+                    SELECT c.* FROM customers_fts f
+                    JOIN customers c ON c.id = f.rowid
+                    WHERE customers_fts MATCH ?
+                    ORDER BY f.rank LIMIT ?
+                    """,
+                    (match, limit),
                 )
                 .fetchall()
             )
@@ -246,6 +395,12 @@ class DatabaseManager:
                 .fetchall()
             )
 
+    def get_customers_page(self, cursor=None, page_size=PAGE_SIZE):
+        """یک صفحه از مشتریان به ترتیب نام؛ خروجی (ردیف‌ها، توکن صفحه بعد)."""
+        return self._keyset_page(
+            "SELECT * FROM customers", ["name", "id"], False, [], cursor, page_size
+        )
+
     def check_for_duplicates(self, name, email, phone, customer_id=None):
         with self._get_connection() as conn:
             where_clauses, params = [], []
@@ -266,14 +421,22 @@ class DatabaseManager:
                 params.append(customer_id)
             return conn.cursor().execute(query, tuple(params)).fetchall()
 
-    def search_products(self, search_term):
+    def search_products(self, search_term, limit=SEARCH_RESULT_LIMIT):
+        """کالاها را بر اساس نام یا توضیحات جستجو می‌کند."""
+        match = self._fts_query(search_term)
+        if match is None:
+            return []
         with self._get_connection() as conn:
-            term = f"%{search_term}%"
             return (
                 conn.cursor()
                 .execute(
-                    "SELECT * FROM products WHERE name LIKE ? OR description LIKE ?",
-                    (term, term),
+                    """
+                    SELECT p.* FROM products_fts f
+                    JOIN products p ON p.id = f.rowid
+                    WHERE products_fts MATCH ?
+                    ORDER BY f.rank LIMIT ?
+                    """,
+                    (match, limit),
                 )
                 .fetchall()
             )
@@ -285,7 +448,14 @@ class DatabaseManager:
             with self._get_connection() as conn:
                 conn.cursor().execute(
                     "INSERT INTO products (name, description, unit, unit_price, stock_quantity, account_id) VALUES (?, ?, ?, ?, ?, ?)",
-                    (name, description, unit, unit_price, stock_quantity, account_id),
+                    (
+                        name,
+                        description,
+                        unit,
+                        Money(unit_price),
+                        stock_quantity,
+                        account_id,
+                    ),
                 )
                 conn.commit()
                 return True, "کالا با موفقیت اضافه شد."
@@ -312,7 +482,7 @@ class DatabaseManager:
                         name,
                         description,
                         unit,
-                        unit_price,
+                        Money(unit_price),
                         stock_quantity,
                         account_id,
                         product_id,
@@ -352,6 +522,12 @@ class DatabaseManager:
                 conn.cursor().execute("SELECT * FROM products ORDER BY name").fetchall()
             )
 
+    def get_products_page(self, cursor=None, page_size=PAGE_SIZE):
+        """یک صفحه از کالاها به ترتیب نام؛ خروجی (ردیف‌ها، توکن صفحه بعد)."""
+        return self._keyset_page(
+            "SELECT * FROM products", ["name", "id"], False, [], cursor, page_size
+        )
+
     def get_distinct_units(self):
         with self._get_connection() as conn:
             return [
@@ -470,57 +646,148 @@ class DatabaseManager:
                 .fetchone()
             )
 
-    def search_invoices(self, search_term):
-        """Searches invoices by customer name or invoice ID."""
+    def search_invoices(self, search_term, limit=SEARCH_RESULT_LIMIT):
+        """
+        Searches invoices by invoice ID (exact, e.g. 'INV-0012'), customer name,
+        notes or item descriptions. An exact ID match is ranked first.
+        """
+        id_term = to_latin_digits(search_term).upper().replace("INV-", "").strip()
+        invoice_id = int(id_term) if id_term.isdigit() else None
+        match = self._fts_query(search_term)
+        if match is None:
+            return []
         with self._get_connection() as conn:
-            term = f"%{search_term}%"
-            id_term = search_term.replace("INV-", "").strip()
-
             query = """
+            WITH hits (id, score) AS (
+                SELECT id, -1e9 FROM invoices WHERE id = :invoice_id
+                UNION ALL
+                SELECT rowid, rank FROM invoices_fts WHERE invoices_fts MATCH :match
+                UNION ALL
+                SELECT ii.invoice_id, f.rank FROM invoice_items_fts f
+                JOIN invoice_items ii ON ii.id = f.rowid
+                WHERE invoice_items_fts MATCH :match
+                UNION ALL
+                SELECT inv.id, f.rank FROM customers_fts f
+                JOIN invoices inv ON inv.customer_id = f.rowid
+                WHERE customers_fts MATCH :match
+            )
             SELECT inv.*, cust.name as customer_name
-            FROM invoices inv
+            FROM (SELECT id, MIN(score) AS score FROM hits GROUP BY id) h
+            JOIN invoices inv ON inv.id = h.id
             JOIN customers cust ON inv.customer_id = cust.id
-            WHERE cust.name LIKE ? OR inv.id LIKE ?
-            ORDER BY inv.issue_date DESC
+            ORDER BY h.score, inv.issue_date_key DESC
+            LIMIT :limit
             """
-            return conn.cursor().execute(query, (term, f"%{id_term}%")).fetchall()
+            return (
+                conn.cursor()
+                .execute(
+                    query,
+                    {"invoice_id": invoice_id, "match": match, "limit": limit},
+                )
+                .fetchall()
+            )
 
-    def save_invoice(self, invoice_data, items_data):
-        """فاکتور فروش، اقلام و هزینه تمام شده هر قلم را ذخیره می‌کند."""
+    def save_invoice(self, invoice_data, items_data, cheque_data=None):
+        """
+        فاکتور فروش را به صورت یک واحد کاری و در یک تراکنش ثبت می‌کند: سربرگ فاکتور،
+        اقلام، بهای تمام شده (از میانگین قیمت خرید)، کسر موجودی انبار و چک دریافتی.
+        اقلامی که product_id دارند از انبار کسر می‌شوند. اگر هر مرحله خطا بدهد هیچ
+        بخشی از فاکتور ذخیره نمی‌شود.
+        """
         conn = self._get_connection()
         try:
             cursor = conn.cursor()
-            cursor.execute("BEGIN TRANSACTION;")
+            cursor.execute("BEGIN IMMEDIATE;")
 
             sql = """INSERT INTO invoices (
-                         customer_id, issue_date, total_amount, status, notes, 
+                         customer_id, issue_date, issue_date_key, total_amount, status, notes, 
                          amount_paid, payment_method, payment_date, cheque_number, cheque_due_date
                      ) VALUES (
-                         :customer_id, :issue_date, :total_amount, :status, :notes, 
+                         :customer_id, :issue_date, :issue_date_key, :total_amount, :status, :notes, 
                          :amount_paid, :payment_method, :payment_date, :cheque_number, :cheque_due_date
                      )"""
-            cursor.execute(sql, invoice_data)
+            cursor.execute(
+                sql,
+                dict(
+                    invoice_data,
+                    issue_date_key=date_key(invoice_data["issue_date"]),
+                    total_amount=Money(invoice_data["total_amount"]),
+                    amount_paid=Money(invoice_data["amount_paid"]),
+                ),
+            )
             invoice_id = cursor.lastrowid
 
+            # میانگین قیمت خرید تمام کالاهای فاکتور با یک کوئری خوانده می‌شود.
+            stock_changes = {}
             for item in items_data:
-                extra_costs_json = json.dumps(
-                    item.get("extra_costs", []), ensure_ascii=False
-                )
-                cursor.execute(
-                    """INSERT INTO invoice_items (invoice_id, description, quantity, unit, 
-                                                  unit_price, discount_percent, tax_percent, 
-                                                  extra_costs, cost_of_good_sold)
-                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                if item.get("product_id"):
+                    stock_changes[item["product_id"]] = (
+                        stock_changes.get(item["product_id"], 0) + item["quantity"]
+                    )
+            average_prices = {}
+            if stock_changes:
+                placeholders = ", ".join("?" * len(stock_changes))
+                average_prices = {
+                    row["id"]: row["average_purchase_price"]
+                    for row in cursor.execute(
+                        f"SELECT id, average_purchase_price FROM products WHERE id IN ({placeholders})",
+                        list(stock_changes),
+                    )
+                }
+
+            item_rows = []
+            for item in items_data:
+                product_id = item.get("product_id")
+                if product_id:
+                    cost_of_good_sold = Money(average_prices.get(product_id)).times(
+                        item["quantity"]
+                    )
+                else:
+                    cost_of_good_sold = Money(item.get("cost_of_good_sold"))
+                item_rows.append(
                     (
                         invoice_id,
                         item["description"],
                         item["quantity"],
                         item["unit"],
-                        item["unit_price"],
+                        Money(item["unit_price"]),
                         item["discount_percent"],
                         item["tax_percent"],
-                        extra_costs_json,
-                        item["cost_of_good_sold"],
+                        json.dumps(item.get("extra_costs", []), ensure_ascii=False),
+                        cost_of_good_sold,
+                    )
+                )
+            cursor.executemany(
+                """INSERT INTO invoice_items (invoice_id, description, quantity, unit, 
+                                              unit_price, discount_percent, tax_percent, 
+                                              extra_costs, cost_of_good_sold)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                item_rows,
+            )
+
+            cursor.executemany(
+                "UPDATE products SET stock_quantity = stock_quantity - ? WHERE id = ?",
+                [
+                    (quantity, product_id)
+                    for product_id, quantity in stock_changes.items()
+                ],
+            )
+
+            if cheque_data:
+                cursor.execute(
+                    """
+                    INSERT INTO cheques (type, cheque_number, bank_name, amount, issue_date, 
+                                         due_date, due_date_key, status, description, invoice_id)
+                    VALUES (:type, :cheque_number, :bank_name, :amount, :issue_date, 
+                            :due_date, :due_date_key, :status, :description, :invoice_id)
+                """,
+                    dict(
+                        cheque_data,
+                        amount=Money(cheque_data["amount"]),
+                        due_date_key=date_key(cheque_data["due_date"]),
+                        description=cheque_data.get("description")
+                        or f"مربوط به فاکتور شماره {invoice_id}",
+                        invoice_id=invoice_id,
                     ),
                 )
 
@@ -530,30 +797,39 @@ class DatabaseManager:
             conn.rollback()
             traceback.print_exc()
             return False, f"خطا در صدور فاکتور: {e}", None
-        finally:
-            if conn:
-                conn.close()
 
     def get_all_invoices(self):
         """
         تمام فاکتورها را برمی‌گرداند و بر اساس وضعیت (پرداخت نشده > کسری > پرداخت شده) مرتب می‌کند.
+        ستون محاسباتی status_rank همین ترتیب را دارد و مرتب‌سازی از ایندکس خوانده می‌شود.
         """
         with self._get_connection() as conn:
             query = """
                 SELECT inv.*, cust.name as customer_name 
                 FROM invoices inv 
                 JOIN customers cust ON inv.customer_id = cust.id 
-                ORDER BY 
-                    CASE inv.status 
-                        WHEN 'پرداخت نشده' THEN 1 
-                        WHEN 'کسری' THEN 2 
-                        WHEN 'پرداخت شده' THEN 3 
-                        ELSE 4 
-                    END, 
-                    inv.issue_date DESC
+                ORDER BY inv.status_rank DESC, inv.list_date_key DESC, inv.id DESC
             """
             return conn.cursor().execute(query).fetchall()
 
+    def get_invoices_page(self, cursor=None, page_size=PAGE_SIZE, customer_id=None):
+        """
+        یک صفحه از فاکتورها با همان ترتیب get_all_invoices، در صورت نیاز فقط برای یک مشتری.
+        خروجی (ردیف‌ها، توکن صفحه بعد) است.
+        """
+        return self._keyset_page(
+            """
+            SELECT inv.*, cust.name as customer_name
+            FROM invoices inv
+            JOIN customers cust ON inv.customer_id = cust.id
+            """,
+            ["inv.status_rank", "inv.list_date_key", "inv.id"],
+            True,
+            [("inv.customer_id", customer_id)],
+            cursor,
+            page_size,
+        )
+
     def get_invoices_for_customer(self, customer_id):
         """تمام فاکتورهای مربوط به یک مشتری خاص را برمی‌گرداند."""
         with self._get_connection() as conn:
@@ -562,7 +838,7 @@ class DatabaseManager:
                 FROM invoices inv 
                 JOIN customers cust ON inv.customer_id = cust.id 
                 WHERE inv.customer_id = ? 
-                ORDER BY inv.issue_date DESC
+                ORDER BY inv.issue_date_key DESC
             """
             return conn.cursor().execute(query, (customer_id,)).fetchall()
 
@@ -577,25 +853,74 @@ class DatabaseManager:
                 .fetchone()
             )
 
+    @staticmethod
+    def _invoice_item_dict(row):
+        item_dict = dict(row)
+        try:
+            item_dict["extra_costs"] = (
+                json.loads(row["extra_costs"]) if row["extra_costs"] else []
+            )
+        except (json.JSONDecodeError, TypeError):
+            item_dict["extra_costs"] = []
+        return item_dict
+
     def get_invoice_items(self, invoice_id):
         with self._get_connection() as conn:
-            items = []
-            for row in (
-                conn.cursor()
+            return [
+                self._invoice_item_dict(row)
+                for row in conn.cursor()
                 .execute(
                     "SELECT * FROM invoice_items WHERE invoice_id = ?", (invoice_id,)
                 )
                 .fetchall()
-            ):
-                item_dict = dict(row)
-                try:
-                    item_dict["extra_costs"] = (
-                        json.loads(row["extra_costs"]) if row["extra_costs"] else []
-                    )
-                except (json.JSONDecodeError, TypeError):
-                    item_dict["extra_costs"] = []
-                items.append(item_dict)
-            return items
+            ]
+
+    def get_invoices_for_export(
+        self, start_date, end_date, customer_id=None, status=None
+    ):
+        """
+        سربرگ و اقلام تمام فاکتورهای یک بازه تاریخ (در صورت نیاز فقط یک مشتری یا یک
+        وضعیت) را برای خروجی PDF گروهی برمی‌گرداند. به جای دو کوئری برای هر فاکتور،
+        سربرگ‌ها با یک کوئری و اقلام همه فاکتورها با یک کوئری دیگر خوانده می‌شوند.
+        خروجی لیست (جزئیات فاکتور، لیست اقلام) به ترتیب تاریخ صدور است؛ هر دو دیکشنری
+        معمولی هستند تا بتوان آن‌ها را به پردازه‌های دیگر فرستاد.
+        """
+        where = ["inv.issue_date_key BETWEEN ? AND ?"]
+        params = list(self._date_range_keys(start_date, end_date))
+        if customer_id is not None:
+            where.append("inv.customer_id = ?")
+            params.append(customer_id)
+        if status:
+            where.append("inv.status = ?")
+            params.append(status)
+        where_sql = " AND ".join(where)
+
+        with self._get_connection() as conn:
+            headers = conn.execute(
+                f"""
+                SELECT inv.*, cust.name as customer_name, cust.national_id,
+                       cust.economic_code, cust.phone, cust.address, cust.postal_code
+                FROM invoices inv
+                JOIN customers cust ON inv.customer_id = cust.id
+                WHERE {where_sql}
+                ORDER BY inv.issue_date_key, inv.id
+                """,
+                params,
+            ).fetchall()
+            items_by_invoice = {row["id"]: [] for row in headers}
+            if items_by_invoice:
+                for row in conn.execute(
+                    f"""
+                    SELECT * FROM invoice_items
+                    WHERE invoice_id IN (SELECT inv.id FROM invoices inv WHERE {where_sql})
+                    ORDER BY invoice_id, id
+                    """,
+                    params,
+                ):
+                    items = items_by_invoice.get(row["invoice_id"])
+                    if items is not None:
+                        items.append(self._invoice_item_dict(row))
+        return [(dict(row), items_by_invoice[row["id"]]) for row in headers]
 
     def get_all_invoice_items(self):
         with self._get_connection() as conn:
@@ -606,13 +931,22 @@ class DatabaseManager:
                 .fetchall()
             ]
 
+    def get_invoice_items_page(self, cursor=None, page_size=PAGE_SIZE, invoice_id=None):
+        """یک صفحه از اقلام فاکتورها به ترتیب فاکتور؛ خروجی (ردیف‌ها، توکن صفحه بعد)."""
+        return self._keyset_page(
+            "SELECT * FROM invoice_items",
+            ["invoice_id", "id"],
+            False,
+            [("invoice_id", invoice_id)],
+            cursor,
+            page_size,
+        )
+
     def delete_invoice(self, invoice_id):
         """یک فاکتور و تمام اقلام و چک‌های مرتبط با آن را حذف می‌کند."""
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute("PRAGMA foreign_keys = ON;")
-
                 cursor.execute("DELETE FROM cheques WHERE invoice_id=?", (invoice_id,))
 
                 cursor.execute("DELETE FROM invoices WHERE id=?", (invoice_id,))
@@ -637,9 +971,10 @@ class DatabaseManager:
                 if not result:
                     return False, "فاکتوری با این شناسه یافت نشد."
 
-                total_amount = result["total_amount"]
-                current_amount_paid = result["amount_paid"] or 0
-                new_total_paid = current_amount_paid + new_payment_amount
+                total_amount = Money(result["total_amount"])
+                new_total_paid = Money(result["amount_paid"]) + Money(
+                    new_payment_amount
+                )
 
                 if new_total_paid >= total_amount:
                     new_status = "پرداخت شده"
@@ -659,24 +994,46 @@ class DatabaseManager:
             traceback.print_exc()
             return False, f"خطا در ثبت پرداخت: {e}"
 
-    def search_expenses(self, search_term):
+    def search_expenses(self, search_term, limit=SEARCH_RESULT_LIMIT):
+        """هزینه‌ها را بر اساس شرح، دسته‌بندی یا نام حساب جستجو می‌کند."""
+        match = self._fts_query(search_term)
+        if match is None:
+            return []
         with self._get_connection() as conn:
-            term = f"%{search_term}%"
             query = """
-                SELECT exp.*, acc.name as account_name 
-                FROM expenses exp
+                WITH hits (id, score) AS (
+                    SELECT rowid, rank FROM expenses_fts WHERE expenses_fts MATCH :match
+                    UNION ALL
+                    SELECT exp.id, f.rank FROM accounts_fts f
+                    JOIN expenses exp ON exp.account_id = f.rowid
+                    WHERE accounts_fts MATCH :match
+                )
+                SELECT exp.*, acc.name as account_name
+                FROM (SELECT id, MIN(score) AS score FROM hits GROUP BY id) h
+                JOIN expenses exp ON exp.id = h.id
                 LEFT JOIN accounts acc ON exp.account_id = acc.id
-                WHERE exp.description LIKE ? OR acc.name LIKE ?
-                ORDER BY exp.expense_date DESC
+                ORDER BY h.score, exp.expense_date_key DESC
+                LIMIT :limit
             """
-            return conn.cursor().execute(query, (term, term)).fetchall()
+            return (
+                conn.cursor()
+                .execute(query, {"match": match, "limit": limit})
+                .fetchall()
+            )
 
     def add_expense(self, description, amount, expense_date, category, account_id):
         try:
             with self._get_connection() as conn:
                 conn.cursor().execute(
-                    "INSERT INTO expenses (description, amount, expense_date, category, account_id) VALUES (?, ?, ?, ?, ?)",
-                    (description, amount, expense_date, category, account_id),
+                    "INSERT INTO expenses (description, amount, expense_date, expense_date_key, category, account_id) VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        description,
+                        Money(amount),
+                        expense_date,
+                        date_key(expense_date),
+                        category,
+                        account_id,
+                    ),
                 )
                 conn.commit()
                 return True, "هزینه با موفقیت ثبت شد."
@@ -689,10 +1046,25 @@ class DatabaseManager:
                 SELECT exp.*, acc.name as account_name 
                 FROM expenses exp
                 LEFT JOIN accounts acc ON exp.account_id = acc.id
-                ORDER BY exp.expense_date DESC
+                ORDER BY exp.expense_date_key DESC
             """
             return conn.cursor().execute(query).fetchall()
 
+    def get_expenses_page(self, cursor=None, page_size=PAGE_SIZE, account_id=None):
+        """یک صفحه از هزینه‌ها، جدیدترین اول؛ خروجی (ردیف‌ها، توکن صفحه بعد)."""
+        return self._keyset_page(
+            """
+            SELECT exp.*, acc.name as account_name
+            FROM expenses exp
+            LEFT JOIN accounts acc ON exp.account_id = acc.id
+            """,
+            ["exp.list_date_key", "exp.id"],
+            True,
+            [("exp.account_id", account_id)],
+            cursor,
+            page_size,
+        )
+
     def delete_expense(self, expense_id):
         try:
             with self._get_connection() as conn:
@@ -716,11 +1088,12 @@ class DatabaseManager:
         try:
             with self._get_connection() as conn:
                 conn.cursor().execute(
-                    "UPDATE expenses SET description=?, amount=?, expense_date=?, category=?, account_id=? WHERE id=?",
+                    "UPDATE expenses SET description=?, amount=?, expense_date=?, expense_date_key=?, category=?, account_id=? WHERE id=?",
                     (
                         description,
-                        amount,
+                        Money(amount),
                         expense_date,
+                        date_key(expense_date),
                         category,
                         account_id,
                         expense_id,
@@ -733,108 +1106,95 @@ class DatabaseManager:
 
     # --- متدهای گزارش‌گیری (Reporting & Other Methods) ---
     def get_stats_for_dashboard(self):
+        today_key = date_key(jdatetime.date.today())
+        month_key = today_key // 100 * 100
         with self._get_connection() as conn:
-            c = conn.cursor()
-            today_str = jdatetime.date.today().strftime("%Y/%m/%d")
-            c.execute(
-                "SELECT SUM(total_amount) FROM invoices WHERE issue_date = ?",
-                (today_str,),
-            )
-            sales_today = c.fetchone()[0] or 0
-            month_str_like = jdatetime.date.today().strftime("%Y/%m") + "%"
-            c.execute(
-                "SELECT SUM(total_amount) FROM invoices WHERE issue_date LIKE ?",
-                (month_str_like,),
-            )
-            sales_month = c.fetchone()[0] or 0
-            c.execute(
-                "SELECT SUM(total_amount - amount_paid) FROM invoices WHERE status IN ('Unpaid', 'Partially Paid')"
+            row = (
+                conn.cursor()
+                .execute(
+                    """
+                SELECT
+                    (SELECT COALESCE(SUM(revenue), 0) FROM daily_rollup
+                     WHERE day_key = ?) AS sales_today,
+                    (SELECT COALESCE(SUM(revenue), 0) FROM daily_rollup
+                     WHERE day_key BETWEEN ? AND ?) AS sales_month,
+                    (SELECT COALESCE(SUM(receivables), 0) FROM daily_rollup)
+                        AS total_receivables
+                """,
+                    (today_key, month_key + 1, month_key + 31),
+                )
+                .fetchone()
             )
-            total_receivables = c.fetchone()[0] or 0
-            return {
-                "sales_today": sales_today,
-                "sales_month": sales_month,
-                "total_receivables": total_receivables,
-            }
+            return dict(row)
 
     def get_dashboard_kpis(self):
         with self._get_connection() as conn:
-            c = conn.cursor()
-            c.execute("SELECT COUNT(id) FROM invoices")
-            invoice_count = c.fetchone()[0] or 0
-            c.execute("SELECT AVG(total_amount) FROM invoices")
-            avg_invoice_amount = c.fetchone()[0] or 0
+            row = (
+                conn.cursor()
+                .execute(
+                    "SELECT COALESCE(SUM(invoice_count), 0) AS invoice_count, SUM(revenue) AS total_revenue FROM daily_rollup"
+                )
+                .fetchone()
+            )
+            count = row["invoice_count"]
             return {
-                "invoice_count": invoice_count,
-                "avg_invoice_amount": avg_invoice_amount,
+                "invoice_count": count,
+                "avg_invoice_amount": (
+                    Money(row["total_revenue"]).per(count) if count else Money(0)
+                ),
             }
 
     def get_financial_summary(self):
         with self._get_connection() as conn:
-            c = conn.cursor()
-            c.execute("SELECT SUM(amount_paid) FROM invoices")
-            total_income = c.fetchone()[0] or 0
-            c.execute(
-                "SELECT SUM(total_amount - amount_paid) FROM invoices WHERE status IN ('Unpaid', 'Partially Paid')"
+            row = (
+                conn.cursor()
+                .execute(
+                    """
+                SELECT
+                    COALESCE(SUM(collected), 0) AS total_income,
+                    COALESCE(SUM(expenses), 0) AS total_expenses,
+                    COALESCE(SUM(receivables), 0) AS total_receivables
+                FROM daily_rollup
+                """
+                )
+                .fetchone()
             )
-            total_receivables = c.fetchone()[0] or 0
-            c.execute("SELECT SUM(amount) FROM expenses")
-            total_expenses = c.fetchone()[0] or 0
-            return {
-                "total_income": total_income,
-                "total_expenses": total_expenses,
-                "total_receivables": total_receivables,
-            }
+            return dict(row)
 
     def get_recent_open_invoices(self, limit=5):
         """آخرین N فاکتور پرداخت نشده یا دارای کسری را برمی‌گرداند."""
         with self._get_connection() as conn:
-            query = """
-                SELECT id, issue_date, total_amount, customer_id
-                FROM invoices 
-                WHERE status IN ('Unpaid', 'Partially Paid')
-                ORDER BY issue_date DESC
+            query = f"""
+                SELECT inv.id, COALESCE(cust.name, 'حذف شده') AS customer_name,
+                       inv.issue_date, inv.total_amount
+                FROM invoices inv
+                LEFT JOIN customers cust ON cust.id = inv.customer_id
+                WHERE inv.status IN ({OPEN_STATUSES_SQL})
+                ORDER BY inv.issue_date_key DESC
                 LIMIT ?
             """
-            invoices = conn.cursor().execute(query, (limit,)).fetchall()
-
-            results = []
-            for inv in invoices:
-                customer_name = (
-                    conn.cursor()
-                    .execute(
-                        "SELECT name FROM customers WHERE id = ?", (inv["customer_id"],)
-                    )
-                    .fetchone()
-                )
-                results.append(
-                    {
-                        "id": inv["id"],
-                        "customer_name": (
-                            customer_name[0] if customer_name else "حذف شده"
-                        ),
-                        "issue_date": inv["issue_date"],
-                        "total_amount": inv["total_amount"],
-                    }
-                )
-            return results
+            return [dict(row) for row in conn.cursor().execute(query, (limit,))]
 
     def get_sales_last_n_days(self, days=7):
-        """مجموع فروش هر روز را برای N روز گذشته برمی‌گرداند."""
-        sales_data = {}
+        """
+        مجموع فروش هر روز را برای N روز گذشته برمی‌گرداند (روزهای بدون فروش صفر).
+        تمام بازه از ردیف‌های روزانه daily_rollup خوانده می‌شود.
+        """
         today = jdatetime.date.today()
+        first_day = today - jdatetime.timedelta(days=days - 1)
         with self._get_connection() as conn:
-            c = conn.cursor()
-            for i in range(days):
-                day = today - jdatetime.timedelta(days=i)
-                day_str = day.strftime("%Y/%m/%d")
-                c.execute(
-                    "SELECT SUM(total_amount) FROM invoices WHERE issue_date = ?",
-                    (day_str,),
+            totals = {
+                row["day_key"]: row["revenue"]
+                for row in conn.cursor().execute(
+                    "SELECT day_key, revenue FROM daily_rollup WHERE day_key BETWEEN ? AND ?",
+                    (date_key(first_day), date_key(today)),
                 )
-                result = c.fetchone()[0]
-                sales_data[day_str] = result or 0
-        return dict(sorted(sales_data.items()))
+            }
+        sales_data = {}
+        for i in range(days):
+            day = first_day + jdatetime.timedelta(days=i)
+            sales_data[day.strftime("%Y/%m/%d")] = totals.get(date_key(day), 0)
+        return sales_data
 
     def get_expenses_by_category(self):
         """مجموع هزینه‌ها را به تفکیک دسته‌بندی برمی‌گرداند."""
@@ -846,44 +1206,106 @@ class DatabaseManager:
     def get_extended_kpis(self):
         """KPI های بیشتری را برای داشبورد برمی‌گرداند."""
         with self._get_connection() as conn:
-            c = conn.cursor()
-            c.execute("SELECT COUNT(id) FROM customers")
-            customer_count = c.fetchone()[0] or 0
-
-            c.execute("SELECT COUNT(id) FROM products")
-            product_count = c.fetchone()[0] or 0
-
-            c.execute(
-                "SELECT COUNT(id) FROM invoices WHERE status IN ('Unpaid', 'Partially Paid')"
+            row = (
+                conn.cursor()
+                .execute(
+                    f"""
+                SELECT
+                    (SELECT COUNT(id) FROM customers) AS customer_count,
+                    (SELECT COUNT(id) FROM products) AS product_count,
+                    (SELECT COUNT(id) FROM invoices
+                     WHERE status IN ({OPEN_STATUSES_SQL})) AS open_invoices_count
+                """
+                )
+                .fetchone()
             )
-            open_invoices_count = c.fetchone()[0] or 0
+            return dict(row)
 
-            return {
-                "customer_count": customer_count,
-                "product_count": product_count,
-                "open_invoices_count": open_invoices_count,
-            }
+    def get_dashboard_data(
+        self,
+        low_stock_threshold=10,
+        cheques_limit=5,
+        days=None,
+        open_invoices_limit=None,
+    ):
+        """
+        تمام داده‌های داشبورد را با چند کوئری تجمیعی برمی‌گرداند: شاخص‌های امروز، ماه جاری
+        و کل، کالاهای کم‌موجودی و چک‌های در انتظار وصول. مبالغ از جدول تجمیعی
+        daily_rollup خوانده می‌شوند. سری فروش روزانه (daily_sales) و فاکتورهای باز
+        (open_invoices) فقط وقتی days یا open_invoices_limit داده شود محاسبه می‌شوند.
+        """
+        today_key = date_key(jdatetime.date.today())
+        month_key = today_key // 100 * 100
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            kpis = dict(
+                cursor.execute(
+                    f"""
+                SELECT
+                    month.sales_today, month.sales_month, month.expenses_month,
+                    total.invoice_count, total.total_revenue, total.total_income,
+                    total.total_receivables, total.total_expenses,
+                    (SELECT COUNT(id) FROM invoices
+                     WHERE status IN ({OPEN_STATUSES_SQL})) AS open_invoices_count,
+                    (SELECT COUNT(id) FROM customers) AS customer_count,
+                    (SELECT COUNT(id) FROM products) AS product_count
+                FROM (
+                    SELECT
+                        COALESCE(SUM(CASE WHEN day_key = :today
+                                          THEN revenue END), 0) AS sales_today,
+                        COALESCE(SUM(revenue), 0) AS sales_month,
+                        COALESCE(SUM(expenses), 0) AS expenses_month
+                    FROM daily_rollup
+                    WHERE day_key BETWEEN :month_start AND :month_end
+                ) month, (
+                    SELECT COALESCE(SUM(invoice_count), 0) AS invoice_count,
+                           COALESCE(SUM(revenue), 0) AS total_revenue,
+                           COALESCE(SUM(collected), 0) AS total_income,
+                           COALESCE(SUM(receivables), 0) AS total_receivables,
+                           COALESCE(SUM(expenses), 0) AS total_expenses
+                    FROM daily_rollup
+                ) total
+                """,
+                    {
+                        "today": today_key,
+                        "month_start": month_key + 1,
+                        "month_end": month_key + 31,
+                    },
+                ).fetchone()
+            )
+        total_revenue = Money(kpis.pop("total_revenue"))
+        count = kpis["invoice_count"]
+        kpis["avg_invoice_amount"] = total_revenue.per(count) if count else Money(0)
+        kpis["net_profit_month"] = kpis["sales_month"] - kpis["expenses_month"]
+        data = {
+            "kpis": kpis,
+            "low_stock_products": self.get_low_stock_products(low_stock_threshold),
+            "upcoming_cheques": self.get_upcoming_cheques(cheques_limit),
+        }
+        if days is not None:
+            data["daily_sales"] = self.get_sales_last_n_days(days)
+        if open_invoices_limit is not None:
+            data["open_invoices"] = self.get_recent_open_invoices(open_invoices_limit)
+        return data
 
     def get_financial_summary_by_date_range(self, start_date, end_date):
         """
         درآمد، هزینه و سود خالص را برای یک بازه زمانی مشخص محاسبه می‌کند.
         - درآمد: مجموع کل فاکتورهای صادر شده در بازه زمانی (مبنای تعهدی).
         - هزینه: مجموع کل هزینه‌های ثبت شده در بازه زمانی.
+        هر دو از ردیف‌های روزانه daily_rollup جمع زده می‌شوند.
         """
+        date_range = self._date_range_keys(start_date, end_date)
         with self._get_connection() as conn:
             c = conn.cursor()
 
             c.execute(
-                "SELECT SUM(total_amount) FROM invoices WHERE issue_date BETWEEN ? AND ?",
-                (start_date, end_date),
+                "SELECT SUM(revenue), SUM(expenses) FROM daily_rollup WHERE day_key BETWEEN ? AND ?",
+                date_range,
             )
-            total_revenue = c.fetchone()[0] or 0
-
-            c.execute(
-                "SELECT SUM(amount) FROM expenses WHERE expense_date BETWEEN ? AND ?",
-                (start_date, end_date),
-            )
-            total_expenses = c.fetchone()[0] or 0
+            total_revenue, total_expenses = c.fetchone()
+            total_revenue = total_revenue or 0
+            total_expenses = total_expenses or 0
 
             net_profit = total_revenue - total_expenses
 
@@ -900,11 +1322,15 @@ class DatabaseManager:
                 conn.cursor().execute(
                     """
                     INSERT INTO cheques (type, cheque_number, bank_name, amount, issue_date, 
-                                         due_date, status, description, invoice_id)
+                                         due_date, due_date_key, status, description, invoice_id)
                     VALUES (:type, :cheque_number, :bank_name, :amount, :issue_date, 
-                            :due_date, :status, :description, :invoice_id)
+                            :due_date, :due_date_key, :status, :description, :invoice_id)
                 """,
-                    data,
+                    dict(
+                        data,
+                        due_date_key=date_key(data["due_date"]),
+                        amount=Money(data["amount"]),
+                    ),
                 )
 
                 conn.commit()
@@ -920,6 +1346,8 @@ class DatabaseManager:
         try:
             with self._get_connection() as conn:
                 data["id"] = cheque_id
+                data["due_date_key"] = date_key(data["due_date"])
+                data["amount"] = Money(data["amount"])
                 conn.cursor().execute(
                     """
                     UPDATE cheques SET 
@@ -929,6 +1357,7 @@ class DatabaseManager:
                         amount = :amount, 
                         issue_date = :issue_date, 
                         due_date = :due_date, 
+                        due_date_key = :due_date_key, 
                         status = :status, 
                         description = :description
                     WHERE id = :id
@@ -946,10 +1375,24 @@ class DatabaseManager:
         with self._get_connection() as conn:
             return (
                 conn.cursor()
-                .execute("SELECT * FROM cheques ORDER BY due_date")
+                .execute("SELECT * FROM cheques ORDER BY due_date_key")
                 .fetchall()
             )
 
+    def get_cheques_page(self, cursor=None, page_size=PAGE_SIZE, cheque_type=None):
+        """
+        یک صفحه از چک‌ها به ترتیب تاریخ سررسید، در صورت نیاز فقط یک نوع (دریافتی/پرداختی).
+        خروجی (ردیف‌ها، توکن صفحه بعد) است.
+        """
+        return self._keyset_page(
+            "SELECT * FROM cheques",
+            ["list_date_key", "id"],
+            False,
+            [("type", cheque_type)],
+            cursor,
+            page_size,
+        )
+
     def get_cheque_by_id(self, cheque_id):
         """اطلاعات یک چک را با ID آن برمی‌گرداند."""
         with self._get_connection() as conn:
@@ -969,15 +1412,22 @@ class DatabaseManager:
         except Exception as e:
             return False, f"خطا در حذف چک: {e}"
 
-    def search_cheques(self, search_term):
+    def search_cheques(self, search_term, limit=SEARCH_RESULT_LIMIT):
         """چک‌ها را بر اساس شماره چک یا توضیحات جستجو می‌کند."""
+        match = self._fts_query(search_term)
+        if match is None:
+            return []
         with self._get_connection() as conn:
-            term = f"%{search_term}%"
             return (
                 conn.cursor()
                 .execute(
-                    "SELECT * FROM cheques WHERE cheque_number LIKE ? OR description LIKE ? ORDER BY due_date",
-                    (term, term),
+                    """
+                    SELECT ch.* FROM cheques_fts f
+                    JOIN cheques ch ON ch.id = f.rowid
+                    WHERE cheques_fts MATCH ?
+                    ORDER BY f.rank, ch.due_date_key LIMIT ?
+                    """,
+                    (match, limit),
                 )
                 .fetchall()
             )
@@ -987,13 +1437,14 @@ class DatabaseManager:
         تمام تراکنش‌ها (فروش و هزینه) را در یک بازه زمانی مشخص استخراج کرده
         و به صورت یک لیست واحد و مرتب شده بر اساس تاریخ برمی‌گرداند.
         """
+        date_range = self._date_range_keys(start_date, end_date)
         transactions = []
         with self._get_connection() as conn:
             invoices = (
                 conn.cursor()
                 .execute(
-                    "SELECT id, issue_date, total_amount FROM invoices WHERE issue_date BETWEEN ? AND ?",
-                    (start_date, end_date),
+                    "SELECT id, issue_date, issue_date_key, total_amount FROM invoices WHERE issue_date_key BETWEEN ? AND ?",
+                    date_range,
                 )
                 .fetchall()
             )
@@ -1001,6 +1452,7 @@ class DatabaseManager:
                 transactions.append(
                     {
                         "date": inv["issue_date"],
+                        "date_key": inv["issue_date_key"],
                         "type": "درآمد",
                         "description": f"فروش طبق فاکتور شماره {inv['id']}",
                         "income": inv["total_amount"],
@@ -1011,8 +1463,8 @@ class DatabaseManager:
             expenses = (
                 conn.cursor()
                 .execute(
-                    "SELECT expense_date, description, amount FROM expenses WHERE expense_date BETWEEN ? AND ?",
-                    (start_date, end_date),
+                    "SELECT expense_date, expense_date_key, description, amount FROM expenses WHERE expense_date_key BETWEEN ? AND ?",
+                    date_range,
                 )
                 .fetchall()
             )
@@ -1020,6 +1472,7 @@ class DatabaseManager:
                 transactions.append(
                     {
                         "date": exp["expense_date"],
+                        "date_key": exp["expense_date_key"],
                         "type": "هزینه",
                         "description": exp["description"],
                         "income": 0,
@@ -1027,7 +1480,7 @@ class DatabaseManager:
                     }
                 )
 
-        transactions.sort(key=lambda x: x["date"])
+        transactions.sort(key=lambda x: x["date_key"])
         return transactions
 
     def get_low_stock_products(self, threshold=10):
@@ -1048,7 +1501,7 @@ class DatabaseManager:
             return (
                 conn.cursor()
                 .execute(
-                    "SELECT cheque_number, due_date, amount FROM cheques WHERE type='دریافتی' AND status='در انتظار وصول' ORDER BY due_date ASC LIMIT ?",
+                    "SELECT cheque_number, due_date, amount FROM cheques WHERE type='دریافتی' AND status='در انتظار وصول' ORDER BY due_date_key ASC LIMIT ?",
                     (limit,),
                 )
                 .fetchall()
@@ -1111,6 +1564,11 @@ class DatabaseManager:
                 conn.cursor().execute("DELETE FROM accounts WHERE id=?", (account_id,))
                 conn.commit()
                 return True, "حساب با موفقیت حذف شد."
+        except sqlite3.IntegrityError:
+            return (
+                False,
+                "این حساب به کالاها یا هزینه‌های ثبت شده متصل است و نمی‌توان آن را حذف کرد.",
+            )
         except Exception as e:
             return False, f"خطا در حذف حساب: {e}"
 
@@ -1186,6 +1644,32 @@ class DatabaseManager:
                 .fetchall()
             )
 
+    def get_suppliers_page(self, cursor=None, page_size=PAGE_SIZE):
+        """یک صفحه از تامین‌کنندگان به ترتیب نام؛ خروجی (ردیف‌ها، توکن صفحه بعد)."""
+        return self._keyset_page(
+            "SELECT * FROM suppliers", ["name", "id"], False, [], cursor, page_size
+        )
+
+    def search_suppliers(self, search_term, limit=SEARCH_RESULT_LIMIT):
+        """تامین‌کنندگان را بر اساس نام یا کد ملی جستجو می‌کند."""
+        match = self._fts_query(search_term)
+        if match is None:
+            return []
+        with self._get_connection() as conn:
+            return (
+                conn.cursor()
+                .execute(
+                    """
+                    SELECT s.* FROM suppliers_fts f
+                    JOIN suppliers s ON s.id = f.rowid
+                    WHERE suppliers_fts MATCH ?
+                    ORDER BY f.rank LIMIT ?
+                    """,
+                    (match, limit),
+                )
+                .fetchall()
+            )
+
     def get_supplier_by_id(self, supplier_id):
         with self._get_connection() as conn:
             return (
@@ -1202,32 +1686,78 @@ class DatabaseManager:
                 )
                 conn.commit()
                 return True, "تامین‌کننده با موفقیت حذف شد."
+        except sqlite3.IntegrityError:
+            return (
+                False,
+                "این تامین‌کننده دارای فاکتورهای خرید ثبت شده است و نمی‌توان آن را حذف کرد.",
+            )
         except Exception as e:
             return False, f"خطا در حذف: {e}"
 
     def save_purchase_invoice(self, invoice_data, items_data):
-        """یک فاکتور خرید و اقلام آن را در دیتابیس ذخیره می‌کند."""
+        """
+        فاکتور خرید و اقلام آن را ثبت کرده و موجودی و میانگین موزون قیمت خرید کالاهای
+        دارای product_id را در همان تراکنش به‌روز می‌کند. ردیف‌های تکراری یک کالا
+        پیش از به‌روزرسانی با هم جمع می‌شوند.
+        """
         conn = self._get_connection()
         try:
             cursor = conn.cursor()
-            cursor.execute("BEGIN TRANSACTION;")
-
-            sql = """INSERT INTO purchase_invoices (supplier_id, issue_date, total_amount, notes)
-                     VALUES (:supplier_id, :issue_date, :total_amount, :notes)"""
-            cursor.execute(sql, invoice_data)
+            cursor.execute("BEGIN IMMEDIATE;")
+
+            sql = """INSERT INTO purchase_invoices (supplier_id, issue_date, issue_date_key, total_amount, notes)
+                     VALUES (:supplier_id, :issue_date, :issue_date_key, :total_amount, :notes)"""
+            cursor.execute(
+                sql,
+                dict(
+                    invoice_data,
+                    issue_date_key=date_key(invoice_data["issue_date"]),
+                    total_amount=Money(invoice_data["total_amount"]),
+                ),
+            )
             purchase_invoice_id = cursor.lastrowid
 
-            for item in items_data:
-                cursor.execute(
-                    """INSERT INTO purchase_invoice_items (purchase_invoice_id, product_name, quantity, purchase_price)
-                       VALUES (?, ?, ?, ?)""",
+            cursor.executemany(
+                """INSERT INTO purchase_invoice_items (purchase_invoice_id, product_name, quantity, purchase_price)
+                   VALUES (?, ?, ?, ?)""",
+                [
                     (
                         purchase_invoice_id,
                         item["product_name"],
                         item["quantity"],
-                        item["purchase_price"],
-                    ),
-                )
+                        Money(item["purchase_price"]),
+                    )
+                    for item in items_data
+                ],
+            )
+
+            # {product_id: [مقدار کل، ارزش کل خرید]}
+            received = {}
+            for item in items_data:
+                if not item.get("product_id"):
+                    continue
+                totals = received.setdefault(item["product_id"], [0, Money(0)])
+                totals[0] += item["quantity"]
+                totals[1] += Money(item["purchase_price"]).times(item["quantity"])
+
+            # سمت راست SET در SQLite مقادیر قبلی ردیف را می‌بیند، پس میانگین با
+            # موجودی پیش از خرید محاسبه می‌شود.
+            cursor.executemany(
+                """UPDATE products SET
+                       average_purchase_price = CASE
+                           WHEN stock_quantity + :quantity > 0 THEN CAST(ROUND(
+                               (stock_quantity * average_purchase_price + :value)
+                               / (stock_quantity + :quantity)
+                           ) AS INTEGER)
+                           ELSE 0
+                       END,
+                       stock_quantity = stock_quantity + :quantity
+                   WHERE id = :product_id""",
+                [
+                    {"product_id": product_id, "quantity": quantity, "value": value}
+                    for product_id, (quantity, value) in received.items()
+                ],
+            )
 
             conn.commit()
             return (
@@ -1239,9 +1769,6 @@ class DatabaseManager:
             conn.rollback()
             traceback.print_exc()
             return False, f"خطا در ثبت فاکتور خرید: {e}", None
-        finally:
-            if conn:
-                conn.close()
 
     def get_all_purchase_invoices(self):
         """تمام فاکتورهای خرید را به همراه نام تامین‌کننده برمی‌گرداند."""
@@ -1250,15 +1777,31 @@ class DatabaseManager:
                 SELECT pi.*, s.name as supplier_name 
                 FROM purchase_invoices pi
                 LEFT JOIN suppliers s ON pi.supplier_id = s.id
-                ORDER BY pi.issue_date DESC
+                ORDER BY pi.issue_date_key DESC
             """
             return conn.cursor().execute(query).fetchall()
 
+    def get_purchase_invoices_page(
+        self, cursor=None, page_size=PAGE_SIZE, supplier_id=None
+    ):
+        """یک صفحه از فاکتورهای خرید، جدیدترین اول؛ خروجی (ردیف‌ها، توکن صفحه بعد)."""
+        return self._keyset_page(
+            """
+            SELECT pi.*, s.name as supplier_name
+            FROM purchase_invoices pi
+            LEFT JOIN suppliers s ON pi.supplier_id = s.id
+            """,
+            ["pi.list_date_key", "pi.id"],
+            True,
+            [("pi.supplier_id", supplier_id)],
+            cursor,
+            page_size,
+        )
+
     def delete_purchase_invoice(self, purchase_invoice_id):
         """یک فاکتور خرید را حذف می‌کند (اقلام آن نیز خودکار حذف می‌شوند)."""
         try:
             with self._get_connection() as conn:
-                conn.execute("PRAGMA foreign_keys = ON;")
                 conn.cursor().execute(
                     "DELETE FROM purchase_invoices WHERE id=?", (purchase_invoice_id,)
                 )
@@ -1286,16 +1829,16 @@ class DatabaseManager:
                     return False, f"کالایی با شناسه {product_id} یافت نشد."
 
                 old_stock = current_data["stock_quantity"] or 0
-                old_avg_price = current_data["average_purchase_price"] or 0
+                old_avg_price = Money(current_data["average_purchase_price"])
 
-                total_old_value = old_stock * old_avg_price
-                total_new_value = quantity_purchased * purchase_price
+                total_old_value = old_avg_price.times(old_stock)
+                total_new_value = Money(purchase_price).times(quantity_purchased)
                 new_total_stock = old_stock + quantity_purchased
 
                 new_avg_price = (
-                    (total_old_value + total_new_value) / new_total_stock
+                    (total_old_value + total_new_value).per(new_total_stock)
                     if new_total_stock > 0
-                    else 0
+                    else Money(0)
                 )
 
                 cursor.execute(
@@ -1334,6 +1877,7 @@ class DatabaseManager:
     def get_detailed_financial_summary(self, start_date, end_date):
         """
         Returns the final, detailed financial report including gross and net profit.
+        Amounts are summed from the daily_rollup / daily_account_rollup tables.
         """
         summary = {
             "total_revenue": 0,
@@ -1344,32 +1888,31 @@ class DatabaseManager:
             "revenue_by_account": [],
             "expenses_by_account": [],
         }
+        date_range = self._date_range_keys(start_date, end_date)
         with self._get_connection() as conn:
             cursor = conn.cursor()
 
             rev_query = """
-                SELECT acc.name as account_name, SUM(ii.quantity * ii.unit_price) as total
-                FROM invoices inv
-                JOIN invoice_items ii ON inv.id = ii.invoice_id
-                JOIN products p ON ii.description = p.name
-                JOIN accounts acc ON p.account_id = acc.id
-                WHERE inv.issue_date BETWEEN ? AND ?
+                SELECT acc.name as account_name, SUM(r.revenue) as total
+                FROM daily_account_rollup r
+                JOIN accounts acc ON r.account_id = acc.id
+                WHERE r.day_key BETWEEN ? AND ?
                 GROUP BY acc.name
+                HAVING SUM(r.revenue) != 0
             """
             summary["revenue_by_account"] = cursor.execute(
-                rev_query, (start_date, end_date)
+                rev_query, date_range
             ).fetchall()
             summary["total_revenue"] = sum(
                 item["total"] for item in summary["revenue_by_account"]
             )
 
             cogs_query = """
-                SELECT SUM(ii.cost_of_good_sold) as total_cogs
-                FROM invoices inv
-                JOIN invoice_items ii ON inv.id = ii.invoice_id
-                WHERE inv.issue_date BETWEEN ? AND ?
+                SELECT SUM(cogs) as total_cogs
+                FROM daily_rollup
+                WHERE day_key BETWEEN ? AND ?
             """
-            cogs_result = cursor.execute(cogs_query, (start_date, end_date)).fetchone()
+            cogs_result = cursor.execute(cogs_query, date_range).fetchone()
             summary["cogs"] = (
                 cogs_result["total_cogs"]
                 if cogs_result and cogs_result["total_cogs"] is not None
@@ -1377,14 +1920,15 @@ class DatabaseManager:
             )
 
             exp_query = """
-                SELECT acc.name as account_name, SUM(exp.amount) as total
-                FROM expenses exp
-                JOIN accounts acc ON exp.account_id = acc.id
-                WHERE exp.expense_date BETWEEN ? AND ?
+                SELECT acc.name as account_name, SUM(r.expenses) as total
+                FROM daily_account_rollup r
+                JOIN accounts acc ON r.account_id = acc.id
+                WHERE r.day_key BETWEEN ? AND ?
                 GROUP BY acc.name
+                HAVING SUM(r.expenses) != 0
             """
             summary["expenses_by_account"] = cursor.execute(
-                exp_query, (start_date, end_date)
+                exp_query, date_range
             ).fetchall()
             summary["total_operational_expenses"] = sum(
                 item["total"] for item in summary["expenses_by_account"]
@@ -0,0 +1,98 @@
+# file: db_pool.py
+import sqlite3
+import threading
+
+# تنظیمات پیش‌فرض هر اتصال؛ فقط یک بار و هنگام ساخت اتصال هر ترد اجرا می‌شوند.
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "foreign_keys": "ON",
+    "cache_size": -8000,  # مقدار منفی یعنی کیلوبایت (حدود ۸ مگابایت)
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,
+}
+DEFAULT_CACHED_STATEMENTS = 256
+
+
+class ConnectionPool:
+    """
+    برای هر ترد یک اتصال ماندگار به دیتابیس نگه می‌دارد تا هزینه sqlite3.connect
+    و اجرای PRAGMAها فقط یک بار برای هر ترد پرداخت شود.
+    """
+
+    def __init__(self, db_path, pragmas=None, cached_statements=None):
+        self.db_path = db_path
+        self.pragmas = dict(DEFAULT_PRAGMAS)
+        if pragmas:
+            self.pragmas.update(pragmas)
+        self.cached_statements = cached_statements or DEFAULT_CACHED_STATEMENTS
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = {}
+
+    def _open(self):
+        # check_same_thread=False فقط برای این است که close_all بتواند اتصال
+        # تردهای دیگر را هنگام خروج ببندد؛ هر اتصال فقط در ترد خودش استفاده می‌شود.
+        conn = sqlite3.connect(
+            self.db_path,
+            cached_statements=self.cached_statements,
+            check_same_thread=False,
+        )
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def connection(self):
+        """اتصال مخصوص ترد فعلی را برمی‌گرداند و در صورت نیاز آن را می‌سازد."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            with self._lock:
+                self._connections[threading.get_ident()] = conn
+        return conn
+
+    def release(self):
+        """اتصال ترد فعلی را می‌بندد (برای تردهای کارگر پیش از پایان کارشان)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._lock:
+            self._connections.pop(threading.get_ident(), None)
+        conn.close()
+
+    def close_all(self):
+        """تمام اتصال‌های باز این استخر را می‌بندد."""
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path, pragmas=None, cached_statements=None):
+    """استخر اتصال مربوط به یک فایل دیتابیس را برمی‌گرداند (برای هر مسیر یک استخر)."""
+    with _pools_lock:
+        pool = _pools.get(db_path)
+        if pool is None:
+            pool = ConnectionPool(db_path, pragmas, cached_statements)
+            _pools[db_path] = pool
+        return pool
+
+
+def close_all_pools():
+    """هنگام خروج از برنامه تمام اتصال‌های باز را می‌بندد."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_all()
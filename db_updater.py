@@ -1,172 +1,927 @@
 # file: db_updater.py
+import re
 import sqlite3
+import sys
 import traceback
-from utils import get_app_data_path
+from utils import get_app_data_path, date_key, SEARCH_CHAR_MAP
 
 DB_NAME = get_app_data_path("accounting.db")
 
+# لیست مهاجرت‌ها به ترتیب نسخه: (شماره نسخه، توضیح، تابع اجراکننده)
+MIGRATIONS = []
+
+
+def migration(version, description):
+    """یک تابع را به عنوان مهاجرت شماره version ثبت می‌کند."""
+
+    def decorator(func):
+        if MIGRATIONS and version <= MIGRATIONS[-1][0]:
+            raise ValueError(f"شماره مهاجرت {version} باید از قبلی‌ها بزرگ‌تر باشد.")
+        MIGRATIONS.append((version, description, func))
+        return func
+
+    return decorator
+
+
+def latest_version():
+    """آخرین نسخه ساختار دیتابیس که برنامه می‌شناسد."""
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def get_schema_version(conn):
+    """نسخه فعلی ساختار دیتابیس را از PRAGMA user_version می‌خواند."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def column_exists(cursor, table_name, column_name):
+    columns = cursor.execute(f"PRAGMA table_info({table_name})").fetchall()
+    return any(col[1] == column_name for col in columns)
+
 
 def add_column_if_not_exists(cursor, table_name, column_name, column_type):
     """یک ستون را به جدول اضافه می‌کند، در صورتی که از قبل وجود نداشته باشد."""
-    try:
+    if not column_exists(cursor, table_name, column_name):
         cursor.execute(
             f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}"
         )
-        print(f"ستون '{column_name}' با موفقیت به جدول '{table_name}' اضافه شد.")
-    except sqlite3.OperationalError as e:
-        if "duplicate column name" in str(e):
-            print(f"ستون '{column_name}' از قبل در جدول '{table_name}' وجود دارد.")
-        else:
-            raise e
 
 
-def run_migrations(db_path):
-    print("شروع فرآیند به‌روزرسانی دیتابیس...")
-    conn = None
-    try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
+@migration(1, "ساختار پایه جداول")
+def _create_base_schema(cursor):
+    # دیتابیس‌های قدیمی (پیش از user_version) جداول را دارند ولی ممکن است
+    # برخی ستون‌ها را نداشته باشند؛ برای همین هم IF NOT EXISTS و هم
+    # add_column_if_not_exists استفاده شده است.
+    cursor.execute(
+        """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT NOT NULL UNIQUE,
+        email TEXT NOT NULL UNIQUE,
+        password_hash TEXT NOT NULL,
+        secret_question TEXT,
+        secret_answer_hash TEXT
+    );
+    """
+    )
+    add_column_if_not_exists(cursor, "users", "secret_question", "TEXT")
+    add_column_if_not_exists(cursor, "users", "secret_answer_hash", "TEXT")
 
-        print("\nبررسی جدول 'users'...")
-        add_column_if_not_exists(cursor, "users", "secret_question", "TEXT")
-        add_column_if_not_exists(cursor, "users", "secret_answer_hash", "TEXT")
+    cursor.execute(
+        """
+    CREATE TABLE IF NOT EXISTS customers (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        email TEXT,
+        phone TEXT,
+        address TEXT,
+        national_id TEXT,
+        economic_code TEXT,
+        postal_code TEXT
+    );
+    """
+    )
 
-        print("\nبررسی جدول 'fee_templates'...")
-        cursor.execute(
-            """
-        CREATE TABLE IF NOT EXISTS fee_templates (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL UNIQUE,
-            type TEXT NOT NULL,
-            value REAL NOT NULL DEFAULT 0
-        );
+    cursor.execute(
         """
-        )
-        print("جدول 'fee_templates' بررسی و در صورت نیاز ایجاد شد.")
-        # ---------------------------------------------------------
+    CREATE TABLE IF NOT EXISTS invoices (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        customer_id INTEGER NOT NULL,
+        issue_date TEXT NOT NULL,
+        due_date TEXT,
+        total_amount REAL NOT NULL,
+        status TEXT DEFAULT 'Unpaid',
+        notes TEXT,
+        amount_paid REAL DEFAULT 0,
+        payment_method TEXT,
+        payment_date TEXT,
+        cheque_number TEXT,
+        cheque_due_date TEXT,
+        payment_type TEXT DEFAULT 'نقدی',
+        payment_details TEXT,
+        FOREIGN KEY (customer_id) REFERENCES customers (id) ON DELETE CASCADE
+    );
+    """
+    )
+    add_column_if_not_exists(cursor, "invoices", "payment_type", "TEXT DEFAULT 'نقدی'")
+    add_column_if_not_exists(cursor, "invoices", "payment_details", "TEXT")
 
-        print("\nبررسی جدول 'expense_categories'...")
-        cursor.execute(
-            """
-        CREATE TABLE IF NOT EXISTS expense_categories (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL UNIQUE
-        );
+    cursor.execute(
         """
-        )
-        print("جدول 'expense_categories' بررسی و در صورت نیاز ایجاد شد.")
-        # ---------------------------------------------------------
+    CREATE TABLE IF NOT EXISTS invoice_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        invoice_id INTEGER NOT NULL,
+        description TEXT NOT NULL,
+        quantity REAL NOT NULL,
+        unit TEXT NOT NULL,
+        unit_price REAL NOT NULL,
+        discount_percent REAL NOT NULL DEFAULT 0,
+        tax_percent REAL NOT NULL DEFAULT 0,
+        extra_costs TEXT,
+        cost_of_good_sold REAL,
+        FOREIGN KEY (invoice_id) REFERENCES invoices (id) ON DELETE CASCADE
+    );
+    """
+    )
+    add_column_if_not_exists(cursor, "invoice_items", "cost_of_good_sold", "REAL")
 
-        print("\nبررسی جدول 'cheques'...")
-        cursor.execute(
-            """
-        CREATE TABLE IF NOT EXISTS cheques (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            type TEXT NOT NULL,
-            cheque_number TEXT NOT NULL,
-            bank_name TEXT,
-            amount REAL NOT NULL,
-            issue_date TEXT NOT NULL,
-            due_date TEXT NOT NULL,
-            status TEXT NOT NULL,
-            description TEXT
-        );
+    cursor.execute(
+        """
+    CREATE TABLE IF NOT EXISTS suppliers (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        email TEXT,
+        phone TEXT,
+        address TEXT,
+        national_id TEXT,
+        economic_code TEXT,
+        postal_code TEXT
+    );
+    """
+    )
+
+    cursor.execute(
+        """
+    CREATE TABLE IF NOT EXISTS purchase_invoices (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        supplier_id INTEGER NOT NULL,
+        issue_date TEXT NOT NULL,
+        total_amount REAL NOT NULL,
+        notes TEXT,
+        FOREIGN KEY (supplier_id) REFERENCES suppliers (id) ON DELETE SET NULL
+    );
+    """
+    )
+
+    cursor.execute(
+        """
+    CREATE TABLE IF NOT EXISTS purchase_invoice_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        purchase_invoice_id INTEGER NOT NULL,
+        product_name TEXT NOT NULL,
+        quantity REAL NOT NULL,
+        purchase_price REAL NOT NULL,
+        FOREIGN KEY (purchase_invoice_id) REFERENCES purchase_invoices (id) ON DELETE CASCADE
+    );
+    """
+    )
+
+    cursor.execute(
         """
+    CREATE TABLE IF NOT EXISTS accounts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE,
+        type TEXT NOT NULL, -- 'income' or 'expense'
+        description TEXT
+    );
+    """
+    )
+
+    cursor.execute(
+        """
+    CREATE TABLE IF NOT EXISTS expenses (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        description TEXT NOT NULL,
+        amount REAL NOT NULL,
+        expense_date TEXT NOT NULL,
+        category TEXT,
+        account_id INTEGER,
+        FOREIGN KEY (account_id) REFERENCES accounts (id)
+    );
+    """
+    )
+    add_column_if_not_exists(cursor, "expenses", "account_id", "INTEGER")
+
+    cursor.execute(
+        """
+    CREATE TABLE IF NOT EXISTS products (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE,
+        description TEXT,
+        unit TEXT NOT NULL,
+        unit_price REAL NOT NULL DEFAULT 0,
+        stock_quantity REAL NOT NULL DEFAULT 0,
+        account_id INTEGER,
+        average_purchase_price REAL NOT NULL DEFAULT 0,
+        FOREIGN KEY (account_id) REFERENCES accounts (id)
+    );
+    """
+    )
+    add_column_if_not_exists(
+        cursor, "products", "stock_quantity", "REAL NOT NULL DEFAULT 0"
+    )
+    add_column_if_not_exists(cursor, "products", "account_id", "INTEGER")
+    add_column_if_not_exists(
+        cursor, "products", "average_purchase_price", "REAL NOT NULL DEFAULT 0"
+    )
+
+    cursor.execute(
+        """
+    CREATE TABLE IF NOT EXISTS fee_templates (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE,
+        type TEXT NOT NULL,
+        value REAL NOT NULL DEFAULT 0
+    );
+    """
+    )
+
+    cursor.execute(
+        """
+    CREATE TABLE IF NOT EXISTS expense_categories (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE
+    );
+    """
+    )
+
+    cursor.execute(
+        """
+    CREATE TABLE IF NOT EXISTS cheques (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        type TEXT NOT NULL,
+        cheque_number TEXT NOT NULL,
+        bank_name TEXT,
+        amount REAL NOT NULL,
+        issue_date TEXT NOT NULL,
+        due_date TEXT NOT NULL,
+        status TEXT NOT NULL,
+        description TEXT,
+        invoice_id INTEGER
+    );
+    """
+    )
+    add_column_if_not_exists(cursor, "cheques", "invoice_id", "INTEGER")
+
+
+@migration(2, "ایندکس‌های جستجوهای پرتکرار")
+def _create_lookup_indexes(cursor):
+    # هر ایندکس برای یک فیلتر یا ترتیب مشخص در db_manager.py ساخته شده است؛
+    # query_plan_check.py بررسی می‌کند که کوئری‌ها واقعاً از آن‌ها استفاده کنند.
+    indexes = [
+        "idx_invoices_issue_date ON invoices (issue_date)",
+        "idx_invoices_customer ON invoices (customer_id, issue_date)",
+        "idx_invoices_status ON invoices (status, issue_date)",
+        "idx_invoice_items_invoice ON invoice_items (invoice_id)",
+        "idx_expenses_expense_date ON expenses (expense_date)",
+        "idx_expenses_account ON expenses (account_id)",
+        "idx_cheques_due_date ON cheques (due_date)",
+        "idx_cheques_type_status ON cheques (type, status, due_date)",
+        "idx_cheques_invoice ON cheques (invoice_id)",
+        "idx_purchase_invoices_supplier ON purchase_invoices (supplier_id)",
+        "idx_purchase_invoices_issue_date ON purchase_invoices (issue_date)",
+        "idx_purchase_items_invoice ON purchase_invoice_items (purchase_invoice_id)",
+        "idx_products_account ON products (account_id)",
+        "idx_products_stock ON products (stock_quantity)",
+        "idx_customers_name_lower ON customers (LOWER(name))",
+        "idx_customers_email ON customers (email)",
+        "idx_customers_phone ON customers (phone)",
+        "idx_accounts_type ON accounts (type, name)",
+    ]
+    for index in indexes:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {index}")
+
+
+# (جدول، ستون تاریخ متنی، ستون کلید عددی yyyymmdd)
+DATE_KEY_COLUMNS = [
+    ("invoices", "issue_date", "issue_date_key"),
+    ("expenses", "expense_date", "expense_date_key"),
+    ("cheques", "due_date", "due_date_key"),
+    ("purchase_invoices", "issue_date", "issue_date_key"),
+]
+
+
+@migration(3, "کلید عددی تاریخ‌ها")
+def _add_date_keys(cursor):
+    # مقایسه متنی تاریخ‌ها با ورودی بدون صفر ('1403/1/5') اشتباه می‌شود؛ کلید
+    # عددی yyyymmdd در کنار متن نگه داشته شده و تمام بازه‌ها روی آن اجرا می‌شوند.
+    for table, date_column, key_column in DATE_KEY_COLUMNS:
+        add_column_if_not_exists(cursor, table, key_column, "INTEGER")
+        rows = cursor.execute(f"SELECT id, {date_column} FROM {table}").fetchall()
+        cursor.executemany(
+            f"UPDATE {table} SET {key_column} = ? WHERE id = ?",
+            [(date_key(date_value), row_id) for row_id, date_value in rows],
         )
-        print("جدول 'cheques' بررسی و در صورت نیاز ایجاد شد.")
 
-        print("\nبررسی جدول 'invoices' برای اطلاعات پرداخت...")
-        add_column_if_not_exists(
-            cursor, "invoices", "payment_type", "TEXT DEFAULT 'نقدی'"
+    # ایندکس‌های تاریخ متنی مهاجرت ۲ با نسخه عددی جایگزین می‌شوند.
+    indexes = [
+        "idx_invoices_issue_date ON invoices (issue_date_key)",
+        "idx_invoices_customer ON invoices (customer_id, issue_date_key)",
+        "idx_invoices_status ON invoices (status, issue_date_key)",
+        "idx_expenses_expense_date ON expenses (expense_date_key)",
+        "idx_cheques_due_date ON cheques (due_date_key)",
+        "idx_cheques_type_status ON cheques (type, status, due_date_key)",
+        "idx_purchase_invoices_issue_date ON purchase_invoices (issue_date_key)",
+    ]
+    for index in indexes:
+        cursor.execute(f"DROP INDEX IF EXISTS {index.split()[0]}")
+        cursor.execute(f"CREATE INDEX {index}")
+
+
+def rebuild_table_with_integer_columns(cursor, table_name, columns):
+    """
+    نوع ستون‌های REAL داده شده را به INTEGER تغییر می‌دهد. SQLite امکان تغییر نوع ستون
+    را ندارد، پس جدول با ساختار جدید ساخته، داده‌ها گرد شده کپی و ایندکس‌ها دوباره ساخته می‌شوند.
+    """
+    create_sql = cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (table_name,),
+    ).fetchone()[0]
+    index_sqls = [
+        row[0]
+        for row in cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+            (table_name,),
+        ).fetchall()
+    ]
+    sequence = cursor.execute(
+        "SELECT seq FROM sqlite_sequence WHERE name = ?", (table_name,)
+    ).fetchone()
+
+    new_table = f"{table_name}_new"
+    new_sql = re.sub(
+        rf"^CREATE TABLE\s+[\"`\[]?{table_name}[\"`\]]?",
+        f"CREATE TABLE {new_table}",
+        create_sql,
+    )
+    for column in columns:
+        new_sql = re.sub(rf"\b({column}\s+)REAL\b", r"\1INTEGER", new_sql)
+
+    column_names = [
+        row[1] for row in cursor.execute(f"PRAGMA table_info({table_name})").fetchall()
+    ]
+    select_list = ", ".join(
+        f"CAST(ROUND({name}) AS INTEGER)" if name in columns else name
+        for name in column_names
+    )
+    cursor.execute(new_sql)
+    cursor.execute(
+        f"INSERT INTO {new_table} ({', '.join(column_names)}) SELECT {select_list} FROM {table_name}"
+    )
+    cursor.execute(f"DROP TABLE {table_name}")
+    cursor.execute(f"ALTER TABLE {new_table} RENAME TO {table_name}")
+    for index_sql in index_sqls:
+        cursor.execute(index_sql)
+    if sequence:
+        cursor.execute(
+            "UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?",
+            (sequence[0], table_name),
         )
-        add_column_if_not_exists(cursor, "invoices", "payment_details", "TEXT")
 
-        print("\nبررسی جدول 'cheques' برای اتصال به فاکتور...")
-        add_column_if_not_exists(cursor, "cheques", "invoice_id", "INTEGER")
 
-        print("\nبررسی جدول 'products' برای موجودی انبار...")
-        add_column_if_not_exists(
-            cursor, "products", "stock_quantity", "REAL NOT NULL DEFAULT 0"
+# ستون‌های مبلغ هر جدول که به ریال صحیح ذخیره می‌شوند.
+MONEY_COLUMNS = {
+    "invoices": ["total_amount", "amount_paid"],
+    "invoice_items": ["unit_price", "cost_of_good_sold"],
+    "purchase_invoices": ["total_amount"],
+    "purchase_invoice_items": ["purchase_price"],
+    "expenses": ["amount"],
+    "products": ["unit_price", "average_purchase_price"],
+    "cheques": ["amount"],
+}
+
+
+@migration(4, "ذخیره مبالغ به ریال صحیح")
+def _convert_money_to_integer(cursor):
+    # مقدار fee_templates.value می‌تواند درصد باشد و REAL باقی می‌ماند.
+    for table_name, columns in MONEY_COLUMNS.items():
+        rebuild_table_with_integer_columns(cursor, table_name, columns)
+
+
+# وضعیت‌های فاکتور باز در زمان این مهاجرت (در تریگرها ثابت می‌مانند).
+_ROLLUP_OPEN_STATUSES = "'پرداخت نشده', 'کسری', 'Unpaid', 'Partially Paid'"
+
+# ستون‌های جدول‌های تجمیعی؛ همه مبالغ ریال صحیح هستند.
+DAILY_ROLLUP_COLUMNS = (
+    "revenue",
+    "cogs",
+    "expenses",
+    "collected",
+    "receivables",
+    "invoice_count",
+)
+ACCOUNT_ROLLUP_COLUMNS = ("revenue", "expenses")
+
+# مقدار مورد انتظار جدول‌های تجمیعی مستقیماً از جدول‌های اصلی؛ هم برای ساخت دوباره
+# و هم برای بررسی صحت استفاده می‌شود. تاریخ نامعتبر در روز 0 جمع می‌شود.
+EXPECTED_DAILY_ROLLUP_SQL = f"""
+    SELECT day_key, SUM(revenue), SUM(cogs), SUM(expenses), SUM(collected),
+           SUM(receivables), SUM(invoice_count)
+    FROM (
+        SELECT COALESCE(issue_date_key, 0) AS day_key, total_amount AS revenue,
+               0 AS cogs, 0 AS expenses, COALESCE(amount_paid, 0) AS collected,
+               CASE WHEN status IN ({_ROLLUP_OPEN_STATUSES})
+                    THEN total_amount - COALESCE(amount_paid, 0) ELSE 0 END AS receivables,
+               1 AS invoice_count
+        FROM invoices
+        UNION ALL
+        SELECT COALESCE(inv.issue_date_key, 0), 0, COALESCE(ii.cost_of_good_sold, 0),
+               0, 0, 0, 0
+        FROM invoice_items ii JOIN invoices inv ON inv.id = ii.invoice_id
+        UNION ALL
+        SELECT COALESCE(expense_date_key, 0), 0, 0, amount, 0, 0, 0
+        FROM expenses
+    )
+    GROUP BY day_key
+"""
+
+EXPECTED_ACCOUNT_ROLLUP_SQL = """
+    SELECT day_key, account_id, SUM(revenue), SUM(expenses)
+    FROM (
+        SELECT COALESCE(inv.issue_date_key, 0) AS day_key, p.account_id,
+               CAST(ROUND(ii.quantity * ii.unit_price) AS INTEGER) AS revenue,
+               0 AS expenses
+        FROM invoice_items ii
+        JOIN invoices inv ON inv.id = ii.invoice_id
+        JOIN products p ON p.name = ii.description
+        WHERE p.account_id IS NOT NULL
+        UNION ALL
+        SELECT COALESCE(expense_date_key, 0), account_id, 0, amount
+        FROM expenses
+        WHERE account_id IS NOT NULL
+    )
+    GROUP BY day_key, account_id
+"""
+
+# مبلغ فروش یک قلم فاکتور (همان عبارت گزارش سود و زیان، به ریال صحیح).
+_ITEM_REVENUE = "CAST(ROUND({ref}.quantity * {ref}.unit_price) AS INTEGER)"
+
+
+def _bump_daily(day, **deltas):
+    """دستورهای افزودن مقادیر به ردیف یک روز در daily_rollup (با ساخت ردیف در صورت نیاز)."""
+    sets = ", ".join(f"{col} = {col} + ({delta})" for col, delta in deltas.items())
+    return f"""
+        INSERT OR IGNORE INTO daily_rollup (day_key) SELECT {day};
+        UPDATE daily_rollup SET {sets} WHERE day_key = {day};"""
+
+
+def _bump_account(day, account, **deltas):
+    """مانند _bump_daily برای ردیف روز × حساب؛ اگر حساب NULL باشد کاری نمی‌کند."""
+    sets = ", ".join(f"{col} = {col} + ({delta})" for col, delta in deltas.items())
+    return f"""
+        INSERT OR IGNORE INTO daily_account_rollup (day_key, account_id)
+        SELECT {day}, {account} WHERE {account} IS NOT NULL;
+        UPDATE daily_account_rollup SET {sets}
+        WHERE day_key = {day} AND account_id = {account};"""
+
+
+def _invoice_terms(ref, sign):
+    day = f"COALESCE({ref}.issue_date_key, 0)"
+    receivable = (
+        f"CASE WHEN {ref}.status IN ({_ROLLUP_OPEN_STATUSES}) "
+        f"THEN {ref}.total_amount - COALESCE({ref}.amount_paid, 0) ELSE 0 END"
+    )
+    return _bump_daily(
+        day,
+        revenue=f"{sign}{ref}.total_amount",
+        collected=f"{sign}COALESCE({ref}.amount_paid, 0)",
+        receivables=f"{sign}({receivable})",
+        invoice_count=f"{sign}1",
+    )
+
+
+def _invoice_items_terms(ref, sign):
+    """اثر تمام اقلام یک فاکتور روی روز همان فاکتور (برای حذف یا تغییر تاریخ فاکتور)."""
+    day = f"COALESCE({ref}.issue_date_key, 0)"
+    item_revenue = _ITEM_REVENUE.format(ref="ii")
+    return (
+        _bump_daily(
+            day,
+            cogs=f"{sign}(SELECT COALESCE(SUM(cost_of_good_sold), 0) "
+            f"FROM invoice_items WHERE invoice_id = {ref}.id)",
         )
+        + f"""
+        INSERT OR IGNORE INTO daily_account_rollup (day_key, account_id)
+        SELECT DISTINCT {day}, p.account_id
+        FROM invoice_items ii JOIN products p ON p.name = ii.description
+        WHERE ii.invoice_id = {ref}.id AND p.account_id IS NOT NULL;
+        UPDATE daily_account_rollup SET revenue = revenue {sign} COALESCE((
+            SELECT SUM({item_revenue})
+            FROM invoice_items ii JOIN products p ON p.name = ii.description
+            WHERE ii.invoice_id = {ref}.id
+              AND p.account_id = daily_account_rollup.account_id), 0)
+        WHERE day_key = {day};"""
+    )
 
-        print("\nبررسی جدول 'accounts'...")
-        cursor.execute(
-            """
-        CREATE TABLE IF NOT EXISTS accounts (
-          id INTEGER PRIMARY KEY AUTOINCREMENT,
-          name TEXT NOT NULL UNIQUE,
-          type TEXT NOT NULL, -- 'income' or 'expense'
-          description TEXT
-        );
-        """
+
+def _item_terms(ref, sign):
+    day = f"(SELECT COALESCE(issue_date_key, 0) FROM invoices WHERE id = {ref}.invoice_id)"
+    account = f"(SELECT account_id FROM products WHERE name = {ref}.description)"
+    return _bump_daily(
+        day, cogs=f"{sign}COALESCE({ref}.cost_of_good_sold, 0)"
+    ) + _bump_account(day, account, revenue=f"{sign}{_ITEM_REVENUE.format(ref=ref)}")
+
+
+def _expense_terms(ref, sign):
+    day = f"COALESCE({ref}.expense_date_key, 0)"
+    return _bump_daily(day, expenses=f"{sign}{ref}.amount") + _bump_account(
+        day, f"{ref}.account_id", expenses=f"{sign}{ref}.amount"
+    )
+
+
+def _product_terms(ref, sign):
+    """فروش تمام اقلام هم‌نام با کالا را به حساب کالا اضافه یا از آن کم می‌کند."""
+    item_revenue = _ITEM_REVENUE.format(ref="ii")
+    return f"""
+        INSERT OR IGNORE INTO daily_account_rollup (day_key, account_id)
+        SELECT DISTINCT COALESCE(inv.issue_date_key, 0), {ref}.account_id
+        FROM invoice_items ii JOIN invoices inv ON inv.id = ii.invoice_id
+        WHERE ii.description = {ref}.name AND {ref}.account_id IS NOT NULL;
+        UPDATE daily_account_rollup SET revenue = revenue {sign} COALESCE((
+            SELECT SUM({item_revenue})
+            FROM invoice_items ii JOIN invoices inv ON inv.id = ii.invoice_id
+            WHERE ii.description = {ref}.name
+              AND COALESCE(inv.issue_date_key, 0) = daily_account_rollup.day_key), 0)
+        WHERE account_id = {ref}.account_id;"""
+
+
+# (نام، زمان و رویداد، شرط WHEN، بدنه)
+# اقلام فاکتوری که با حذف فاکتور به صورت آبشاری حذف می‌شوند، در تریگر BEFORE DELETE
+# فاکتور کم می‌شوند؛ چون در زمان اجرای تریگر اقلام، فاکتور دیگر وجود ندارد.
+_PARENT_EXISTS = "EXISTS (SELECT 1 FROM invoices WHERE id = {ref}.invoice_id)"
+ROLLUP_TRIGGERS = [
+    (
+        "trg_rollup_invoices_insert",
+        "AFTER INSERT ON invoices",
+        None,
+        _invoice_terms("NEW", "+"),
+    ),
+    (
+        "trg_rollup_invoices_update",
+        "AFTER UPDATE ON invoices",
+        None,
+        _invoice_terms("OLD", "-") + _invoice_terms("NEW", "+"),
+    ),
+    (
+        "trg_rollup_invoices_move",
+        "AFTER UPDATE OF issue_date_key ON invoices",
+        "OLD.issue_date_key IS NOT NEW.issue_date_key",
+        _invoice_items_terms("OLD", "-") + _invoice_items_terms("NEW", "+"),
+    ),
+    (
+        "trg_rollup_invoices_delete",
+        "BEFORE DELETE ON invoices",
+        None,
+        _invoice_terms("OLD", "-") + _invoice_items_terms("OLD", "-"),
+    ),
+    (
+        "trg_rollup_items_insert",
+        "AFTER INSERT ON invoice_items",
+        _PARENT_EXISTS.format(ref="NEW"),
+        _item_terms("NEW", "+"),
+    ),
+    (
+        "trg_rollup_items_update",
+        "AFTER UPDATE ON invoice_items",
+        None,
+        _item_terms("OLD", "-") + _item_terms("NEW", "+"),
+    ),
+    (
+        "trg_rollup_items_delete",
+        "AFTER DELETE ON invoice_items",
+        _PARENT_EXISTS.format(ref="OLD"),
+        _item_terms("OLD", "-"),
+    ),
+    (
+        "trg_rollup_expenses_insert",
+        "AFTER INSERT ON expenses",
+        None,
+        _expense_terms("NEW", "+"),
+    ),
+    (
+        "trg_rollup_expenses_update",
+        "AFTER UPDATE ON expenses",
+        None,
+        _expense_terms("OLD", "-") + _expense_terms("NEW", "+"),
+    ),
+    (
+        "trg_rollup_expenses_delete",
+        "AFTER DELETE ON expenses",
+        None,
+        _expense_terms("OLD", "-"),
+    ),
+    (
+        "trg_rollup_products_insert",
+        "AFTER INSERT ON products",
+        None,
+        _product_terms("NEW", "+"),
+    ),
+    (
+        "trg_rollup_products_update",
+        "AFTER UPDATE OF name, account_id ON products",
+        "OLD.name IS NOT NEW.name OR OLD.account_id IS NOT NEW.account_id",
+        _product_terms("OLD", "-") + _product_terms("NEW", "+"),
+    ),
+    (
+        "trg_rollup_products_delete",
+        "AFTER DELETE ON products",
+        None,
+        _product_terms("OLD", "-"),
+    ),
+]
+
+
+def create_rollup_triggers(cursor):
+    """
+    تریگرهای نگهداری جدول‌های تجمیعی را (دوباره) می‌سازد. مهاجرتی که جدول‌های
+    فاکتور، اقلام، هزینه یا کالا را بازسازی می‌کند باید پس از آن این تابع را صدا بزند.
+    """
+    for name, event, condition, body in ROLLUP_TRIGGERS:
+        when = f" WHEN {condition}" if condition else ""
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"CREATE TRIGGER {name} {event}{when} BEGIN {body} END")
+
+
+def rebuild_rollups(cursor):
+    """جدول‌های تجمیعی را از روی جدول‌های اصلی از نو پر می‌کند."""
+    cursor.execute("DELETE FROM daily_rollup")
+    cursor.execute(
+        f"INSERT INTO daily_rollup (day_key, {', '.join(DAILY_ROLLUP_COLUMNS)}) "
+        f"{EXPECTED_DAILY_ROLLUP_SQL}"
+    )
+    cursor.execute("DELETE FROM daily_account_rollup")
+    cursor.execute(
+        "INSERT INTO daily_account_rollup "
+        f"(day_key, account_id, {', '.join(ACCOUNT_ROLLUP_COLUMNS)}) "
+        f"{EXPECTED_ACCOUNT_ROLLUP_SQL}"
+    )
+
+
+def verify_rollups(conn):
+    """
+    جدول‌های تجمیعی را با مقدار محاسبه شده از جدول‌های اصلی مقایسه می‌کند و لیست
+    اختلاف‌ها را به صورت (جدول، ردیف ذخیره شده، ردیف مورد انتظار) برمی‌گرداند.
+    ردیف‌هایی که همه مقادیرشان صفر است با نبودن ردیف برابر فرض می‌شوند.
+    """
+    checks = [
+        ("daily_rollup", 1, DAILY_ROLLUP_COLUMNS, EXPECTED_DAILY_ROLLUP_SQL),
+        (
+            "daily_account_rollup",
+            2,
+            ACCOUNT_ROLLUP_COLUMNS,
+            EXPECTED_ACCOUNT_ROLLUP_SQL,
+        ),
+    ]
+    mismatches = []
+    for table, key_count, columns, expected_sql in checks:
+        keys = ["day_key", "account_id"][:key_count]
+        stored = {
+            tuple(row[:key_count]): tuple(row[key_count:])
+            for row in conn.execute(
+                f"SELECT {', '.join(keys + list(columns))} FROM {table}"
+            )
+        }
+        expected = {
+            tuple(row[:key_count]): tuple(row[key_count:])
+            for row in conn.execute(expected_sql)
+        }
+        zero = (0,) * len(columns)
+        for key in sorted(set(stored) | set(expected)):
+            stored_row = stored.get(key, zero)
+            expected_row = expected.get(key, zero)
+            if stored_row != expected_row:
+                mismatches.append((table, key + stored_row, key + expected_row))
+    return mismatches
+
+
+@migration(5, "جدول‌های تجمیعی روزانه برای گزارش‌ها")
+def _create_rollups(cursor):
+    # گزارش‌های بازه‌ای و داشبورد به جای تجمیع فاکتورها و هزینه‌ها، ردیف‌های روزانه
+    # را جمع می‌زنند؛ جمع ماهانه همان بازه روزهای یک ماه (حداکثر ۳۱ ردیف) است.
+    cursor.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS daily_rollup (
+            day_key INTEGER NOT NULL PRIMARY KEY,
+            {", ".join(f"{col} INTEGER NOT NULL DEFAULT 0" for col in DAILY_ROLLUP_COLUMNS)}
+        ) WITHOUT ROWID
+    """
+    )
+    cursor.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS daily_account_rollup (
+            day_key INTEGER NOT NULL,
+            account_id INTEGER NOT NULL,
+            {", ".join(f"{col} INTEGER NOT NULL DEFAULT 0" for col in ACCOUNT_ROLLUP_COLUMNS)},
+            PRIMARY KEY (day_key, account_id)
+        ) WITHOUT ROWID
+    """
+    )
+    # تریگرهای اقلام و کالاها اقلام را با نام کالا پیدا می‌کنند.
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_invoice_items_description "
+        "ON invoice_items (description)"
+    )
+    create_rollup_triggers(cursor)
+    rebuild_rollups(cursor)
+
+
+# جدول اصلی -> ستون‌هایی که در نمایه جستجوی {table}_fts قرار می‌گیرند.
+# rowid هر ردیف نمایه همان id ردیف جدول اصلی است.
+SEARCH_COLUMNS = {
+    "customers": ("name", "national_id"),
+    "suppliers": ("name", "national_id"),
+    "products": ("name", "description"),
+    "accounts": ("name",),
+    "invoices": ("notes",),
+    "invoice_items": ("description",),
+    "expenses": ("description", "category"),
+    "cheques": ("cheque_number", "description"),
+}
+
+
+def search_text_sql(expr):
+    """عبارت SQL معادل utils.normalize_search_text برای استفاده در تریگرها."""
+    for source, target in SEARCH_CHAR_MAP.items():
+        source_sql = (
+            f"char({ord(source)})" if not source.isprintable() else f"'{source}'"
         )
-        print("جدول 'accounts' بررسی و در صورت نیاز ایجاد شد.")
+        expr = f"REPLACE({expr}, {source_sql}, '{target}')"
+    return f"COALESCE({expr}, '')"
+
+
+def _search_row_sql(table, ref):
+    columns = SEARCH_COLUMNS[table]
+    values = ", ".join(search_text_sql(f"{ref}.{col}") for col in columns)
+    return (
+        f"INSERT INTO {table}_fts (rowid, {', '.join(columns)}) "
+        f"VALUES ({ref}.id, {values});"
+    )
+
 
-        print("\nبررسی جدول 'products' و 'expenses' برای افزودن account_id...")
-        add_column_if_not_exists(cursor, "products", "account_id", "INTEGER")
-        add_column_if_not_exists(cursor, "expenses", "account_id", "INTEGER")
+def create_search_triggers(cursor):
+    """
+    تریگرهای همگام‌سازی نمایه‌های جستجو را (دوباره) می‌سازد. مانند تریگرهای
+    تجمیعی، پس از بازسازی هر جدول اصلی باید دوباره صدا زده شود.
+    """
+    for table, columns in SEARCH_COLUMNS.items():
+        delete_old = f"DELETE FROM {table}_fts WHERE rowid = OLD.id;"
+        triggers = {
+            f"trg_search_{table}_insert": (
+                f"AFTER INSERT ON {table}",
+                _search_row_sql(table, "NEW"),
+            ),
+            f"trg_search_{table}_update": (
+                f"AFTER UPDATE OF id, {', '.join(columns)} ON {table}",
+                delete_old + _search_row_sql(table, "NEW"),
+            ),
+            f"trg_search_{table}_delete": (f"AFTER DELETE ON {table}", delete_old),
+        }
+        for name, (event, body) in triggers.items():
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            cursor.execute(f"CREATE TRIGGER {name} {event} BEGIN {body} END")
 
-        print("\nبررسی جدول 'suppliers'...")
+
+def rebuild_search_index(cursor):
+    """نمایه‌های جستجو را از روی جدول‌های اصلی از نو پر می‌کند."""
+    for table, columns in SEARCH_COLUMNS.items():
+        values = ", ".join(search_text_sql(col) for col in columns)
+        cursor.execute(f"DELETE FROM {table}_fts")
         cursor.execute(
-            """
-        CREATE TABLE IF NOT EXISTS suppliers (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            email TEXT,
-            phone TEXT,
-            address TEXT,
-            national_id TEXT,
-            economic_code TEXT,
-            postal_code TEXT
-        );
-        """
+            f"INSERT INTO {table}_fts (rowid, {', '.join(columns)}) "
+            f"SELECT id, {values} FROM {table}"
         )
-        print("جدول 'suppliers' بررسی و در صورت نیاز ایجاد شد.")
 
-        print("\nبررسی جداول خرید...")
+
+@migration(6, "نمایه جستجوی تمام‌متن")
+def _create_search_index(cursor):
+    # جستجوی LIKE '%...%' هیچ‌وقت از ایندکس استفاده نمی‌کند؛ متن یکسان‌سازی شده
+    # (ی/ک عربی، نیم‌فاصله و ارقام فارسی) در جدول‌های FTS5 نگه داشته می‌شود.
+    for table, columns in SEARCH_COLUMNS.items():
         cursor.execute(
-            """
-        CREATE TABLE IF NOT EXISTS purchase_invoices (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            supplier_id INTEGER NOT NULL,
-            issue_date TEXT NOT NULL,
-            total_amount REAL NOT NULL,
-            notes TEXT,
-            FOREIGN KEY (supplier_id) REFERENCES suppliers (id) ON DELETE SET NULL
-        );
+            f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5 (
+                {", ".join(columns)},
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            )
         """
         )
+    create_search_triggers(cursor)
+    rebuild_search_index(cursor)
+
+
+# ترتیب لیست فاکتورها: پرداخت نشده، کسری، پرداخت شده و سایر (مرتب‌سازی نزولی).
+_INVOICE_STATUS_RANK = (
+    "CASE status WHEN 'پرداخت نشده' THEN 4 WHEN 'کسری' THEN 3 "
+    "WHEN 'پرداخت شده' THEN 2 ELSE 1 END"
+)
+
+
+@migration(7, "ستون‌ها و ایندکس‌های صفحه‌بندی لیست‌ها")
+def _create_list_indexes(cursor):
+    # صفحه‌بندی keyset با شرط (ستون‌ها) < (مقادیر آخرین ردیف) فقط روی ستون‌های واقعی
+    # از ایندکس استفاده می‌کند، نه روی عبارت؛ برای همین رتبه وضعیت و کلید تاریخ بدون
+    # NULL به صورت ستون محاسباتی (VIRTUAL، بدون فضای ذخیره‌سازی) اضافه می‌شوند.
+    generated_columns = [
+        ("invoices", "status_rank", _INVOICE_STATUS_RANK),
+        ("invoices", "list_date_key", "COALESCE(issue_date_key, 0)"),
+        ("expenses", "list_date_key", "COALESCE(expense_date_key, 0)"),
+        ("cheques", "list_date_key", "COALESCE(due_date_key, 0)"),
+        ("purchase_invoices", "list_date_key", "COALESCE(issue_date_key, 0)"),
+    ]
+    for table, column, expression in generated_columns:
         cursor.execute(
-            """
-        CREATE TABLE IF NOT EXISTS purchase_invoice_items (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            purchase_invoice_id INTEGER NOT NULL,
-            product_name TEXT NOT NULL,
-            quantity REAL NOT NULL,
-            purchase_price REAL NOT NULL,
-            FOREIGN KEY (purchase_invoice_id) REFERENCES purchase_invoices (id) ON DELETE CASCADE
-        );
-        """
+            f"ALTER TABLE {table} ADD COLUMN {column} INTEGER "
+            f"GENERATED ALWAYS AS ({expression}) VIRTUAL"
         )
-        print("جداول مربوط به فاکتور خرید بررسی و در صورت نیاز ایجاد شدند.")
 
-        print("\nبررسی جداول برای قابلیت COGS...")
-        add_column_if_not_exists(
-            cursor, "products", "average_purchase_price", "REAL NOT NULL DEFAULT 0"
-        )
-        add_column_if_not_exists(cursor, "invoice_items", "cost_of_good_sold", "REAL")
+    # id (rowid) به صورت ضمنی آخرین ستون هر ایندکس است.
+    indexes = [
+        "idx_invoices_list ON invoices (status_rank, list_date_key)",
+        "idx_invoices_customer_list ON invoices (customer_id, status_rank, list_date_key)",
+        "idx_expenses_list ON expenses (list_date_key)",
+        "idx_expenses_account ON expenses (account_id, list_date_key)",
+        "idx_cheques_list ON cheques (list_date_key)",
+        "idx_cheques_type_list ON cheques (type, list_date_key)",
+        "idx_purchase_invoices_list ON purchase_invoices (list_date_key)",
+        "idx_purchase_invoices_supplier ON purchase_invoices (supplier_id, list_date_key)",
+        "idx_customers_name ON customers (name)",
+    ]
+    for index in indexes:
+        cursor.execute(f"DROP INDEX IF EXISTS {index.split()[0]}")
+        cursor.execute(f"CREATE INDEX {index}")
 
-        conn.commit()
 
-        print("\nفرآیند به‌روزرسانی دیتابیس با موفقیت پایان یافت.")
+@migration(8, "ایندکس صفحه‌بندی تامین‌کنندگان")
+def _create_supplier_list_index(cursor):
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_suppliers_name ON suppliers (name)")
 
+
+def run_migrations(db_path=DB_NAME):
+    """
+    ساختار دیتابیس را به آخرین نسخه می‌رساند. هر مهاجرت فقط یک بار و داخل یک
+    تراکنش اجرا می‌شود؛ دیتابیسی که به‌روز است تنها با یک PRAGMA تشخیص داده می‌شود.
+    نسخه نهایی ساختار دیتابیس را برمی‌گرداند.
+    """
+    conn = None
+    current_version = 0
+    try:
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        current_version = get_schema_version(conn)
+        if current_version >= latest_version():
+            return current_version
+
+        print(
+            f"به‌روزرسانی دیتابیس از نسخه {current_version} به نسخه {latest_version()}..."
+        )
+        cursor = conn.cursor()
+        for version, description, func in MIGRATIONS:
+            if version <= current_version:
+                continue
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                func(cursor)
+                cursor.execute(f"PRAGMA user_version = {version}")
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            current_version = version
+            print(f"مهاجرت {version} ({description}) با موفقیت اجرا شد.")
+
+        print("فرآیند به‌روزرسانی دیتابیس با موفقیت پایان یافت.")
     except sqlite3.Error as e:
         print(f"خطایی در کار با SQLite رخ داد: {e}")
         traceback.print_exc()
     finally:
         if conn:
             conn.close()
+    return current_version
+
+
+def check_rollups(db_path=DB_NAME, rebuild=False):
+    """
+    جدول‌های تجمیعی را بررسی (و در صورت درخواست از نو ساخته) و تعداد اختلاف‌های
+    باقی‌مانده را برمی‌گرداند.
+    """
+    run_migrations(db_path)
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        if rebuild:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                rebuild_rollups(cursor)
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            print("جدول‌های تجمیعی از نو ساخته شدند.")
+        mismatches = verify_rollups(conn)
+    finally:
+        conn.close()
+    for table, stored, expected in mismatches:
+        print(f"[{table}] ذخیره شده: {stored} | مورد انتظار: {expected}")
+    if mismatches:
+        print(f"{len(mismatches)} اختلاف در جدول‌های تجمیعی یافت شد.")
+    else:
+        print("جدول‌های تجمیعی با داده‌های اصلی مطابقت دارند.")
+    return len(mismatches)
 
 
 if __name__ == "__main__":
+    # python db_updater.py                    -> اجرای مهاجرت‌ها
+    # python db_updater.py --verify-rollups   -> بررسی جدول‌های تجمیعی
+    # python db_updater.py --rebuild-rollups  -> ساخت دوباره و بررسی
+    if "--rebuild-rollups" in sys.argv or "--verify-rollups" in sys.argv:
+        sys.exit(1 if check_rollups(rebuild="--rebuild-rollups" in sys.argv) else 0)
     run_migrations()
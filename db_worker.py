@@ -0,0 +1,266 @@
+# file: db_worker.py
+import sqlite3
+import threading
+import traceback
+
+from PySide6.QtCore import (
+    QCoreApplication,
+    QObject,
+    QRunnable,
+    QThreadPool,
+    QTimer,
+    Signal,
+)
+from PySide6.QtWidgets import QProgressBar
+
+# تعداد تردهای کارگر دیتابیس؛ در حالت WAL خواندن‌ها هم‌زمان انجام می‌شوند.
+DB_WORKER_THREADS = 3
+# کارهای طولانی پس‌زمینه (پشتیبان‌گیری زمان‌بندی شده) ترد جداگانه خودشان را دارند تا
+# هیچ‌وقت یکی از تردهای کارگر صفحه‌ها را اشغال نکنند.
+BACKGROUND_WORKER_THREADS = 1
+# نشانگر مشغول بودن فقط برای کارهایی که بیش از این مدت طول بکشند نمایش داده می‌شود.
+BUSY_INDICATOR_DELAY_MS = 200
+
+_thread_pool = None
+_background_pool = None
+
+
+def get_db_thread_pool():
+    """QThreadPool مشترک کارهای دیتابیس را (در اولین استفاده) می‌سازد."""
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = QThreadPool()
+        _thread_pool.setObjectName("db")
+        _thread_pool.setMaxThreadCount(DB_WORKER_THREADS)
+        # تردها و در نتیجه اتصال ماندگار هر ترد در db_pool تا پایان برنامه حفظ می‌شوند.
+        _thread_pool.setExpiryTimeout(-1)
+        QCoreApplication.instance().aboutToQuit.connect(stop_db_thread_pool)
+    return _thread_pool
+
+
+def get_background_thread_pool():
+    """QThreadPool کارهای طولانی پس‌زمینه را (در اولین استفاده) می‌سازد."""
+    global _background_pool
+    if _background_pool is None:
+        _background_pool = QThreadPool()
+        _background_pool.setObjectName("db-background")
+        _background_pool.setMaxThreadCount(BACKGROUND_WORKER_THREADS)
+        _background_pool.setExpiryTimeout(-1)
+        QCoreApplication.instance().aboutToQuit.connect(stop_db_thread_pool)
+    return _background_pool
+
+
+def stop_db_thread_pool():
+    """کارهای در صف را حذف کرده و منتظر پایان کارهای در حال اجرا می‌ماند."""
+    global _thread_pool, _background_pool
+    for pool in (_thread_pool, _background_pool):
+        if pool is not None:
+            pool.clear()
+            pool.waitForDone()
+    _thread_pool = None
+    _background_pool = None
+
+
+def db_threads_idle():
+    """آیا هیچ کاری روی تردهای کارگر دیتابیس (مشترک و پس‌زمینه) در حال اجرا نیست."""
+    return all(
+        pool is None or pool.activeThreadCount() == 0
+        for pool in (_thread_pool, _background_pool)
+    )
+
+
+class DbTask(QRunnable):
+    """یک فراخوانی DatabaseManager که روی تردهای کارگر اجرا می‌شود."""
+
+    def __init__(self, runner, fn, args, kwargs, on_result, on_error):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.runner = runner
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.on_result = on_result
+        self.on_error = on_error
+        self.cancelled = False
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def run(self):
+        result, error = None, None
+        if not self.cancelled:
+            with self._lock:
+                # اتصال همین ترد؛ فقط برای لغو کوئری در حال اجرا با interrupt() نگه داشته می‌شود.
+                self._conn = self.runner.db_manager._get_connection()
+            try:
+                result = self.fn(*self.args, **self.kwargs)
+            except Exception as e:
+                if not self.cancelled:
+                    traceback.print_exc()
+                error = e
+            finally:
+                with self._lock:
+                    self._conn = None
+        try:
+            self.runner._task_done.emit(self, result, error)
+        except RuntimeError:
+            # صفحه صاحب این کار پیش از پایان آن حذف شده است.
+            pass
+
+    def cancel(self):
+        """نتیجه این کار دور ریخته می‌شود و کوئری در حال اجرای آن متوقف می‌شود."""
+        self.cancelled = True
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.interrupt()
+                except sqlite3.Error:
+                    pass
+
+
+class DbRunner(QObject):
+    """
+    کارهای دیتابیس یک صفحه را روی QThreadPool مشترک (یا استخری که pool_getter
+    برمی‌گرداند) اجرا کرده و نتیجه را روی ترد اصلی به on_result(result) یا در صورت
+    خطا به on_error(exception) می‌دهد. هر ترد کارگر اتصال مخصوص خودش را از db_pool
+    دارد. cancel() تمام کارهای باز صفحه را لغو می‌کند و busy_changed برای نمایش
+    نشانگر مشغول بودن صفحه است.
+    """
+
+    busy_changed = Signal(bool)
+    _task_done = Signal(object, object, object)
+
+    def __init__(self, db_manager, parent=None, pool_getter=get_db_thread_pool):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.pool_getter = pool_getter
+        self._pool = None
+        self._tasks = []
+        # کارهای لغو شده‌ای که هنوز روی ترد کارگر هستند تا پایانشان نگه داشته می‌شوند.
+        self._cancelled = []
+        self._task_done.connect(self._on_task_done)
+
+    def submit(self, fn, *args, on_result=None, on_error=None, **kwargs):
+        """fn(*args, **kwargs) را روی ترد کارگر اجرا می‌کند؛ خروجی، خود کار است."""
+        task = DbTask(self, fn, args, kwargs, on_result, on_error)
+        self._tasks.append(task)
+        if len(self._tasks) == 1:
+            self.busy_changed.emit(True)
+        self._pool = self.pool_getter()
+        self._pool.start(task)
+        return task
+
+    def cancel(self):
+        """کارهای در صف حذف و کارهای در حال اجرا متوقف می‌شوند؛ نتیجه‌ای اعمال نمی‌شود."""
+        if not self._tasks:
+            return
+        self._cancel_tasks()
+        self._tasks = []
+        self.busy_changed.emit(False)
+
+    def is_busy(self):
+        return bool(self._tasks)
+
+    def _cancel_tasks(self):
+        # اگر استخر در این فاصله متوقف شده باشد، کاری در صف آن باقی نمانده است.
+        pool = self._pool if self._pool in (_thread_pool, _background_pool) else None
+        for task in self._tasks:
+            task.cancel()
+            if pool is None or not pool.tryTake(task):
+                self._cancelled.append(task)
+
+    def _on_task_done(self, task, result, error):
+        if task in self._cancelled:
+            self._cancelled.remove(task)
+            return
+        if task not in self._tasks:
+            return
+        self._tasks.remove(task)
+        if not self._tasks:
+            self.busy_changed.emit(False)
+        if task.cancelled:
+            return
+        if error is None:
+            if task.on_result is not None:
+                task.on_result(result)
+        elif task.on_error is not None:
+            task.on_error(error)
+
+
+class ProgressJob(QObject):
+    """
+    یک کار طولانی (مثل خروجی گرفتن یا پشتیبان‌گیری) را روی ترد کارگر اجرا کرده و
+    نتیجه را با سیگنال‌ها (روی ترد اصلی) اطلاع می‌دهد: progress(انجام شده، کل)،
+    finished(خروجی کار) پس از پایان موفق، failed(متن خطا) در صورت خطا و cancelled
+    پس از cancel. تابع کار آرگومان‌های progress و is_cancelled را می‌گیرد و خودش
+    بین گام‌ها لغو را بررسی می‌کند.
+    """
+
+    progress = Signal(int, int)
+    finished = Signal(object)
+    failed = Signal(str)
+    cancelled = Signal()
+
+    def __init__(self, db_manager, parent=None, pool_getter=get_db_thread_pool):
+        super().__init__(parent)
+        self.runner = DbRunner(db_manager, self, pool_getter)
+        self.db_manager = db_manager
+        self._cancel_event = None
+
+    def is_running(self):
+        return self.runner.is_busy()
+
+    def run(self, fn, *args, **kwargs):
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+        self.runner.cancel()
+        # هر نوبت پرچم لغو خودش را دارد تا لغو نوبت قبلی روی نوبت جدید اثر نگذارد.
+        cancel_event = threading.Event()
+        self._cancel_event = cancel_event
+        self.runner.submit(
+            fn,
+            *args,
+            progress=self._report_progress,
+            is_cancelled=cancel_event.is_set,
+            on_result=self.finished.emit,
+            on_error=lambda e: self.failed.emit(str(e)),
+            **kwargs,
+        )
+
+    def cancel(self):
+        if not self.runner.is_busy():
+            return
+        self._cancel_event.set()
+        # کوئری در حال اجرا هم با interrupt متوقف می‌شود.
+        self.runner.cancel()
+        self.cancelled.emit()
+
+    def _report_progress(self, done, total):
+        # روی ترد کارگر اجرا می‌شود.
+        try:
+            self.progress.emit(done, total)
+        except RuntimeError:
+            pass
+
+
+class BusyIndicator(QProgressBar):
+    """نوار پیشرفت نامعین که هنگام اجرای کارهای یک DbRunner نمایش داده می‌شود."""
+
+    def __init__(self, runner, parent=None):
+        super().__init__(parent)
+        self.setRange(0, 0)
+        self.setTextVisible(False)
+        self.setMaximumHeight(4)
+        self.hide()
+
+        self._show_timer = QTimer(self)
+        self._show_timer.setSingleShot(True)
+        self._show_timer.setInterval(BUSY_INDICATOR_DELAY_MS)
+        self._show_timer.timeout.connect(self.show)
+        runner.busy_changed.connect(self._on_busy_changed)
+
+    def _on_busy_changed(self, busy):
+        if busy:
+            self._show_timer.start()
+        else:
+            self._show_timer.stop()
+            self.hide()
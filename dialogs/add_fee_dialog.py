@@ -11,6 +11,8 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import QSettings
 
+from money import Money
+
 
 class AddFeeDialog(QDialog):
     def __init__(self, parent=None):
@@ -64,7 +66,7 @@ class AddFeeDialog(QDialog):
             return
 
         try:
-            amount = float(amount_text)
+            amount = Money(amount_text)
             if amount <= 0:
                 QMessageBox.warning(self, "خطا", "مبلغ باید یک عدد مثبت باشد.")
                 return
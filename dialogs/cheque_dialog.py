@@ -12,6 +12,7 @@ from PySide6.QtWidgets import (
     QMessageBox,
 )
 from signal_bus import signal_bus
+from money import Money
 
 
 class ChequeDialog(QDialog):
@@ -85,7 +86,7 @@ class ChequeDialog(QDialog):
             return
 
         try:
-            amount = float(amount_text)
+            amount = Money(amount_text)
         except ValueError:
             QMessageBox.warning(self, "خطا", "مبلغ وارد شده معتبر نیست.")
             return
@@ -108,7 +109,7 @@ class ChequeDialog(QDialog):
             success, msg = self.db_manager.add_cheque(data)
 
         if success:
-            signal_bus.invoice_saved.emit()
+            signal_bus.cheque_saved.emit()
             QMessageBox.information(self, "موفقیت", msg)
             super().accept()
         else:
@@ -12,6 +12,7 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt
 from signal_bus import signal_bus
+from money import Money
 
 
 class ExpenseDialog(QDialog):
@@ -89,7 +90,7 @@ class ExpenseDialog(QDialog):
             return
 
         try:
-            amount = float(amount_text)
+            amount = Money(amount_text)
         except ValueError:
             QMessageBox.warning(self, "خطا", "لطفاً برای مبلغ یک عدد معتبر وارد کنید.")
             return
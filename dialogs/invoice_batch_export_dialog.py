@@ -0,0 +1,237 @@
+# file: dialogs/invoice_batch_export_dialog.py
+import datetime
+import os
+
+import jdatetime
+from PySide6.QtWidgets import (
+    QDialog,
+    QVBoxLayout,
+    QHBoxLayout,
+    QFormLayout,
+    QLineEdit,
+    QComboBox,
+    QRadioButton,
+    QProgressBar,
+    QLabel,
+    QPushButton,
+    QMessageBox,
+    QFileDialog,
+)
+
+from db_worker import DbRunner
+from invoice_batch_export import InvoiceBatchExporter
+from utils import normalize_date
+
+INVOICE_STATUSES = ["پرداخت نشده", "کسری", "پرداخت شده"]
+
+
+class InvoiceBatchExportDialog(QDialog):
+    """
+    خروجی PDF گروهی فاکتورهای یک بازه تاریخ. پس از پذیرفته شدن دیالوگ، output_path
+    مسیر فایل یا پوشه خروجی و result_message متن گزارش نتیجه است.
+    """
+
+    def __init__(self, db_manager, company_info, page_size_str="A4", parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.company_info = company_info
+        self.output_path = None
+        self.result_message = ""
+        self._merged = False
+
+        self.setObjectName("formDialog")
+        self.setWindowTitle("خروجی PDF گروهی فاکتورها")
+        self.setMinimumWidth(420)
+        self.setModal(True)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 20, 20, 20)
+        form_layout = QFormLayout()
+
+        today = jdatetime.date.today()
+        self.start_date_input = QLineEdit(today.replace(day=1).strftime("%Y/%m/%d"))
+        self.end_date_input = QLineEdit(today.strftime("%Y/%m/%d"))
+
+        self.customer_combo = QComboBox()
+        self.customer_combo.addItem("همه مشتریان", None)
+        for customer in self.db_manager.get_all_customers():
+            self.customer_combo.addItem(customer["name"], customer["id"])
+
+        self.status_combo = QComboBox()
+        self.status_combo.addItem("همه وضعیت‌ها", None)
+        for status in INVOICE_STATUSES:
+            self.status_combo.addItem(status, status)
+
+        self.page_size_combo = QComboBox()
+        self.page_size_combo.addItems(["A4", "A5"])
+        self.page_size_combo.setCurrentText(page_size_str)
+
+        self.separate_radio = QRadioButton("هر فاکتور در یک فایل جدا")
+        self.merged_radio = QRadioButton("همه فاکتورها در یک فایل")
+        self.separate_radio.setChecked(True)
+        mode_layout = QHBoxLayout()
+        mode_layout.addWidget(self.separate_radio)
+        mode_layout.addWidget(self.merged_radio)
+        mode_layout.addStretch()
+
+        form_layout.addRow("از تاریخ:", self.start_date_input)
+        form_layout.addRow("تا تاریخ:", self.end_date_input)
+        form_layout.addRow("مشتری:", self.customer_combo)
+        form_layout.addRow("وضعیت:", self.status_combo)
+        form_layout.addRow("سایز چاپ:", self.page_size_combo)
+        form_layout.addRow("نوع خروجی:", mode_layout)
+        layout.addLayout(form_layout)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        self.status_label = QLabel()
+        layout.addWidget(self.progress_bar)
+        layout.addWidget(self.status_label)
+
+        button_box = QHBoxLayout()
+        self.start_btn = QPushButton(
+            "شروع خروجی", objectName="primaryButton", clicked=self.start_export
+        )
+        self.cancel_btn = QPushButton("لغو", clicked=self.reject)
+        button_box.addStretch()
+        button_box.addWidget(self.start_btn)
+        button_box.addWidget(self.cancel_btn)
+        layout.addLayout(button_box)
+
+        self.db_runner = DbRunner(self.db_manager, self)
+        self.exporter = InvoiceBatchExporter(self)
+        self.exporter.progress.connect(self.show_progress)
+        self.exporter.finished.connect(self.on_export_finished)
+
+    def _set_running(self, running):
+        for widget in (
+            self.start_btn,
+            self.start_date_input,
+            self.end_date_input,
+            self.customer_combo,
+            self.status_combo,
+            self.page_size_combo,
+            self.separate_radio,
+            self.merged_radio,
+        ):
+            widget.setEnabled(not running)
+        self.progress_bar.setVisible(running)
+
+    def _choose_output(self):
+        from pdf_generator import default_invoices_folder
+
+        folder = str(default_invoices_folder())
+        if self._merged:
+            today_str = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+            file_path, _ = QFileDialog.getSaveFileName(
+                self,
+                "ذخیره فایل PDF فاکتورها",
+                os.path.join(folder, f"invoices_{today_str}.pdf"),
+                "PDF Files (*.pdf)",
+            )
+            return file_path
+        return QFileDialog.getExistingDirectory(
+            self, "انتخاب پوشه برای ذخیره فایل‌های PDF فاکتورها", folder
+        )
+
+    def start_export(self):
+        start_date = normalize_date(self.start_date_input.text())
+        end_date = normalize_date(self.end_date_input.text())
+        if not start_date or not end_date:
+            QMessageBox.warning(
+                self,
+                "خطا",
+                "لطفاً تاریخ شروع و پایان را به شکل صحیح (مثلاً 1403/01/01) وارد کنید.",
+            )
+            return
+        self.start_date_input.setText(start_date)
+        self.end_date_input.setText(end_date)
+
+        self._merged = self.merged_radio.isChecked()
+        output = self._choose_output()
+        if not output:
+            return
+        self.output_path = output
+
+        self._set_running(True)
+        self.progress_bar.setRange(0, 0)
+        self.status_label.setText("در حال خواندن فاکتورها...")
+        # سربرگ و اقلام همه فاکتورها با دو کوئری روی ترد کارگر خوانده می‌شوند.
+        self.db_runner.submit(
+            self.db_manager.get_invoices_for_export,
+            start_date,
+            end_date,
+            customer_id=self.customer_combo.currentData(),
+            status=self.status_combo.currentData(),
+            on_result=self.render_invoices,
+            on_error=self.on_load_error,
+        )
+
+    def on_load_error(self, error):
+        self._set_running(False)
+        self.status_label.clear()
+        QMessageBox.critical(self, "خطا", f"خطا در خواندن فاکتورها:\n{error}")
+
+    def render_invoices(self, invoices):
+        if not invoices:
+            self._set_running(False)
+            self.status_label.clear()
+            QMessageBox.information(
+                self, "اطلاعاتی وجود ندارد", "هیچ فاکتوری با این مشخصات یافت نشد."
+            )
+            return
+        self.status_label.setText(f"در حال ساخت PDF برای {len(invoices)} فاکتور...")
+        self.exporter.start(
+            invoices,
+            self.company_info,
+            self.page_size_combo.currentText(),
+            self.output_path,
+            merged=self._merged,
+        )
+
+    def show_progress(self, done, total):
+        if self._merged:
+            # فایل واحد یک‌جا ساخته می‌شود و پیشرفت میانی ندارد.
+            self.progress_bar.setRange(0, 0 if done < total else total)
+            return
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
+        self.status_label.setText(f"{done} از {total} فاکتور ساخته شد.")
+
+    def on_export_finished(self, files, errors, cancelled):
+        self._set_running(False)
+        if cancelled:
+            return
+        if errors:
+            invoice_id, message = errors[0]
+            title = f"فاکتور INV-{invoice_id:04d}" if invoice_id else "فایل PDF"
+            QMessageBox.warning(
+                self,
+                "خطا",
+                f"ساخت {len(errors)} فایل PDF با خطا روبرو شد.\n{title}:\n{message}",
+            )
+        if not files:
+            self.status_label.clear()
+            return
+        if self._merged:
+            self.output_path = files[0]
+            self.result_message = f"فایل PDF در مسیر زیر ساخته شد:\n{self.output_path}"
+        else:
+            self.result_message = (
+                f"{len(files)} فایل PDF در پوشه زیر ساخته شد:\n{self.output_path}"
+            )
+        super().accept()
+
+    def reject(self):
+        if self.db_runner.is_busy() or self.exporter.is_running():
+            self.db_runner.cancel()
+            self.exporter.cancel()
+            self._set_running(False)
+            self.status_label.setText("خروجی لغو شد.")
+            return
+        super().reject()
+
+    def closeEvent(self, event):
+        self.db_runner.cancel()
+        self.exporter.cancel()
+        super().closeEvent(event)
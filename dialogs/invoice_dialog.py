@@ -25,6 +25,7 @@ from PySide6.QtGui import QFont, QColor, QIcon
 from signal_bus import signal_bus
 from dialogs.customer_dialog import CustomerDialog
 from dialogs.cheque_info_dialog import ChequeInfoDialog
+from money import Money, invoice_line
 from utils import resource_path
 
 
@@ -35,6 +36,7 @@ class InvoiceDialog(QDialog):
         self.invoice_id = invoice_id
         self.products_list = []
         self.fee_templates = []
+        self.grand_total = Money(0)
 
         self.setWindowTitle("صدور / ویرایش فاکتور")
         self.setMinimumSize(1000, 750)
@@ -142,6 +144,7 @@ class InvoiceDialog(QDialog):
         self.save_button.clicked.connect(self.process_and_save_invoice)
         self.add_customer_btn.clicked.connect(self.quick_add_customer)
         signal_bus.customer_saved.connect(self.refresh_customer_list)
+        signal_bus.customer_deleted.connect(self.refresh_customer_list)
 
         self.load_initial_data()
 
@@ -154,9 +157,7 @@ class InvoiceDialog(QDialog):
             QMessageBox.warning(self, "خطا", "فاکتور باید حداقل شامل یک قلم کالا باشد.")
             return
 
-        grand_total = float(
-            self.grand_total_label.text().replace(" ریال", "").replace(",", "")
-        )
+        grand_total = self.grand_total
         status = self.status_combo.currentText()
         payment_method = self.payment_method_combo.currentText()
         amount_paid = 0
@@ -169,12 +170,12 @@ class InvoiceDialog(QDialog):
                 "مبلغ پرداخت شده را وارد کنید:",
                 0,
                 0,
-                grand_total,
+                int(grand_total),
                 0,
             )
             if not ok:
                 return
-            amount_paid = paid
+            amount_paid = Money(paid)
         elif status == "پرداخت شده":
             amount_paid = grand_total
 
@@ -204,39 +205,32 @@ class InvoiceDialog(QDialog):
         }
 
         items_data_to_save = []
-        products_to_update_stock = []
         for row in range(self.items_table.rowCount()):
             try:
                 p_data_container = self.items_table.item(row, 0).data(
                     Qt.ItemDataRole.UserRole
                 )
                 quantity_sold = float(self.items_table.item(row, 1).text())
-                cogs_for_this_item = 0
+                product_id = None
 
                 if p_data_container and p_data_container.get("type") == "product":
                     product_info = p_data_container["data"]
                     product_id = product_info["id"]
-                    products_to_update_stock.append(
-                        {"id": product_id, "quantity": quantity_sold}
-                    )
-
-                    full_product_details = self.db_manager.get_product_by_id(product_id)
-                    if full_product_details:
-                        avg_price = full_product_details["average_purchase_price"] or 0
-                        cogs_for_this_item = quantity_sold * avg_price
 
                 extra_costs_list = [
                     dict(fee) for fee in p_data_container.get("extra_costs", [])
                 ]
+                # بهای تمام شده و کسر موجودی کالاهای دارای product_id داخل
+                # همان تراکنش save_invoice انجام می‌شود.
                 item_dict = {
+                    "product_id": product_id,
                     "description": self.items_table.item(row, 0).text(),
                     "quantity": quantity_sold,
                     "unit": product_info["unit"],
-                    "unit_price": float(self.items_table.item(row, 2).text()),
+                    "unit_price": Money(self.items_table.item(row, 2).text()),
                     "discount_percent": float(self.items_table.item(row, 4).text()),
                     "tax_percent": float(self.items_table.item(row, 7).text()),
                     "extra_costs": extra_costs_list,
-                    "cost_of_good_sold": cogs_for_this_item,
                 }
                 items_data_to_save.append(item_dict)
             except (ValueError, TypeError, AttributeError, KeyError) as e:
@@ -247,41 +241,26 @@ class InvoiceDialog(QDialog):
                 )
                 return
 
+        cheque_data = None
+        if payment_method == "چکی":
+            cheque_data = {
+                "type": "دریافتی",
+                "cheque_number": cheque_info["number"],
+                "bank_name": cheque_info["bank"],
+                "amount": grand_total,
+                "issue_date": invoice_data["issue_date"],
+                "due_date": cheque_info["due_date"],
+                "status": "در انتظار وصول",
+                "description": None,
+            }
+
         success, msg, new_invoice_id = self.db_manager.save_invoice(
-            invoice_data, items_data_to_save
+            invoice_data, items_data_to_save, cheque_data
         )
 
         if success:
-            for product in products_to_update_stock:
-                update_success, update_msg = self.db_manager.decrease_product_stock(
-                    product["id"], product["quantity"]
-                )
-                if not update_success:
-                    QMessageBox.warning(self, "خطای انبار", update_msg)
-
-            if payment_method == "چکی":
-                cheque_amount = grand_total
-                cheque_data = {
-                    "type": "دریافتی",
-                    "cheque_number": cheque_info["number"],
-                    "bank_name": cheque_info["bank"],
-                    "amount": cheque_amount,
-                    "issue_date": invoice_data["issue_date"],
-                    "due_date": cheque_info["due_date"],
-                    "status": "در انتظار وصول",
-                    "description": f"مربوط به فاکتور شماره {new_invoice_id}",
-                    "invoice_id": new_invoice_id,
-                }
-                cheque_success, cheque_msg = self.db_manager.add_cheque(cheque_data)
-                if cheque_success:
-                    QMessageBox.information(
-                        self,
-                        "ثبت چک",
-                        f"چک به شماره {cheque_info['number']} با موفقیت ثبت شد.",
-                    )
-                else:
-                    QMessageBox.critical(self, "خطا در ثبت چک", cheque_msg)
-
+            if cheque_data:
+                msg += f"\nچک به شماره {cheque_info['number']} نیز ثبت شد."
             QMessageBox.information(self, "موفقیت", msg)
             signal_bus.invoice_saved.emit()
             signal_bus.product_saved.emit()
@@ -401,26 +380,25 @@ class InvoiceDialog(QDialog):
                     quantity = available_stock
 
             self.items_table.blockSignals(True)
-            unit_price = float(self.items_table.item(row, 2).text())
-            discount_percent = float(self.items_table.item(row, 4).text())
-            tax_percent = float(self.items_table.item(row, 7).text())
-
-            total_amount = quantity * unit_price
-            discount_amount = total_amount * (discount_percent / 100)
-            total_after_discount = total_amount - discount_amount
-            tax_amount = total_after_discount * (tax_percent / 100)
-
-            extra_fees_sum = 0
-            tooltip_text = ""
-            if p_data_container and "extra_costs" in p_data_container:
-                for fee in p_data_container["extra_costs"]:
-                    fee_amount = (
-                        fee["value"]
-                        if fee["type"] == "amount"
-                        else total_after_discount * (fee["value"] / 100)
-                    )
-                    extra_fees_sum += fee_amount
-                    tooltip_text += f"{fee['name']}: {fee_amount:,.0f} ریال\n"
+            line = invoice_line(
+                quantity,
+                Money(self.items_table.item(row, 2).text()),
+                float(self.items_table.item(row, 4).text()),
+                float(self.items_table.item(row, 7).text()),
+                (p_data_container or {}).get("extra_costs", []),
+            )
+            tooltip_text = "".join(
+                f"{fee['name']}: {amount.display()}\n" for fee, amount in line["fees"]
+            )
+            # مبالغ محاسبه شده کنار داده ردیف نگه داشته می‌شوند تا جمع فاکتور
+            # بدون خواندن دوباره متن سلول‌ها محاسبه شود.
+            if p_data_container is not None:
+                p_data_container["line"] = {
+                    key: value for key, value in line.items() if key != "fees"
+                }
+                self.items_table.item(row, 0).setData(
+                    Qt.ItemDataRole.UserRole, p_data_container
+                )
 
             def create_readonly_item(text, tooltip=None):
                 item = QTableWidgetItem(text)
@@ -430,20 +408,18 @@ class InvoiceDialog(QDialog):
                     item.setToolTip(tooltip)
                 return item
 
+            self.items_table.setItem(row, 3, create_readonly_item(str(line["total"])))
             self.items_table.setItem(
-                row, 3, create_readonly_item(f"{total_amount:,.0f}")
+                row, 5, create_readonly_item(str(line["discount"]))
             )
             self.items_table.setItem(
-                row, 5, create_readonly_item(f"{discount_amount:,.0f}")
+                row, 6, create_readonly_item(str(line["after_discount"]))
             )
-            self.items_table.setItem(
-                row, 6, create_readonly_item(f"{total_after_discount:,.0f}")
-            )
-            self.items_table.setItem(row, 8, create_readonly_item(f"{tax_amount:,.0f}"))
+            self.items_table.setItem(row, 8, create_readonly_item(str(line["tax"])))
             self.items_table.setItem(
                 row,
                 9,
-                create_readonly_item(f"{extra_fees_sum:,.0f}", tooltip_text.strip()),
+                create_readonly_item(str(line["fees_total"]), tooltip_text.strip()),
             )
 
         except (ValueError, TypeError, AttributeError):
@@ -454,36 +430,20 @@ class InvoiceDialog(QDialog):
         self.update_summary_totals()
 
     def update_summary_totals(self):
-        total_sum, discount_sum, total_after_discount_sum, tax_sum, other_fees_sum = (
-            0,
-            0,
-            0,
-            0,
-            0,
-        )
+        keys = ["total", "discount", "after_discount", "tax", "fees_total"]
+        sums = {key: Money(0) for key in keys}
         for row in range(self.items_table.rowCount()):
-            try:
-                total_sum += float(
-                    self.items_table.item(row, 3).text().replace(",", "")
-                )
-                discount_sum += float(
-                    self.items_table.item(row, 5).text().replace(",", "")
-                )
-                total_after_discount_sum += float(
-                    self.items_table.item(row, 6).text().replace(",", "")
-                )
-                tax_sum += float(self.items_table.item(row, 8).text().replace(",", ""))
-                other_fees_sum += float(
-                    self.items_table.item(row, 9).text().replace(",", "")
-                )
-            except (ValueError, TypeError, AttributeError):
+            item = self.items_table.item(row, 0)
+            p_data_container = item.data(Qt.ItemDataRole.UserRole) if item else None
+            line = (p_data_container or {}).get("line")
+            if not line:
                 continue
-        grand_total = total_after_discount_sum + tax_sum + other_fees_sum
-        self.total_sum_label.setText(f"{total_sum:,.0f} ریال")
-        self.discount_sum_label.setText(f"{discount_sum:,.0f} ریال")
-        self.total_after_discount_sum_label.setText(
-            f"{total_after_discount_sum:,.0f} ریال"
-        )
-        self.tax_sum_label.setText(f"{tax_sum:,.0f} ریال")
-        self.other_fees_sum_label.setText(f"{other_fees_sum:,.0f} ریال")
-        self.grand_total_label.setText(f"{grand_total:,.0f} ریال")
+            for key in keys:
+                sums[key] += line[key]
+        self.grand_total = sums["after_discount"] + sums["tax"] + sums["fees_total"]
+        self.total_sum_label.setText(sums["total"].display())
+        self.discount_sum_label.setText(sums["discount"].display())
+        self.total_after_discount_sum_label.setText(sums["after_discount"].display())
+        self.tax_sum_label.setText(sums["tax"].display())
+        self.other_fees_sum_label.setText(sums["fees_total"].display())
+        self.grand_total_label.setText(self.grand_total.display())
@@ -11,6 +11,7 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt
 from signal_bus import signal_bus
+from money import Money
 
 
 class PaymentDialog(QDialog):
@@ -58,7 +59,7 @@ class PaymentDialog(QDialog):
             return
 
         try:
-            amount = float(amount_text)
+            amount = Money(amount_text)
             if amount <= 0:
                 QMessageBox.warning(self, "خطا", "مبلغ پرداختی باید یک عدد مثبت باشد.")
                 return
@@ -15,6 +15,7 @@ from PySide6.QtWidgets import (
 from PySide6.QtGui import QIcon
 from PySide6.QtCore import Qt
 from signal_bus import signal_bus
+from money import Money
 
 
 class ProductDialog(QDialog):
@@ -116,7 +117,7 @@ class ProductDialog(QDialog):
         unit = self.unit_input.currentText().strip()
         unit_price_text = self.unit_price_input.text().strip()
         try:
-            unit_price = float(unit_price_text)
+            unit_price = Money(unit_price_text)
         except ValueError:
             QMessageBox.warning(
                 self, "خطا", "لطفاً برای قیمت واحد یک عدد معتبر وارد کنید."
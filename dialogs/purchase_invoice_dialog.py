@@ -18,6 +18,7 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt
 from signal_bus import signal_bus
+from money import Money
 
 
 class PurchaseInvoiceDialog(QDialog):
@@ -101,7 +102,7 @@ class PurchaseInvoiceDialog(QDialog):
             self.update_totals()
 
     def update_totals(self, row=None, column=None):
-        grand_total = 0
+        grand_total = Money(0)
         for r in range(self.items_table.rowCount()):
             try:
                 quantity_item = self.items_table.item(r, 1)
@@ -113,15 +114,14 @@ class PurchaseInvoiceDialog(QDialog):
                     and price_item.text()
                 ):
                     quantity = float(quantity_item.text())
-                    price = float(price_item.text())
-                    total = quantity * price
+                    total = Money(price_item.text()).times(quantity)
                     self.items_table.blockSignals(True)
-                    self.items_table.setItem(r, 3, QTableWidgetItem(f"{total:,.0f}"))
+                    self.items_table.setItem(r, 3, QTableWidgetItem(str(total)))
                     self.items_table.blockSignals(False)
                     grand_total += total
             except (ValueError, TypeError, AttributeError):
                 continue
-        self.total_amount_label.setText(f"جمع کل فاکتور: {grand_total:,.0f} ریال")
+        self.total_amount_label.setText(f"جمع کل فاکتور: {grand_total.display()}")
 
     def save_invoice(self):
         supplier_id = self.supplier_combo.currentData()
@@ -130,8 +130,7 @@ class PurchaseInvoiceDialog(QDialog):
             return
 
         items_to_save = []
-        products_to_update = []
-        grand_total = 0
+        grand_total = Money(0)
 
         for row in range(self.items_table.rowCount()):
             product_combo = self.items_table.cellWidget(row, 0)
@@ -140,7 +139,7 @@ class PurchaseInvoiceDialog(QDialog):
 
             try:
                 quantity = float(self.items_table.item(row, 1).text())
-                purchase_price = float(self.items_table.item(row, 2).text())
+                purchase_price = Money(self.items_table.item(row, 2).text())
                 if quantity <= 0 or purchase_price < 0:
                     QMessageBox.warning(
                         self,
@@ -151,15 +150,13 @@ class PurchaseInvoiceDialog(QDialog):
 
                 items_to_save.append(
                     {
+                        "product_id": product_id,
                         "product_name": product_name,
                         "quantity": quantity,
                         "purchase_price": purchase_price,
                     }
                 )
-                products_to_update.append(
-                    {"id": product_id, "quantity": quantity, "price": purchase_price}
-                )
-                grand_total += quantity * purchase_price
+                grand_total += purchase_price.times(quantity)
             except (ValueError, TypeError, AttributeError):
                 QMessageBox.warning(self, "خطا", f"مقادیر در ردیف {row+1} نامعتبر است.")
                 return
@@ -182,11 +179,6 @@ class PurchaseInvoiceDialog(QDialog):
         )
 
         if success:
-            for product in products_to_update:
-                self.db_manager.update_product_after_purchase(
-                    product["id"], product["quantity"], product["price"]
-                )
-
             QMessageBox.information(self, "موفقیت", msg)
             signal_bus.purchase_invoice_saved.emit()
             signal_bus.product_saved.emit()
@@ -0,0 +1,325 @@
+# file: incremental_backup.py
+"""
+نسخه‌های پشتیبان افزایشی (در سطح صفحه‌های دیتابیس). هر نسخه (snapshot) ابتدا با
+backup_engine به صورت یک تصویر سازگار از دیتابیس گرفته می‌شود، سپس هش هر صفحه با
+نسخه قبلی مقایسه شده و فقط صفحه‌های تغییر کرده (فشرده) در مخزن ذخیره می‌شوند.
+پس حجم هر نسخه به اندازه تغییرات آن روز بستگی دارد نه به کل سابقه دفاتر.
+
+ساختار پوشه مخزن:
+    packs/<شناسه نسخه>.pack      صفحه‌های جدید همان نسخه، هر کدام جداگانه با zlib فشرده
+    manifests/<شناسه نسخه>.json  نسخه والد، تعداد صفحه‌ها، هش صفحه‌های تغییر کرده و
+                                 محل صفحه‌های جدید در فایل pack
+هر نسخه با دنبال کردن زنجیره والدها از اولین نسخه تا خودش بازسازی می‌شود. manifest
+آخرین فایلی است که نوشته می‌شود؛ نسخه‌ای که manifest ندارد ناتمام است و حذف می‌شود.
+"""
+import datetime
+import hashlib
+import json
+import os
+import time
+import zlib
+
+from backup_engine import backup_database, check_database_integrity
+from db_worker import ProgressJob
+
+SNAPSHOT_DIR_NAME = "snapshots"
+MANIFEST_VERSION = 1
+# فشرده‌سازی سریع؛ صفحه‌های دیتابیس معمولاً چند برابر کوچک می‌شوند.
+PAGE_COMPRESSION_LEVEL = 1
+PAGE_HASH_SIZE = 16
+STAGING_FILE_NAME = "staging.db"
+
+
+class SnapshotError(Exception):
+    pass
+
+
+class SnapshotCancelled(Exception):
+    pass
+
+
+def default_snapshot_dir(db_path):
+    """مخزن نسخه‌های افزایشی در کنار فایل دیتابیس قرار می‌گیرد."""
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), SNAPSHOT_DIR_NAME)
+
+
+def _page_hash(page):
+    return hashlib.blake2b(page, digest_size=PAGE_HASH_SIZE).hexdigest()
+
+
+def _page_size_from_header(header):
+    # بایت‌های ۱۶ و ۱۷ سربرگ SQLite؛ مقدار ۱ یعنی ۶۵۵۳۶ بایت.
+    size = int.from_bytes(header[16:18], "big")
+    return 65536 if size == 1 else size
+
+
+def _write_json_atomic(path, data):
+    temp_path = path + ".part"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class SnapshotStore:
+    def __init__(self, root):
+        self.root = root
+        self.manifests_dir = os.path.join(root, "manifests")
+        self.packs_dir = os.path.join(root, "packs")
+
+    def _manifest_path(self, snapshot_id):
+        return os.path.join(self.manifests_dir, f"{snapshot_id}.json")
+
+    def _pack_path(self, pack_name):
+        return os.path.join(self.packs_dir, pack_name)
+
+    def _snapshot_ids(self):
+        if not os.path.isdir(self.manifests_dir):
+            return []
+        return sorted(
+            name[:-5]
+            for name in os.listdir(self.manifests_dir)
+            if name.endswith(".json")
+        )
+
+    def load_manifest(self, snapshot_id):
+        try:
+            with open(self._manifest_path(snapshot_id), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"فایل مشخصات نسخه {snapshot_id} خوانده نشد: {e}")
+
+    def list_snapshots(self):
+        """
+        مشخصات نسخه‌ها (بدون فهرست صفحه‌ها) از جدیدترین به قدیمی‌ترین: id، created،
+        db_size، changed_pages و stored_bytes.
+        """
+        snapshots = []
+        for snapshot_id in reversed(self._snapshot_ids()):
+            manifest = self.load_manifest(snapshot_id)
+            manifest.pop("pages", None)
+            manifest.pop("chunks", None)
+            snapshots.append(manifest)
+        return snapshots
+
+    def _resolve(self, snapshot_id):
+        """
+        زنجیره نسخه‌ها را از اولین نسخه تا snapshot_id اعمال کرده و (لیست هش صفحه‌ها،
+        دیکشنری هش -> (فایل pack، شروع، طول)، manifest خود نسخه) را برمی‌گرداند.
+        """
+        chain = []
+        current = snapshot_id
+        while current is not None:
+            manifest = self.load_manifest(current)
+            chain.append(manifest)
+            current = manifest.get("parent")
+
+        page_hashes, locations = [], {}
+        for manifest in reversed(chain):
+            pack_name = manifest.get("pack")
+            for page_hash, (offset, length) in manifest["chunks"].items():
+                locations[page_hash] = (pack_name, offset, length)
+            page_count = manifest["page_count"]
+            del page_hashes[page_count:]
+            page_hashes.extend([None] * (page_count - len(page_hashes)))
+            for page_number, page_hash in manifest["pages"].items():
+                page_hashes[int(page_number)] = page_hash
+        return page_hashes, locations, chain[0]
+
+    def _remove_incomplete(self):
+        """فایل‌های pack و staging نسخه‌هایی که پیش از نوشتن manifest متوقف شده‌اند."""
+        known = set(self._snapshot_ids())
+        for name in os.listdir(self.manifests_dir):
+            if name.endswith(".part"):
+                os.remove(os.path.join(self.manifests_dir, name))
+        if os.path.isdir(self.packs_dir):
+            for name in os.listdir(self.packs_dir):
+                if name.split(".", 1)[0] not in known:
+                    os.remove(self._pack_path(name))
+        for name in (STAGING_FILE_NAME, STAGING_FILE_NAME + ".part"):
+            path = os.path.join(self.root, name)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _new_snapshot_id(self):
+        base = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        snapshot_id, counter = base, 1
+        while os.path.exists(self._manifest_path(snapshot_id)):
+            counter += 1
+            snapshot_id = f"{base}-{counter}"
+        return snapshot_id
+
+    def create_snapshot(self, db_path, progress=None, is_cancelled=None):
+        """
+        یک نسخه افزایشی از دیتابیس db_path می‌سازد و manifest آن (بدون فهرست صفحه‌ها)
+        را برمی‌گرداند. progress(انجام شده، کل) برای دو مرحله گرفتن تصویر سازگار و
+        مقایسه صفحه‌ها فراخوانی می‌شود.
+        """
+        started = time.monotonic()
+        os.makedirs(self.manifests_dir, exist_ok=True)
+        os.makedirs(self.packs_dir, exist_ok=True)
+        self._remove_incomplete()
+
+        snapshot_ids = self._snapshot_ids()
+        parent = snapshot_ids[-1] if snapshot_ids else None
+        if parent is None:
+            previous_hashes, locations = [], {}
+        else:
+            previous_hashes, locations, _ = self._resolve(parent)
+
+        staging_path = os.path.join(self.root, STAGING_FILE_NAME)
+        snapshot_id = self._new_snapshot_id()
+        pack_name = f"{snapshot_id}.pack"
+        pack_path = self._pack_path(pack_name)
+        try:
+            # مرحله اول: تصویر سازگار و بررسی شده از دیتابیس زنده.
+            backup_database(
+                db_path,
+                staging_path,
+                progress=(
+                    (lambda done, total: progress(done, total * 2))
+                    if progress
+                    else None
+                ),
+                is_cancelled=is_cancelled,
+            )
+
+            # مرحله دوم: فقط صفحه‌هایی که هششان با نسخه قبلی فرق دارد ذخیره می‌شوند.
+            db_size = os.path.getsize(staging_path)
+            changed_pages, new_chunks = {}, {}
+            with open(staging_path, "rb") as staging, open(pack_path, "wb") as pack:
+                page_size = _page_size_from_header(staging.read(100))
+                page_count = db_size // page_size
+                staging.seek(0)
+                last_report = 0.0
+                for page_number in range(page_count):
+                    page = staging.read(page_size)
+                    page_hash = _page_hash(page)
+                    if (
+                        page_number < len(previous_hashes)
+                        and previous_hashes[page_number] == page_hash
+                    ):
+                        continue
+                    changed_pages[str(page_number)] = page_hash
+                    if page_hash not in locations and page_hash not in new_chunks:
+                        data = zlib.compress(page, PAGE_COMPRESSION_LEVEL)
+                        new_chunks[page_hash] = [pack.tell(), len(data)]
+                        pack.write(data)
+                    now = time.monotonic()
+                    if now - last_report >= 0.1:
+                        last_report = now
+                        if is_cancelled is not None and is_cancelled():
+                            raise SnapshotCancelled()
+                        if progress is not None:
+                            progress(page_count + page_number, page_count * 2)
+                pack.flush()
+                os.fsync(pack.fileno())
+                stored_bytes = pack.tell()
+            if not new_chunks:
+                os.remove(pack_path)
+
+            manifest = {
+                "version": MANIFEST_VERSION,
+                "id": snapshot_id,
+                "parent": parent,
+                "created": datetime.datetime.now().isoformat(timespec="seconds"),
+                "page_size": page_size,
+                "page_count": page_count,
+                "db_size": db_size,
+                "changed_pages": len(changed_pages),
+                "stored_bytes": stored_bytes,
+                "seconds": round(time.monotonic() - started, 3),
+                "pack": pack_name if new_chunks else None,
+                "pages": changed_pages,
+                "chunks": new_chunks,
+            }
+            _write_json_atomic(self._manifest_path(snapshot_id), manifest)
+        except BaseException:
+            if os.path.exists(pack_path):
+                os.remove(pack_path)
+            raise
+        finally:
+            if os.path.exists(staging_path):
+                os.remove(staging_path)
+
+        if progress is not None:
+            progress(page_count * 2, page_count * 2)
+        del manifest["pages"], manifest["chunks"]
+        return manifest
+
+    def restore_snapshot(
+        self, snapshot_id, target_path, progress=None, is_cancelled=None
+    ):
+        """
+        فایل دیتابیس نسخه snapshot_id را در target_path بازسازی می‌کند. هش هر صفحه
+        هنگام خواندن و صحت فایل نهایی با integrity_check بررسی می‌شود.
+        """
+        page_hashes, locations, manifest = self._resolve(snapshot_id)
+        page_count = manifest["page_count"]
+        temp_path = target_path + ".part"
+        packs = {}
+        try:
+            with open(temp_path, "wb") as target:
+                last_report = 0.0
+                for page_number, page_hash in enumerate(page_hashes):
+                    if page_hash not in locations:
+                        raise SnapshotError(
+                            f"صفحه {page_number} نسخه {snapshot_id} در مخزن یافت نشد."
+                        )
+                    pack_name, offset, length = locations[page_hash]
+                    pack = packs.get(pack_name)
+                    if pack is None:
+                        pack = packs[pack_name] = open(self._pack_path(pack_name), "rb")
+                    pack.seek(offset)
+                    page = zlib.decompress(pack.read(length))
+                    if _page_hash(page) != page_hash:
+                        raise SnapshotError(
+                            f"صفحه {page_number} نسخه {snapshot_id} خراب شده است."
+                        )
+                    target.write(page)
+                    now = time.monotonic()
+                    if now - last_report >= 0.1:
+                        last_report = now
+                        if is_cancelled is not None and is_cancelled():
+                            raise SnapshotCancelled()
+                        if progress is not None:
+                            progress(page_number, page_count)
+                target.flush()
+                os.fsync(target.fileno())
+            problems = check_database_integrity(temp_path)
+            if problems:
+                raise SnapshotError(
+                    "بررسی صحت نسخه بازسازی شده ناموفق بود:\n"
+                    + "\n".join(problems[:10])
+                )
+            os.replace(temp_path, target_path)
+        except BaseException:
+            for path in (temp_path, temp_path + "-journal"):
+                if os.path.exists(path):
+                    os.remove(path)
+            raise
+        finally:
+            for pack in packs.values():
+                pack.close()
+
+        if progress is not None:
+            progress(page_count, page_count)
+        return {"path": target_path, "snapshot": snapshot_id, "pages": page_count}
+
+
+class SnapshotJob(ProgressJob):
+    """
+    ساخت و بازسازی نسخه‌های افزایشی را روی ترد کارگر اجرا می‌کند؛ finished خروجی
+    create_snapshot یا restore_snapshot را می‌دهد.
+    """
+
+    def __init__(self, db_manager, parent=None):
+        super().__init__(db_manager, parent)
+        self.store = SnapshotStore(default_snapshot_dir(db_manager.db_name))
+
+    def create(self):
+        self.run(self.store.create_snapshot, self.db_manager.db_name)
+
+    def restore(self, snapshot_id, target_path):
+        self.run(self.store.restore_snapshot, snapshot_id, target_path)
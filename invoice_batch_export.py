@@ -0,0 +1,166 @@
+# file: invoice_batch_export.py
+"""
+خروجی PDF گروهی فاکتورها. ساخت PDF (شکل‌دهی متن فارسی و چیدمان ReportLab) کاملاً
+پردازنده‌محور است، پس فاکتورها بین پردازه‌های یک ProcessPoolExecutor پخش می‌شوند تا
+سرعت با تعداد هسته‌های پردازنده بالا برود و رابط کاربری هم قفل نشود.
+
+پردازه‌ها با روش spawn ساخته می‌شوند (روی همه سیستم‌عامل‌ها یکسان و بدون fork گرفتن
+از پردازه‌ای که تردهای Qt دارد)؛ به همین دلیل توابع کارگر در سطح ماژول تعریف شده‌اند.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from PySide6.QtCore import QObject, Signal
+
+# ProcessPoolExecutor در ویندوز بیش از ۶۱ پردازه نمی‌پذیرد.
+MAX_EXPORT_WORKERS = 61
+
+_worker_renderer = None
+
+
+def _init_worker(company_info, page_size_str):
+    """
+    InvoiceRenderer (فونت‌ها، استایل‌ها، بلوک فروشنده و لوگو) یک بار برای هر پردازه
+    ساخته می‌شود و همه فاکتورهای آن پردازه از آن استفاده می‌کنند.
+    """
+    global _worker_renderer
+    from pdf_generator import InvoiceRenderer
+
+    _worker_renderer = InvoiceRenderer(company_info, page_size_str)
+
+
+def _render_invoice(invoice_details, items_data, file_path):
+    result, success = _worker_renderer.render(invoice_details, items_data, file_path)
+    return invoice_details["id"], result, success
+
+
+def _render_merged(invoices, file_path):
+    result, success = _worker_renderer.render_merged(invoices, file_path)
+    return None, result, success
+
+
+def invoice_file_name(invoice_details):
+    return f"INV-{invoice_details['id']:04d}.pdf"
+
+
+class InvoiceBatchExporter(QObject):
+    """
+    فاکتورها را روی پردازه‌های جدا به PDF تبدیل کرده و پیشرفت کار را با سیگنال‌ها
+    (روی ترد اصلی) اطلاع می‌دهد.
+
+    progress(انجام شده، کل) پس از هر فاکتور و finished(فایل‌ها، خطاها، لغو شده) یک بار
+    در پایان کار یا پس از cancel منتشر می‌شود؛ خطاها لیست (شماره فاکتور، متن خطا) هستند.
+    """
+
+    progress = Signal(int, int)
+    finished = Signal(list, list, bool)
+    # نتیجه هر future از ترد مدیریت executor به ترد اصلی منتقل می‌شود.
+    _job_done = Signal(int, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._executor = None
+        self._futures = []
+        self._generation = 0
+        self._total = 0
+        self._done = 0
+        self._files = []
+        self._errors = []
+        self._job_done.connect(self._on_job_done)
+
+    def is_running(self):
+        return self._executor is not None
+
+    def start(self, invoices, company_info, page_size_str, output, merged=False):
+        """
+        invoices لیست (جزئیات فاکتور، لیست اقلام) خروجی get_invoices_for_export است.
+        در حالت merged، output مسیر فایل واحد و در غیر این صورت پوشه خروجی است که
+        هر فاکتور با نام INV-xxxx.pdf در آن ذخیره می‌شود.
+        """
+        self.cancel()
+        self._generation += 1
+        self._done = 0
+        self._files, self._errors = [], []
+        self._total = 1 if merged else len(invoices)
+        if not invoices:
+            self.finished.emit([], [], False)
+            return
+
+        workers = 1 if merged else min(len(invoices), os.cpu_count() or 1)
+        self._executor = ProcessPoolExecutor(
+            max_workers=min(workers, MAX_EXPORT_WORKERS),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(company_info, page_size_str),
+        )
+        if merged:
+            jobs = [(_render_merged, invoices, output)]
+        else:
+            os.makedirs(output, exist_ok=True)
+            jobs = [
+                (
+                    _render_invoice,
+                    details,
+                    items,
+                    os.path.join(output, invoice_file_name(details)),
+                )
+                for details, items in invoices
+            ]
+
+        generation = self._generation
+        self.progress.emit(0, self._total)
+        for fn, *args in jobs:
+            future = self._executor.submit(fn, *args)
+            self._futures.append(future)
+            future.add_done_callback(
+                lambda f, generation=generation: self._notify(generation, f)
+            )
+
+    def cancel(self):
+        """
+        فاکتورهای شروع نشده لغو می‌شوند؛ فاکتوری که در حال ساخت است تمام شده و
+        پردازه‌ها بسته می‌شوند. فایل‌های ساخته شده تا این لحظه باقی می‌مانند.
+        """
+        if self._executor is None:
+            return
+        self._generation += 1
+        for future in self._futures:
+            future.cancel()
+        self._shutdown()
+        self.finished.emit(self._files, self._errors, True)
+
+    def _shutdown(self):
+        executor, self._executor = self._executor, None
+        self._futures = []
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _notify(self, generation, future):
+        # روی ترد مدیریت executor اجرا می‌شود؛ نتیجه کارهای لغو شده اصلاً فرستاده
+        # نمی‌شود تا پس از بسته شدن دیالوگ سیگنالی به شیء حذف شده نرسد.
+        if generation != self._generation:
+            return
+        try:
+            self._job_done.emit(generation, future)
+        except RuntimeError:
+            pass
+
+    def _on_job_done(self, generation, future):
+        if generation != self._generation or future.cancelled():
+            return
+        try:
+            invoice_id, result, success = future.result()
+        except Exception as e:
+            # مثلاً BrokenProcessPool اگر پردازه کارگر ناگهان بسته شود.
+            invoice_id, result, success = None, str(e), False
+        if success:
+            self._files.append(result)
+        else:
+            self._errors.append((invoice_id, result))
+
+        self._done += 1
+        self.progress.emit(self._done, self._total)
+        if self._done >= self._total:
+            self._shutdown()
+            self.finished.emit(self._files, self._errors, False)
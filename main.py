@@ -1,8 +1,14 @@
 # file: main.py
 import sys
+import startup_profiler
+
+# پروفایل شروع برنامه باید پیش از بقیه importها فعال شود تا زمان آن‌ها هم ثبت شود.
+startup_profiler.enable_if_requested(sys.argv)
+
+import importlib
+import multiprocessing
 import os
 import jdatetime
-import sqlite3
 from PySide6.QtWidgets import (
     QApplication,
     QMainWindow,
@@ -21,53 +27,31 @@ from utils import get_app_data_path
 from utils import resource_path
 
 
-from database_setup import create_database
 from db_updater import run_migrations
 
 from db_manager import DatabaseManager
+from db_pool import close_all_pools
+from db_worker import stop_db_thread_pool
 from auth_ui import AuthWindow
-from pages.dashboard_page import DashboardPage
-from pages.customers_page import CustomersPage
-from pages.invoices_page import InvoicesPage
-from pages.products_page import ProductsPage
-from pages.reports_page import ReportsPage
-from pages.settings_page import SettingsPage
-from pages.expenses_page import ExpensesPage
-from pages.profile_page import ProfilePage
-from pages.cheques_page import ChequesPage
-from pages.suppliers_page import SuppliersPage
-from pages.purchase_invoices_page import PurchaseInvoicesPage
-from dialogs.help_dialog import HelpDialog
-from dialogs.about_dialog import AboutDialog
+from signal_bus import signal_bus
 
 DB_NAME = get_app_data_path("accounting.db")
 
 
 def initialize_database():
     """
-    بررسی می‌کند که آیا دیتابیس به درستی ساخته شده یا نه.
+    ساختار دیتابیس را با آخرین نسخه مهاجرت‌ها هماهنگ می‌کند.
+    دیتابیس جدید از نسخه ۰ ساخته می‌شود و دیتابیس به‌روز فقط با یک PRAGMA بررسی می‌شود.
     """
-    db_conn = None
-    try:
-        db_conn = sqlite3.connect(DB_NAME)
-        cursor = db_conn.cursor()
-        cursor.execute(
-            "SELECT name FROM sqlite_master WHERE type='table' AND name='users';"
-        )
-        table_exists = cursor.fetchone()
-
-        if not table_exists:
-            create_database(DB_NAME)
-        else:
-            run_migrations(DB_NAME)
+    run_migrations(DB_NAME)
 
-    except sqlite3.Error as e:
-        print(f"خطای جدی در اتصال یا آماده‌سازی دیتابیس: {e}")
-    finally:
-        if db_conn:
-            db_conn.close()
 
-    print("آماده‌سازی دیتابیس به پایان رسید.")
+def _lazy_page(module_name, class_name, *args):
+    """
+    سازنده صفحه‌ای را برمی‌گرداند که ماژولش تازه هنگام ساخت صفحه import می‌شود؛
+    وابستگی‌های سنگین صفحات (مثل reportlab برای PDF) تا باز شدن همان صفحه بارگذاری نمی‌شوند.
+    """
+    return lambda: getattr(importlib.import_module(module_name), class_name)(*args)
 
 
 class AppMainWindow(QMainWindow):
@@ -200,83 +184,115 @@ class AppMainWindow(QMainWindow):
         self.credit_label.setStyleSheet("padding-left: 10px; padding-right: 10px;")
         self.statusBar.addPermanentWidget(self.credit_label)
         self.credit_label.mousePressEvent = self.open_about_dialog
-        self.dashboard_page = DashboardPage(db_manager_for_pages)
-        self.customers_page = CustomersPage(db_manager_for_pages)
-        self.invoices_page = InvoicesPage(db_manager_for_pages)
-        self.products_page = ProductsPage(db_manager_for_pages)
-        self.expenses_page = ExpensesPage(db_manager_for_pages)
-        self.cheques_page = ChequesPage(db_manager_for_pages)
-        self.suppliers_page = SuppliersPage(db_manager_for_pages)
-        self.purchase_invoices_page = PurchaseInvoicesPage(db_manager_for_pages)
-        self.reports_page = ReportsPage(db_manager_for_pages)
-        self.profile_page = ProfilePage()
-        self.settings_page = SettingsPage()
-
-        self.main_content.addWidget(self.dashboard_page)  # ایندکس ۰
-        self.main_content.addWidget(self.customers_page)  # ایندکس ۱
-        self.main_content.addWidget(self.suppliers_page)  # ایندکس ۲
-        self.main_content.addWidget(self.invoices_page)  # ایندکس ۳
-        self.main_content.addWidget(self.purchase_invoices_page)  # ایندکس ۴
-        self.main_content.addWidget(self.products_page)  # ایندکس ۵
-        self.main_content.addWidget(self.expenses_page)  # ایندکس ۶
-        self.main_content.addWidget(self.cheques_page)  # ایندکس ۷
-        self.main_content.addWidget(self.reports_page)  # ایندکس ۸
-        self.main_content.addWidget(self.profile_page)  # ایندکس ۹
-        self.main_content.addWidget(self.settings_page)  # ایندکس ۱۰
-
-        self.btn_dashboard.clicked.connect(lambda: self.main_content.setCurrentIndex(0))
-        self.btn_customers.clicked.connect(lambda: self.main_content.setCurrentIndex(1))
-        self.btn_suppliers.clicked.connect(lambda: self.main_content.setCurrentIndex(2))
-        self.btn_sales_invoices.clicked.connect(
-            lambda: self.main_content.setCurrentIndex(3)
-        )
-        self.btn_purchase_invoices.clicked.connect(
-            lambda: self.main_content.setCurrentIndex(4)
-        )
-        self.btn_products.clicked.connect(lambda: self.main_content.setCurrentIndex(5))
-        self.btn_expenses.clicked.connect(lambda: self.main_content.setCurrentIndex(6))
-        self.btn_cheques.clicked.connect(lambda: self.main_content.setCurrentIndex(7))
-        self.btn_reports.clicked.connect(lambda: self.main_content.setCurrentIndex(8))
-        self.btn_profile.clicked.connect(lambda: self.main_content.setCurrentIndex(9))
-        self.btn_settings.clicked.connect(lambda: self.main_content.setCurrentIndex(10))
-        self.btn_help.clicked.connect(self.open_help_dialog)
 
-        self.dashboard_page.add_invoice_requested.connect(
-            self.handle_add_invoice_request
-        )
-        self.dashboard_page.add_customer_requested.connect(
-            self.handle_add_customer_request
-        )
-        self.dashboard_page.add_expense_requested.connect(
-            self.handle_add_expense_request
-        )
+        # صفحات فقط در اولین نمایش ساخته می‌شوند (متد page)؛ تا آن زمان هر جایگاه
+        # QStackedWidget یک ویجت خالی نگه می‌دارد. ترتیب لیست همان ایندکس صفحه است.
+        self._page_factories = [
+            lambda: self._create_dashboard_page(db_manager_for_pages),  # ایندکس ۰
+            _lazy_page("pages.customers_page", "CustomersPage", db_manager_for_pages),
+            _lazy_page("pages.suppliers_page", "SuppliersPage", db_manager_for_pages),
+            _lazy_page("pages.invoices_page", "InvoicesPage", db_manager_for_pages),
+            _lazy_page(
+                "pages.purchase_invoices_page",
+                "PurchaseInvoicesPage",
+                db_manager_for_pages,
+            ),  # ایندکس ۴
+            _lazy_page("pages.products_page", "ProductsPage", db_manager_for_pages),
+            _lazy_page("pages.expenses_page", "ExpensesPage", db_manager_for_pages),
+            _lazy_page("pages.cheques_page", "ChequesPage", db_manager_for_pages),
+            _lazy_page("pages.reports_page", "ReportsPage", db_manager_for_pages),
+            _lazy_page("pages.profile_page", "ProfilePage"),  # ایندکس ۹
+            _lazy_page("pages.settings_page", "SettingsPage"),  # ایندکس ۱۰
+        ]
+        self._pages = {}
+        for _ in self._page_factories:
+            self.main_content.addWidget(QWidget())
+
+        self.btn_dashboard.clicked.connect(lambda: self.show_page(0))
+        self.btn_customers.clicked.connect(lambda: self.show_page(1))
+        self.btn_suppliers.clicked.connect(lambda: self.show_page(2))
+        self.btn_sales_invoices.clicked.connect(lambda: self.show_page(3))
+        self.btn_purchase_invoices.clicked.connect(lambda: self.show_page(4))
+        self.btn_products.clicked.connect(lambda: self.show_page(5))
+        self.btn_expenses.clicked.connect(lambda: self.show_page(6))
+        self.btn_cheques.clicked.connect(lambda: self.show_page(7))
+        self.btn_reports.clicked.connect(lambda: self.show_page(8))
+        self.btn_profile.clicked.connect(lambda: self.show_page(9))
+        self.btn_settings.clicked.connect(lambda: self.show_page(10))
+        self.btn_help.clicked.connect(self.open_help_dialog)
 
         self.btn_dashboard.setChecked(True)
+        self.show_page(0)
         self.main_content.currentChanged.connect(self.on_tab_changed)
+        signal_bus.database_restored.connect(self.reload_pages)
         main_layout.addWidget(side_menu)
         main_layout.addWidget(self.main_content)
         self.setCentralWidget(main_widget)
         self.on_tab_changed(0)
 
+    def _create_dashboard_page(self, db_manager):
+        page = _lazy_page("pages.dashboard_page", "DashboardPage", db_manager)()
+        page.add_invoice_requested.connect(self.handle_add_invoice_request)
+        page.add_customer_requested.connect(self.handle_add_customer_request)
+        page.add_expense_requested.connect(self.handle_add_expense_request)
+        return page
+
+    def page(self, index):
+        """صفحه index را برمی‌گرداند و در اولین درخواست آن را ساخته و جایگزین ویجت خالی می‌کند."""
+        page = self._pages.get(index)
+        if page is None:
+            page = self._page_factories[index]()
+            placeholder = self.main_content.widget(index)
+            # جابجایی ویجت‌ها نباید on_tab_changed را برای صفحه‌ای که نمایش داده نمی‌شود صدا بزند.
+            self.main_content.blockSignals(True)
+            self.main_content.insertWidget(index, page)
+            self.main_content.removeWidget(placeholder)
+            self.main_content.blockSignals(False)
+            placeholder.deleteLater()
+            self._pages[index] = page
+        return page
+
+    def reload_pages(self):
+        """
+        پس از بازیابی دیتابیس، صفحه‌های ساخته شده (به جز صفحه فعلی) کنار گذاشته
+        می‌شوند تا در نمایش بعدی با اطلاعات جدید دوباره ساخته شوند.
+        """
+        current = self.main_content.currentWidget()
+        self.main_content.blockSignals(True)
+        for index, page in list(self._pages.items()):
+            if page is current:
+                continue
+            self.main_content.insertWidget(index, QWidget())
+            self.main_content.removeWidget(page)
+            page.deleteLater()
+            del self._pages[index]
+        self.main_content.blockSignals(False)
+        self.on_tab_changed(self.main_content.currentIndex())
+
+    def show_page(self, index):
+        """صفحه index را (در صورت نیاز پس از ساختن آن) نمایش می‌دهد."""
+        page = self.page(index)
+        self.main_content.setCurrentWidget(page)
+        return page
+
     def open_about_dialog(self, event=None):
         """دیالوگ «درباره ما» را باز می‌کند."""
+        from dialogs.about_dialog import AboutDialog
+
         dialog = AboutDialog(self)
         dialog.exec()
 
     def handle_add_invoice_request(self):
         """به صفحه فاکتورها رفته و دیالوگ افزودن را باز می‌کند."""
-        self.main_content.setCurrentWidget(self.invoices_page)
-        self.invoices_page.open_add_invoice_dialog()
+        self.show_page(3).open_add_invoice_dialog()
 
     def handle_add_customer_request(self):
         """به صفحه مشتریان رفته و دیالوگ افزودن را باز می‌کند."""
-        self.main_content.setCurrentWidget(self.customers_page)
-        self.customers_page.open_add_dialog()
+        self.show_page(1).open_add_dialog()
 
     def handle_add_expense_request(self):
         """به صفحه هزینه‌ها رفته و دیالوگ افزودن را باز می‌کند."""
-        self.main_content.setCurrentWidget(self.expenses_page)
-        self.expenses_page.add_new_expense()
+        self.show_page(6).add_new_expense()
 
     def on_tab_changed(self, index):
         current_widget = self.main_content.widget(index)
@@ -287,6 +303,8 @@ class AppMainWindow(QMainWindow):
 
     def open_help_dialog(self):
         """دیالوگ راهنمای برنامه را باز می‌کند."""
+        from dialogs.help_dialog import HelpDialog
+
         dialog = HelpDialog(self)
         dialog.exec()
 
@@ -294,21 +312,37 @@ class AppMainWindow(QMainWindow):
 class AppController:
     def __init__(self):
         self.db_manager = DatabaseManager()
-        self.auth_window = AuthWindow(self.db_manager)
+        with startup_profiler.phase("AuthWindow"):
+            self.auth_window = AuthWindow(self.db_manager)
         self.auth_window.login_successful.connect(self.show_main_window)
         self.main_window = None
+        self.backup_scheduler = None
 
     def run(self):
         self.auth_window.show()
+        startup_profiler.mark("auth_window_shown")
 
     def close(self):
         print("Application is closing.")
-        pass
+        if self.backup_scheduler is not None:
+            self.backup_scheduler.shutdown()
+        # پیش از بستن اتصال‌ها، کارهای دیتابیس روی تردهای کارگر باید تمام شده باشند.
+        stop_db_thread_pool()
+        close_all_pools()
+        startup_profiler.finish()
 
     def show_main_window(self):
         if not self.main_window:
-            self.main_window = AppMainWindow()
+            with startup_profiler.phase("AppMainWindow"):
+                self.main_window = AppMainWindow()
+        if self.backup_scheduler is None:
+            from backup_scheduler import BackupScheduler
+
+            self.backup_scheduler = BackupScheduler(self.db_manager)
+            self.backup_scheduler.start()
         self.main_window.show()
+        startup_profiler.mark("main_window_shown")
+        startup_profiler.finish()
 
 
 def apply_startup_theme(app):
@@ -328,11 +362,16 @@ def apply_startup_theme(app):
 
 
 if __name__ == "__main__":
-    initialize_database()
-
-    app = QApplication(sys.argv)
-    app.setLayoutDirection(Qt.LayoutDirection.RightToLeft)
-    apply_startup_theme(app)
+    # پردازه‌های خروجی PDF گروهی در نسخه .exe (PyInstaller) از همین فایل اجرا می‌شوند.
+    multiprocessing.freeze_support()
+    startup_profiler.mark("imports_done")
+    with startup_profiler.phase("initialize_database"):
+        initialize_database()
+
+    with startup_profiler.phase("QApplication"):
+        app = QApplication(sys.argv)
+        app.setLayoutDirection(Qt.LayoutDirection.RightToLeft)
+        apply_startup_theme(app)
     controller = AppController()
     app.aboutToQuit.connect(controller.close)
     controller.run()
@@ -0,0 +1,109 @@
+# file: money.py
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from utils import to_latin_digits
+
+
+def _to_decimal(value):
+    """عدد، متن (با جداکننده هزارگان یا ارقام فارسی) یا Decimal را به Decimal تبدیل می‌کند."""
+    if value is None:
+        return Decimal(0)
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, float):
+        return Decimal(str(value))
+    if isinstance(value, int):
+        return Decimal(value)
+    text = to_latin_digits(value).replace("ریال", "").replace(",", "").replace("٬", "")
+    try:
+        return Decimal(text.strip())
+    except InvalidOperation:
+        raise ValueError(f"مبلغ نامعتبر است: {value}")
+
+
+class Money(int):
+    """
+    مبلغ به ریال به صورت عدد صحیح. تمام محاسبات فاکتور (تخفیف، مالیات، هزینه‌ها) با
+    این نوع و گرد کردن یکسان انجام می‌شوند تا جمع‌های دیتابیس، فرم و PDF دقیقاً برابر باشند.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, value=0):
+        if isinstance(value, int):
+            return super().__new__(cls, value)
+        rials = _to_decimal(value).quantize(Decimal(1), rounding=ROUND_HALF_UP)
+        return super().__new__(cls, int(rials))
+
+    def times(self, quantity):
+        """مبلغ ضرب در مقدار (که ممکن است اعشاری باشد)، گرد شده به ریال."""
+        return Money(Decimal(int(self)) * _to_decimal(quantity))
+
+    def per(self, quantity):
+        """سهم هر واحد از این مبلغ (مثلاً میانگین قیمت)، گرد شده به ریال."""
+        return Money(Decimal(int(self)) / _to_decimal(quantity))
+
+    def percent(self, rate):
+        """rate درصد از این مبلغ، گرد شده به ریال."""
+        return Money(Decimal(int(self)) * _to_decimal(rate) / 100)
+
+    def __add__(self, other):
+        if isinstance(other, int):
+            return Money(int(self) + int(other))
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, int):
+            return Money(int(self) - int(other))
+        return NotImplemented
+
+    def __rsub__(self, other):
+        if isinstance(other, int):
+            return Money(int(other) - int(self))
+        return NotImplemented
+
+    def __neg__(self):
+        return Money(-int(self))
+
+    def __str__(self):
+        return f"{int(self):,}"
+
+    def __repr__(self):
+        return f"Money({int(self)})"
+
+    def display(self):
+        """متن نمایشی مبلغ، مثلاً «1,250,000 ریال»."""
+        return f"{self} ریال"
+
+
+def fee_amount(fee, base):
+    """مبلغ یک هزینه جانبی؛ نوع 'amount' مبلغ ثابت و در غیر این صورت درصدی از base است."""
+    if fee.get("type") == "amount":
+        return Money(fee.get("value", 0))
+    return Money(base).percent(fee.get("value", 0))
+
+
+def invoice_line(
+    quantity, unit_price, discount_percent=0, tax_percent=0, extra_costs=()
+):
+    """
+    مبالغ یک قلم فاکتور فروش را محاسبه می‌کند. فرم فاکتور، صفحه جزئیات و PDF همگی از
+    این تابع استفاده می‌کنند.
+    """
+    total = Money(unit_price).times(quantity)
+    discount = total.percent(discount_percent)
+    after_discount = total - discount
+    tax = after_discount.percent(tax_percent)
+    fees = [(fee, fee_amount(fee, after_discount)) for fee in extra_costs or []]
+    fees_total = sum((amount for _, amount in fees), Money(0))
+    return {
+        "total": total,
+        "discount": discount,
+        "after_discount": after_discount,
+        "tax": tax,
+        "fees": fees,
+        "fees_total": fees_total,
+        "line_total": after_discount + tax + fees_total,
+    }
@@ -6,17 +6,16 @@ from PySide6.QtWidgets import (
     QHBoxLayout,
     QPushButton,
     QLineEdit,
-    QTableWidget,
-    QTableWidgetItem,
-    QHeaderView,
     QMessageBox,
     QDialog,
 )
-from PySide6.QtGui import QIcon, QColor, QBrush
-from PySide6.QtCore import Qt
+from PySide6.QtGui import QIcon, QColor
 
 from dialogs.cheque_dialog import ChequeDialog
 from dialogs.custom_message_box import CustomMessageBox
+from db_worker import BusyIndicator, DbRunner
+from record_table import Column, RecordTableModel, RecordTableView, RowAction
+from search_controller import SearchController
 from signal_bus import signal_bus
 from utils import resource_path
 
@@ -33,7 +32,6 @@ class ChequesPage(QWidget):
         self.search_input = QLineEdit(
             placeholderText="جستجو بر اساس شماره چک یا توضیحات..."
         )
-        self.search_input.textChanged.connect(self.search_cheques)
         self.add_btn = QPushButton(" ثبت چک جدید", objectName="primaryButton")
         self.add_btn.setIcon(QIcon(resource_path("assets/icons/file-plus.svg")))
         self.add_btn.clicked.connect(self.open_add_dialog)
@@ -41,105 +39,74 @@ class ChequesPage(QWidget):
         top_layout.addWidget(self.add_btn)
         layout.addLayout(top_layout)
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(10)
-        self.table.setHorizontalHeaderLabels(
+        self.db_runner = DbRunner(self.db_manager, self)
+        self.model = RecordTableModel(
             [
-                "ID",
-                "نوع",
-                "شماره چک",
-                "بانک",
-                "مبلغ",
-                "تاریخ صدور",
-                "تاریخ سررسید",
-                "وضعیت",
-                "فاکتور مرتبط",
-                "عملیات",
-            ]
+                Column("نوع", "type"),
+                Column("شماره چک", "cheque_number"),
+                Column("بانک", "bank_name"),
+                Column("مبلغ", lambda c: f"{c['amount']:,.0f} ریال"),
+                Column("تاریخ صدور", "issue_date"),
+                Column("تاریخ سررسید", "due_date"),
+                Column("وضعیت", "status"),
+                Column(
+                    "فاکتور مرتبط",
+                    lambda c: (
+                        f"INV-{c['invoice_id']:04d}" if c["invoice_id"] else "---"
+                    ),
+                ),
+                Column("عملیات"),
+            ],
+            fetch_page=self.db_manager.get_cheques_page,
+            row_background=self.cheque_color,
+            runner=self.db_runner,
+            parent=self,
         )
-        self.table.horizontalHeader().setSectionResizeMode(
-            QHeaderView.ResizeMode.Stretch
-        )
-        self.table.horizontalHeader().setSectionResizeMode(
-            9, QHeaderView.ResizeMode.ResizeToContents
+        self.table = RecordTableView(self.model)
+        self.table.set_actions(
+            8,
+            [
+                RowAction(
+                    "edit-2.svg", "ویرایش", lambda c: self.open_edit_dialog(c["id"])
+                ),
+                RowAction("trash-2.svg", "حذف", lambda c: self.delete_cheque(c["id"])),
+            ],
         )
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.table.setLayoutDirection(Qt.LayoutDirection.RightToLeft)
+        layout.addWidget(BusyIndicator(self.db_runner))
         layout.addWidget(self.table)
 
-        signal_bus.invoice_saved.connect(self.refresh_data)
-        self.load_cheques()
-
-    def load_cheques(self, search_term=None):
-        cheques = (
-            self.db_manager.search_cheques(search_term)
-            if search_term
-            else self.db_manager.get_all_cheques()
+        self.search = SearchController(
+            self.search_input,
+            self.db_runner,
+            self.db_manager.search_cheques,
+            self.db_manager.get_cheques_page,
+            self.model.show_result,
+            parent=self,
         )
-        self.table.setRowCount(len(cheques))
-
-        today = jdatetime.date.today()
 
-        for row, cheque in enumerate(cheques):
-            self.table.setItem(row, 0, QTableWidgetItem(str(cheque["id"])))
-            self.table.setItem(row, 1, QTableWidgetItem(cheque["type"]))
-            self.table.setItem(row, 2, QTableWidgetItem(cheque["cheque_number"]))
-            self.table.setItem(row, 3, QTableWidgetItem(cheque["bank_name"]))
-            self.table.setItem(
-                row, 4, QTableWidgetItem(f"{cheque['amount']:,.0f} ریال")
+        signal_bus.invoice_saved.connect(self.refresh_data)
+        signal_bus.cheque_saved.connect(self.refresh_data)
+        self.search.refresh()
+
+    def cheque_color(self, cheque):
+        """رنگ پس‌زمینه ردیف چک بر اساس وضعیت و نزدیکی سررسید."""
+        try:
+            due_date_str = cheque["due_date"].split("/")
+            due_date = jdatetime.date(
+                int(due_date_str[0]), int(due_date_str[1]), int(due_date_str[2])
             )
-            self.table.setItem(row, 5, QTableWidgetItem(cheque["issue_date"]))
-            self.table.setItem(row, 6, QTableWidgetItem(cheque["due_date"]))
-            self.table.setItem(row, 7, QTableWidgetItem(cheque["status"]))
-
-            invoice_id = cheque["invoice_id"]
-            invoice_text = f"INV-{invoice_id:04d}" if invoice_id else "---"
-            self.table.setItem(row, 8, QTableWidgetItem(invoice_text))
-
-            self.add_action_buttons(row, cheque["id"])
-
-            try:
-                due_date_str = cheque["due_date"].split("/")
-                due_date = jdatetime.date(
-                    int(due_date_str[0]), int(due_date_str[1]), int(due_date_str[2])
-                )
-                is_pending = cheque["status"] == "در انتظار وصول"
+        except (AttributeError, ValueError, IndexError):
+            return None
 
-                if is_pending and due_date <= today:
-                    color = QColor("#e74c3c")
-                elif is_pending and (due_date - today).days <= 7:
-                    color = QColor("#f39c12")
-                elif cheque["status"] == "برگشتی":
-                    color = QColor("#7f8c8d")
-                else:
-                    color = QColor("transparent")
-
-                for col in range(self.table.columnCount()):
-                    if self.table.item(row, col):
-                        self.table.item(row, col).setBackground(color)
-            except (ValueError, IndexError):
-                pass
-
-        self.table.setColumnHidden(0, True)
-
-    def add_action_buttons(self, row, cheque_id):
-        widget = QWidget()
-        layout = QHBoxLayout(widget)
-        layout.setContentsMargins(0, 0, 0, 0)
-
-        edit_btn = QPushButton(
-            icon=QIcon(resource_path("assets/icons/edit-2.svg")), toolTip="ویرایش"
-        )
-        edit_btn.clicked.connect(lambda: self.open_edit_dialog(cheque_id))
-
-        delete_btn = QPushButton(
-            icon=QIcon(resource_path("assets/icons/trash-2.svg")), toolTip="حذف"
-        )
-        delete_btn.clicked.connect(lambda: self.delete_cheque(cheque_id))
-
-        layout.addWidget(edit_btn)
-        layout.addWidget(delete_btn)
-        self.table.setCellWidget(row, 9, widget)
+        today = jdatetime.date.today()
+        is_pending = cheque["status"] == "در انتظار وصول"
+        if is_pending and due_date <= today:
+            return QColor("#e74c3c")
+        if is_pending and (due_date - today).days <= 7:
+            return QColor("#f39c12")
+        if cheque["status"] == "برگشتی":
+            return QColor("#7f8c8d")
+        return None
 
     def open_add_dialog(self):
         dialog = ChequeDialog(self.db_manager, parent=self)
@@ -159,13 +126,9 @@ class ChequesPage(QWidget):
             success, msg = self.db_manager.delete_cheque(cheque_id)
             if success:
                 QMessageBox.information(self, "موفق", msg)
-                self.refresh_data()
+                signal_bus.cheque_saved.emit()
             else:
                 QMessageBox.critical(self, "خطا", msg)
 
-    def search_cheques(self):
-        self.load_cheques(self.search_input.text())
-
     def refresh_data(self):
-        self.search_input.clear()
-        self.load_cheques()
+        self.search.reset()
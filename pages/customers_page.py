@@ -5,18 +5,17 @@ from PySide6.QtWidgets import (
     QHBoxLayout,
     QPushButton,
     QLineEdit,
-    QTableWidget,
-    QTableWidgetItem,
-    QHeaderView,
     QMessageBox,
     QDialog,
     QStackedWidget,
 )
 from PySide6.QtGui import QIcon
-from PySide6.QtCore import Qt
 
 from dialogs.customer_dialog import CustomerDialog
 from dialogs.custom_message_box import CustomMessageBox
+from db_worker import BusyIndicator, DbRunner
+from record_table import Column, RecordTableModel, RecordTableView, RowAction
+from search_controller import SearchController
 from signal_bus import signal_bus
 from pages.customer_profile_page import CustomerProfilePage
 from utils import resource_path
@@ -37,9 +36,9 @@ class CustomersPage(QWidget):
         self.stack.addWidget(self.customer_list_page)
 
         signal_bus.customer_saved.connect(self.refresh_data)
-        self.table.doubleClicked.connect(self.handle_double_click)
+        self.table.record_double_clicked.connect(self.handle_double_click)
 
-        self.load_customers()
+        self.search.refresh()
 
     def setup_customer_list_ui(self):
         """UI صفحه اصلی که لیست مشتریان را نمایش می‌دهد، راه‌اندازی می‌کند."""
@@ -49,8 +48,6 @@ class CustomersPage(QWidget):
 
         top_layout = QHBoxLayout()
         self.search_input = QLineEdit(placeholderText="جستجو بر اساس نام یا کد ملی...")
-        self.search_input.textChanged.connect(self.search_customers)
-
         self.add_btn = QPushButton(" افزودن مشتری جدید", objectName="primaryButton")
         self.add_btn.setIcon(QIcon(resource_path("assets/icons/user-plus.svg")))
         self.add_btn.clicked.connect(self.open_add_dialog)
@@ -59,85 +56,52 @@ class CustomersPage(QWidget):
         top_layout.addWidget(self.add_btn)
         layout.addLayout(top_layout)
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels(
-            ["ID", "نام", "کد/شناسه ملی", "تلفن", "ایمیل", "آدرس", "عملیات"]
-        )
-        self.table.horizontalHeader().setSectionResizeMode(
-            QHeaderView.ResizeMode.Stretch
-        )
-        self.table.horizontalHeader().setSectionResizeMode(
-            6, QHeaderView.ResizeMode.ResizeToContents
-        )
-        self.table.verticalHeader().setVisible(False)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.setLayoutDirection(Qt.LayoutDirection.RightToLeft)
-        layout.addWidget(self.table)
-
-    def load_customers(self, search_term=None):
-        """داده‌های مشتریان را از دیتابیس بارگذاری و در جدول نمایش می‌دهد."""
-        customers = (
-            self.db_manager.search_customers(search_term)
-            if search_term
-            else self.db_manager.get_all_customers()
-        )
-        self.table.setRowCount(len(customers))
-
-        for row, customer in enumerate(customers):
-            self.table.setItem(row, 0, QTableWidgetItem(str(customer["id"])))
-            self.table.setItem(row, 1, QTableWidgetItem(customer["name"]))
-            self.table.setItem(row, 2, QTableWidgetItem(customer["national_id"]))
-            self.table.setItem(row, 3, QTableWidgetItem(customer["phone"]))
-            self.table.setItem(row, 4, QTableWidgetItem(customer["email"]))
-            self.table.setItem(row, 5, QTableWidgetItem(customer["address"]))
-            self.add_action_buttons(row, customer["id"])
-
-        self.table.setColumnHidden(0, True)
-
-    def add_action_buttons(self, row, customer_id):
-        """دکمه‌های عملیات (پروفایل، ویرایش، حذف) را به جدول اضافه می‌کند."""
-        widget = QWidget()
-        layout = QHBoxLayout(widget)
-        layout.setContentsMargins(0, 0, 0, 0)
-        layout.setSpacing(5)
-        layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-
-        profile_btn = QPushButton(
-            icon=QIcon(resource_path("assets/icons/eye.svg")),
-            toolTip="مشاهده پروفایل",
+        self.db_runner = DbRunner(self.db_manager, self)
+        self.model = RecordTableModel(
+            [
+                Column("نام", "name"),
+                Column("کد/شناسه ملی", "national_id"),
+                Column("تلفن", "phone"),
+                Column("ایمیل", "email"),
+                Column("آدرس", "address"),
+                Column("عملیات"),
+            ],
+            fetch_page=self.db_manager.get_customers_page,
+            runner=self.db_runner,
             parent=self,
         )
-        profile_btn.setProperty("class", "actionButton")
-        profile_btn.clicked.connect(lambda: self.show_customer_profile(customer_id))
-
-        edit_btn = QPushButton(
-            icon=QIcon(resource_path("assets/icons/edit-2.svg")),
-            toolTip="ویرایش",
-            parent=self,
+        self.table = RecordTableView(self.model)
+        self.table.set_actions(
+            5,
+            [
+                RowAction(
+                    "eye.svg",
+                    "مشاهده پروفایل",
+                    lambda c: self.show_customer_profile(c["id"]),
+                ),
+                RowAction(
+                    "edit-2.svg", "ویرایش", lambda c: self.open_edit_dialog(c["id"])
+                ),
+                RowAction(
+                    "trash-2.svg", "حذف", lambda c: self.delete_customer(c["id"])
+                ),
+            ],
         )
-        edit_btn.setProperty("class", "actionButton")
-        edit_btn.clicked.connect(lambda: self.open_edit_dialog(customer_id))
+        layout.addWidget(BusyIndicator(self.db_runner))
+        layout.addWidget(self.table)
 
-        delete_btn = QPushButton(
-            icon=QIcon(resource_path("assets/icons/trash-2.svg")),
-            toolTip="حذف",
+        self.search = SearchController(
+            self.search_input,
+            self.db_runner,
+            self.db_manager.search_customers,
+            self.db_manager.get_customers_page,
+            self.model.show_result,
             parent=self,
         )
-        delete_btn.setProperty("class", "actionButton")
-        delete_btn.clicked.connect(lambda: self.delete_customer(customer_id))
-
-        layout.addWidget(profile_btn)
-        layout.addWidget(edit_btn)
-        layout.addWidget(delete_btn)
-        self.table.setCellWidget(row, 6, widget)
 
-    def handle_double_click(self, index):
+    def handle_double_click(self, customer):
         """با دو بار کلیک روی یک ردیف، پروفایل مشتری را نمایش می‌دهد."""
-        row = index.row()
-        customer_id = int(self.table.item(row, 0).text())
-        self.show_customer_profile(customer_id)
+        self.show_customer_profile(customer["id"])
 
     def show_customer_profile(self, customer_id):
         """صفحه پروفایل مشتری را ساخته و نمایش می‌دهد."""
@@ -175,15 +139,14 @@ class CustomersPage(QWidget):
         if confirm.exec() == QDialog.DialogCode.Accepted:
             success, msg = self.db_manager.delete_customer(customer_id)
             if success:
+                signal_bus.customer_deleted.emit(customer_id)
+                # فاکتورهای مشتری هم حذف شده‌اند.
+                signal_bus.invoice_saved.emit()
                 QMessageBox.information(self, "موفق", msg)
                 self.refresh_data()
             else:
                 QMessageBox.critical(self, "خطا", msg)
 
-    def search_customers(self):
-        self.load_customers(self.search_input.text())
-
     def refresh_data(self):
         self.show_customer_list()
-        self.search_input.clear()
-        self.load_customers()
+        self.search.reset()
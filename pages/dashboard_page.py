@@ -1,5 +1,6 @@
 # file: pages/dashboard_page.py
-import jdatetime
+import datetime
+
 from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -12,10 +13,16 @@ from PySide6.QtWidgets import (
     QHeaderView,
     QTableWidgetItem,
 )
-from PySide6.QtCore import Qt, QSettings, Signal
+from PySide6.QtCore import Qt, QSettings, QTimer, Signal
 from PySide6.QtGui import QFont, QIcon, QColor
+from db_worker import BusyIndicator, DbRunner
+from signal_bus import signal_bus
 from utils import resource_path
 
+# چند تغییر پشت سر هم (مثلاً ثبت فاکتور و به‌روزرسانی موجودی) فقط یک بار باعث
+# محاسبه دوباره داشبورد می‌شوند (میلی‌ثانیه).
+SNAPSHOT_REFRESH_DELAY_MS = 300
+
 
 class DashboardPage(QWidget):
     add_invoice_requested = Signal()
@@ -30,6 +37,9 @@ class DashboardPage(QWidget):
         main_layout.setContentsMargins(25, 25, 25, 25)
         main_layout.setSpacing(20)
 
+        self.db_runner = DbRunner(self.db_manager, self)
+        main_layout.addWidget(BusyIndicator(self.db_runner))
+
         self.welcome_text_label = QLabel()
         main_layout.addWidget(self.welcome_text_label, 0, Qt.AlignmentFlag.AlignRight)
 
@@ -78,7 +88,30 @@ class DashboardPage(QWidget):
         self.company_info_frame = self._create_company_info_section()
         main_layout.addWidget(self.company_info_frame)
 
-        self.refresh_dashboard()
+        # آخرین داده‌های داشبورد (snapshot) نگه داشته می‌شود و بازگشت به داشبورد
+        # کوئری جدیدی اجرا نمی‌کند. فقط ثبت تغییر در داده‌ها یا عوض شدن روز، محاسبه
+        # دوباره را (روی ترد کارگر و حتی اگر داشبورد نمایش داده نشود) شروع می‌کند.
+        self._snapshot_day = None
+        self._snapshot_stale = True
+        self._snapshot_version = 0
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(SNAPSHOT_REFRESH_DELAY_MS)
+        self._refresh_timer.timeout.connect(self.compute_snapshot)
+        self._rollover_timer = QTimer(self)
+        self._rollover_timer.setSingleShot(True)
+        self._rollover_timer.timeout.connect(self.invalidate_snapshot)
+        for signal in (
+            signal_bus.invoice_saved,
+            signal_bus.customer_saved,
+            signal_bus.customer_deleted,
+            signal_bus.expense_saved,
+            signal_bus.product_saved,
+            signal_bus.purchase_invoice_saved,
+            signal_bus.cheque_saved,
+            signal_bus.database_restored,
+        ):
+            signal.connect(self.invalidate_snapshot)
 
     def _create_kpi_box(self, title, icon_path, color):
         frame = QFrame(objectName="kpiBox")
@@ -162,19 +195,62 @@ class DashboardPage(QWidget):
         )
 
         try:
-            today = jdatetime.date.today()
-            start_of_month = today.replace(day=1).strftime("%Y/%m/%d")
-            next_month = today.replace(day=28) + jdatetime.timedelta(days=4)
-            end_of_month = (
-                next_month - jdatetime.timedelta(days=next_month.day)
-            ).strftime("%Y/%m/%d")
-
-            summary = self.db_manager.get_financial_summary_by_date_range(
-                start_of_month, end_of_month
-            )
-            self.sales_val.setText(f"{summary['total_revenue']:,.0f} ریال")
-            self.expenses_val.setText(f"{summary['total_expenses']:,.0f} ریال")
-            self.profit_val.setText(f"{summary['net_profit']:,.0f} ریال")
+            company_name = settings.value("company/name", "ثبت نشده")
+            company_phone = settings.value("company/phone", "ثبت نشده")
+            company_address = settings.value("company/address", "ثبت نشده")
+            self.company_name_label.setText(f"<b>نام شرکت:</b> {company_name}")
+            self.company_phone_label.setText(f"<b>تلفن:</b> {company_phone}")
+            self.company_address_label.setText(f"<b>آدرس:</b> {company_address}")
+        except Exception as e:
+            print(f"Error loading company info: {e}")
+
+        if self._snapshot_day != datetime.date.today():
+            self._snapshot_stale = True
+        if self._snapshot_stale and not self.db_runner.is_busy():
+            self.compute_snapshot()
+
+    def invalidate_snapshot(self, *args):
+        """داده‌های نمایش داده شده کهنه شده‌اند؛ محاسبه دوباره با کمی تاخیر شروع می‌شود."""
+        self._snapshot_stale = True
+        self._snapshot_version += 1
+        self._refresh_timer.start()
+
+    def compute_snapshot(self):
+        # تمام آمار داشبورد با چند کوئری تجمیعی و یک‌جا روی ترد کارگر خوانده می‌شود.
+        self._refresh_timer.stop()
+        self.db_runner.cancel()
+        version = self._snapshot_version
+        day = datetime.date.today()
+        self.db_runner.submit(
+            self.db_manager.get_dashboard_data,
+            low_stock_threshold=10,
+            cheques_limit=5,
+            on_result=lambda data: self._on_snapshot_ready(data, version, day),
+            on_error=lambda e: print(f"Error loading dashboard data: {e}"),
+        )
+
+    def _on_snapshot_ready(self, data, version, day):
+        # اگر حین محاسبه تغییری ثبت شده باشد، محاسبه بعدی در راه است.
+        self._snapshot_stale = version != self._snapshot_version
+        self._snapshot_day = day
+        self._schedule_rollover()
+        self.show_dashboard_data(data)
+
+    def _schedule_rollover(self):
+        """با شروع روز جدید، آمار امروز و ماه جاری باید دوباره محاسبه شوند."""
+        now = datetime.datetime.now()
+        midnight = datetime.datetime.combine(
+            now.date() + datetime.timedelta(days=1), datetime.time()
+        )
+        self._rollover_timer.start(int((midnight - now).total_seconds() * 1000) + 1000)
+
+    def show_dashboard_data(self, data):
+        """نتیجه get_dashboard_data را در کارت‌ها و جدول‌های داشبورد نمایش می‌دهد."""
+        try:
+            kpis = data["kpis"]
+            self.sales_val.setText(f"{kpis['sales_month']:,.0f} ریال")
+            self.expenses_val.setText(f"{kpis['expenses_month']:,.0f} ریال")
+            self.profit_val.setText(f"{kpis['net_profit_month']:,.0f} ریال")
         except Exception as e:
             print(f"Error loading financial KPIs: {e}")
 
@@ -189,7 +265,7 @@ class DashboardPage(QWidget):
             self.low_stock_table.horizontalHeader().setSectionResizeMode(
                 1, QHeaderView.ResizeMode.ResizeToContents
             )
-            low_stock_items = self.db_manager.get_low_stock_products(threshold=10)
+            low_stock_items = data["low_stock_products"]
             self.low_stock_table.setRowCount(len(low_stock_items))
             for row, item in enumerate(low_stock_items):
                 self.low_stock_table.setItem(row, 0, QTableWidgetItem(item["name"]))
@@ -213,7 +289,7 @@ class DashboardPage(QWidget):
             self.upcoming_cheques_table.horizontalHeader().setSectionResizeMode(
                 2, QHeaderView.ResizeMode.ResizeToContents
             )
-            upcoming_cheques = self.db_manager.get_upcoming_cheques(limit=5)
+            upcoming_cheques = data["upcoming_cheques"]
             self.upcoming_cheques_table.setRowCount(len(upcoming_cheques))
             for row, cheque in enumerate(upcoming_cheques):
                 self.upcoming_cheques_table.setItem(
@@ -227,13 +303,3 @@ class DashboardPage(QWidget):
                 )
         except Exception as e:
             print(f"Error loading upcoming cheques: {e}")
-
-        try:
-            company_name = settings.value("company/name", "ثبت نشده")
-            company_phone = settings.value("company/phone", "ثبت نشده")
-            company_address = settings.value("company/address", "ثبت نشده")
-            self.company_name_label.setText(f"<b>نام شرکت:</b> {company_name}")
-            self.company_phone_label.setText(f"<b>تلفن:</b> {company_phone}")
-            self.company_address_label.setText(f"<b>آدرس:</b> {company_address}")
-        except Exception as e:
-            print(f"Error loading company info: {e}")
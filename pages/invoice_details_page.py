@@ -15,6 +15,7 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QIcon, QColor
+from money import invoice_line
 from utils import resource_path
 
 
@@ -179,23 +180,18 @@ class InvoiceDetailsPage(QWidget):
             tax_p = item["tax_percent"] if "tax_percent" in item_keys else 0
             extra_costs = item["extra_costs"] if "extra_costs" in item_keys else []
 
-            total_price = quantity * unit_price
-            discount_amount = total_price * (discount_p / 100)
-
-            price_after_discount = total_price - discount_amount
-            tax_amount = price_after_discount * (tax_p / 100)
-
-            extra_fees_amount = 0
-            if isinstance(extra_costs, list):
-                for fee in extra_costs:
-                    fee_val = fee.get("value", 0)
-                    extra_fees_amount += (
-                        price_after_discount * (fee_val / 100)
-                        if fee.get("type") == "percent"
-                        else fee_val
-                    )
-
-            final_item_price = price_after_discount + tax_amount + extra_fees_amount
+            line = invoice_line(
+                quantity,
+                unit_price,
+                discount_p,
+                tax_p,
+                extra_costs if isinstance(extra_costs, list) else [],
+            )
+            total_price = line["total"]
+            discount_amount = line["discount"]
+            tax_amount = line["tax"]
+            extra_fees_amount = line["fees_total"]
+            final_item_price = line["line_total"]
             total_before_discount += total_price
             total_discount_amount += discount_amount
             total_tax_amount += tax_amount
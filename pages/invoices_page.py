@@ -8,9 +8,6 @@ from PySide6.QtWidgets import (
     QHBoxLayout,
     QPushButton,
     QLineEdit,
-    QTableWidget,
-    QTableWidgetItem,
-    QHeaderView,
     QMessageBox,
     QDialog,
     QLabel,
@@ -19,18 +16,34 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt, QSettings
 from PySide6.QtGui import QIcon, QColor
-from functools import partial
 
 from dialogs.invoice_dialog import InvoiceDialog
 from dialogs.custom_message_box import CustomMessageBox
 from dialogs.pdf_success_dialog import PdfSuccessDialog
 from dialogs.payment_dialog import PaymentDialog
+from db_worker import BusyIndicator, DbRunner
+from record_table import Column, RecordTableModel, RecordTableView, RowAction
+from search_controller import SearchController
 from signal_bus import signal_bus
-from pdf_generator import generate_invoice_pdf
 from pages.invoice_details_page import InvoiceDetailsPage
 from utils import resource_path
 
 
+def company_info_from_settings():
+    """اطلاعات فروشنده برای چاپ فاکتور از تنظیمات برنامه."""
+    settings = QSettings("MySoft", "HesabYar")
+    return {
+        "name": settings.value("company/name", ""),
+        "national_id": settings.value("company/national_id", ""),
+        "economic_code": settings.value("company/economic_code", ""),
+        "phone": settings.value("company/phone", ""),
+        "landline": settings.value("company/landline", ""),
+        "postal_code": settings.value("company/postal_code", ""),
+        "address": settings.value("company/address", ""),
+        "logo_path": settings.value("company/logo_path", None),
+    }
+
+
 class InvoicesPage(QWidget):
     def __init__(self, db_manager, parent=None):
         super().__init__(parent)
@@ -45,8 +58,14 @@ class InvoicesPage(QWidget):
         self.setup_invoice_list_ui()
         self.stack.addWidget(self.invoice_list_page)
 
+        # تنظیمات چاپ (اطلاعات شرکت و InvoiceRenderer هر سایز صفحه) فقط یک بار
+        # ساخته شده و با تغییر اطلاعات شرکت دور ریخته می‌شوند.
+        self._company_info = None
+        self._renderers = {}
+        signal_bus.company_settings_saved.connect(self.invalidate_print_settings)
+
         signal_bus.invoice_saved.connect(self.refresh_data)
-        self.table.doubleClicked.connect(self.handle_double_click)
+        self.table.record_double_clicked.connect(self.handle_double_click)
 
     def setup_invoice_list_ui(self):
         """UI صفحه اصلی که لیست فاکتورها را نمایش می‌دهد، راه‌اندازی می‌کند."""
@@ -58,7 +77,6 @@ class InvoicesPage(QWidget):
         self.search_input = QLineEdit(
             placeholderText="جستجو بر اساس نام مشتری یا شماره فاکتور..."
         )
-        self.search_input.textChanged.connect(self.search_invoices)
         top_layout.addWidget(self.search_input)
 
         top_layout.addStretch()
@@ -67,6 +85,11 @@ class InvoicesPage(QWidget):
         self.page_size_combo.addItems(["A4", "A5"])
         top_layout.addWidget(self.page_size_combo)
 
+        self.batch_export_btn = QPushButton(" خروجی PDF گروهی")
+        self.batch_export_btn.setIcon(QIcon(resource_path("assets/icons/printer.svg")))
+        self.batch_export_btn.clicked.connect(self.open_batch_export_dialog)
+        top_layout.addWidget(self.batch_export_btn)
+
         self.add_invoice_btn = QPushButton(
             " صدور فاکتور جدید", objectName="primaryButton"
         )
@@ -75,115 +98,74 @@ class InvoicesPage(QWidget):
         top_layout.addWidget(self.add_invoice_btn)
         layout.addLayout(top_layout)
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels(
-            ["ID", "شماره", "مشتری", "تاریخ صدور", "مبلغ کل", "وضعیت", "عملیات"]
+        self.db_runner = DbRunner(self.db_manager, self)
+        # چاپ runner جداگانه دارد تا لغو کارهای لیست و جستجو، چاپ درخواست شده توسط
+        # کاربر را دور نریزد.
+        self.print_runner = DbRunner(self.db_manager, self)
+        self.model = RecordTableModel(
+            [
+                Column("شماره", lambda inv: f"INV-{inv['id']:04d}"),
+                Column("مشتری", "customer_name"),
+                Column("تاریخ صدور", "issue_date"),
+                Column("مبلغ کل", lambda inv: f"{inv['total_amount']:,.0f} ریال"),
+                Column(
+                    "وضعیت",
+                    lambda inv: self.get_status_display(inv)[0],
+                    foreground=lambda inv: self.get_status_display(inv)[1],
+                    alignment=Qt.AlignmentFlag.AlignCenter,
+                ),
+                Column("عملیات"),
+            ],
+            fetch_page=self.db_manager.get_invoices_page,
+            runner=self.db_runner,
+            parent=self,
         )
-        self.table.horizontalHeader().setSectionResizeMode(
-            QHeaderView.ResizeMode.Stretch
+        self.table = RecordTableView(self.model)
+        self.table.set_actions(
+            5,
+            [
+                RowAction(
+                    "eye.svg",
+                    "مشاهده جزئیات",
+                    lambda inv: self.show_invoice_details(inv["id"]),
+                ),
+                RowAction(
+                    "credit-card.svg",
+                    "ثبت پرداخت جدید",
+                    lambda inv: self.open_payment_dialog(
+                        inv["id"], inv["total_amount"] - (inv["amount_paid"] or 0)
+                    ),
+                    visible=lambda inv: inv["status"] in ["پرداخت نشده", "کسری"],
+                ),
+                RowAction(
+                    "printer.svg",
+                    "چاپ/نمایش PDF",
+                    lambda inv: self.print_invoice(inv["id"]),
+                ),
+                RowAction(
+                    "trash-2.svg",
+                    "حذف فاکتور",
+                    lambda inv: self.delete_invoice(inv["id"]),
+                ),
+            ],
         )
-        self.table.horizontalHeader().setSectionResizeMode(
-            6, QHeaderView.ResizeMode.ResizeToContents
-        )
-        self.table.verticalHeader().setVisible(False)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.setLayoutDirection(Qt.LayoutDirection.RightToLeft)
+        layout.addWidget(BusyIndicator(self.db_runner))
+        layout.addWidget(BusyIndicator(self.print_runner))
         layout.addWidget(self.table)
-        self.load_invoices()
-
-    def search_invoices(self):
-        """فاکتورها را بر اساس متن جستجو فیلتر می‌کند."""
-        self.load_invoices(self.search_input.text())
-
-    def load_invoices(self, search_term=None):
-        """فاکتورها را از دیتابیس بارگذاری و در جدول نمایش می‌دهد."""
-        try:
-            self.table.setRowCount(0)
-            invoices = (
-                self.db_manager.search_invoices(search_term)
-                if search_term
-                else self.db_manager.get_all_invoices()
-            )
-
-            self.table.setRowCount(len(invoices))
-            for row, invoice in enumerate(invoices):
-                invoice_id = invoice["id"]
-                self.table.setItem(row, 0, QTableWidgetItem(str(invoice_id)))
-                self.table.setItem(row, 1, QTableWidgetItem(f"INV-{invoice_id:04d}"))
-                self.table.setItem(row, 2, QTableWidgetItem(invoice["customer_name"]))
-                self.table.setItem(row, 3, QTableWidgetItem(invoice["issue_date"]))
-                self.table.setItem(
-                    row, 4, QTableWidgetItem(f"{invoice['total_amount']:,.0f} ریال")
-                )
-
-                status_text, status_color = self.get_status_display(invoice)
-                status_item = QTableWidgetItem(status_text)
-                status_item.setForeground(status_color)
-                status_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                self.table.setItem(row, 5, status_item)
-
-                self.add_action_buttons(
-                    row,
-                    invoice_id,
-                    invoice["status"],
-                    invoice["total_amount"],
-                    invoice["amount_paid"],
-                )
-
-            self.table.setColumnHidden(0, True)
-        except Exception as e:
-            QMessageBox.critical(self, "خطا در بارگذاری فاکتورها", f"خطایی رخ داد: {e}")
 
-    def add_action_buttons(self, row, invoice_id, status, total_amount, amount_paid):
-        """دکمه‌های عملیات را به جدول اضافه می‌کند، شامل دکمه ثبت پرداخت."""
-        widget = QWidget()
-        layout = QHBoxLayout(widget)
-        layout.setContentsMargins(0, 0, 0, 0)
-        layout.setSpacing(5)
-
-        details_btn = QPushButton(
-            icon=QIcon(resource_path("assets/icons/eye.svg")), toolTip="مشاهده جزئیات"
-        )
-        details_btn.setProperty("class", "actionButton")
-        details_btn.clicked.connect(partial(self.show_invoice_details, invoice_id))
-        layout.addWidget(details_btn)
-
-        if status in ["پرداخت نشده", "کسری"]:
-            remaining_balance = total_amount - (amount_paid or 0)
-            payment_btn = QPushButton(
-                icon=QIcon(resource_path("assets/icons/credit-card.svg")),
-                toolTip="ثبت پرداخت جدید",
-            )
-            payment_btn.setProperty("class", "actionButton")
-            payment_btn.clicked.connect(
-                lambda: self.open_payment_dialog(invoice_id, remaining_balance)
-            )
-            layout.addWidget(payment_btn)
-
-        print_btn = QPushButton(
-            icon=QIcon(resource_path("assets/icons/printer.svg")),
-            toolTip="چاپ/نمایش PDF",
+        self.search = SearchController(
+            self.search_input,
+            self.db_runner,
+            self.db_manager.search_invoices,
+            self.db_manager.get_invoices_page,
+            self.model.show_result,
+            parent=self,
         )
-        print_btn.setProperty("class", "actionButton")
-        print_btn.clicked.connect(lambda: self.print_invoice(invoice_id))
-        layout.addWidget(print_btn)
-
-        delete_btn = QPushButton(
-            icon=QIcon(resource_path("assets/icons/trash-2.svg")), toolTip="حذف فاکتور"
-        )
-        delete_btn.setProperty("class", "actionButton")
-        delete_btn.clicked.connect(lambda: self.delete_invoice(invoice_id))
-        layout.addWidget(delete_btn)
-
-        self.table.setCellWidget(row, 6, widget)
+        self.search.refresh()
 
-    def handle_double_click(self, index):
+    def handle_double_click(self, invoice):
         """با دو بار کلیک روی یک ردیف، جزئیات فاکتور را نمایش می‌دهد."""
-        row = index.row()
-        invoice_id = int(self.table.item(row, 0).text())
-        self.show_invoice_details(invoice_id)
+        self.show_invoice_details(invoice["id"])
 
     def show_invoice_details(self, invoice_id):
         """صفحه جزئیات فاکتور را ساخته و نمایش می‌دهد."""
@@ -218,42 +200,57 @@ class InvoicesPage(QWidget):
             return "پرداخت نشده", QColor("#e74c3c")
 
     def print_invoice(self, invoice_id):
-        page_size = self.page_size_combo.currentText()
+        # خواندن فاکتور و ساخت PDF روی ترد کارگر انجام می‌شود؛ فونت‌ها و اطلاعات شرکت
+        # پیش از آن در renderer روی ترد اصلی آماده شده‌اند.
+        renderer = self.invoice_renderer(self.page_size_combo.currentText())
+        self.print_runner.submit(
+            self._build_invoice_pdf,
+            renderer,
+            invoice_id,
+            on_result=self.on_invoice_pdf_ready,
+            on_error=lambda e: QMessageBox.critical(
+                self, "خطا", f"خطا در ساخت فایل PDF:\n{e}"
+            ),
+        )
 
+    def _build_invoice_pdf(self, renderer, invoice_id):
+        """روی ترد کارگر اجرا می‌شود؛ خروجی renderer.render یا None اگر فاکتور نباشد."""
         invoice_details_row = self.db_manager.get_invoice_details(invoice_id)
-        items_data_rows = self.db_manager.get_invoice_items(invoice_id)
-
         if not invoice_details_row:
+            return None
+        items_data = [
+            dict(item) for item in self.db_manager.get_invoice_items(invoice_id)
+        ]
+        return renderer.render(dict(invoice_details_row), items_data)
+
+    def on_invoice_pdf_ready(self, result):
+        if result is None:
             QMessageBox.critical(self, "خطا", "اطلاعات فاکتور برای چاپ یافت نشد.")
             return
-
-        invoice_details = dict(invoice_details_row)
-        items_data = [dict(item) for item in items_data_rows]
-
-        settings = QSettings("MySoft", "HesabYar")
-        company_info = {
-            "name": settings.value("company/name", ""),
-            "national_id": settings.value("company/national_id", ""),
-            "economic_code": settings.value("company/economic_code", ""),
-            "phone": settings.value("company/phone", ""),
-            "landline": settings.value("company/landline", ""),
-            "postal_code": settings.value("company/postal_code", ""),
-            "address": settings.value("company/address", ""),
-            "logo_path": settings.value("company/logo_path", None),
-        }
-
-        if invoice_details and items_data is not None:
-            file_path, success = generate_invoice_pdf(
-                invoice_details, items_data, company_info, page_size_str=page_size
-            )
-            if success:
-                self.show_success_dialog(file_path)
-            else:
-                QMessageBox.critical(self, "خطا", f"خطا در ساخت فایل PDF:\n{file_path}")
+        file_path, success = result
+        if success:
+            self.show_success_dialog(file_path)
         else:
-            QMessageBox.critical(
-                self, "خطا", "اطلاعات فاکتور یا اقلام آن برای چاپ یافت نشد."
-            )
+            QMessageBox.critical(self, "خطا", f"خطا در ساخت فایل PDF:\n{file_path}")
+
+    def company_info(self):
+        if self._company_info is None:
+            self._company_info = company_info_from_settings()
+        return self._company_info
+
+    def invoice_renderer(self, page_size):
+        renderer = self._renderers.get(page_size)
+        if renderer is None:
+            # reportlab و کتابخانه‌های متن فارسی فقط هنگام اولین چاپ بارگذاری می‌شوند.
+            from pdf_generator import InvoiceRenderer
+
+            renderer = InvoiceRenderer(self.company_info(), page_size)
+            self._renderers[page_size] = renderer
+        return renderer
+
+    def invalidate_print_settings(self):
+        self._company_info = None
+        self._renderers = {}
 
     def delete_invoice(self, invoice_id):
         confirm = CustomMessageBox(
@@ -278,9 +275,26 @@ class InvoicesPage(QWidget):
         )
         dialog.exec()
 
-    def show_success_dialog(self, file_path):
-        folder_path = os.path.dirname(file_path)
-        dialog = PdfSuccessDialog(f"فایل PDF در مسیر زیر ساخته شد:\n{file_path}", self)
+    def open_batch_export_dialog(self):
+        from dialogs.invoice_batch_export_dialog import InvoiceBatchExportDialog
+
+        dialog = InvoiceBatchExportDialog(
+            self.db_manager,
+            self.company_info(),
+            page_size_str=self.page_size_combo.currentText(),
+            parent=self,
+        )
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            self.show_success_dialog(dialog.output_path, dialog.result_message)
+
+    def show_success_dialog(self, file_path, message=None):
+        """file_path می‌تواند یک فایل یا (برای خروجی گروهی) یک پوشه باشد."""
+        folder_path = (
+            file_path if os.path.isdir(file_path) else os.path.dirname(file_path)
+        )
+        dialog = PdfSuccessDialog(
+            message or f"فایل PDF در مسیر زیر ساخته شد:\n{file_path}", self
+        )
         result = dialog.exec()
         try:
             if result == dialog.OpenFile:
@@ -301,5 +315,4 @@ class InvoicesPage(QWidget):
     def refresh_data(self):
         """داده‌ها را رفرش کرده و به صفحه لیست بازمی‌گردد."""
         self.show_invoice_list()
-        self.search_input.clear()
-        self.load_invoices()
+        self.search.reset()
@@ -5,16 +5,15 @@ from PySide6.QtWidgets import (
     QHBoxLayout,
     QPushButton,
     QLineEdit,
-    QTableWidget,
-    QTableWidgetItem,
-    QHeaderView,
     QMessageBox,
     QDialog,
 )
 from PySide6.QtGui import QIcon
-from PySide6.QtCore import Qt
 from dialogs.product_dialog import ProductDialog
 from dialogs.custom_message_box import CustomMessageBox
+from db_worker import BusyIndicator, DbRunner
+from record_table import Column, RecordTableModel, RecordTableView, RowAction
+from search_controller import SearchController
 from signal_bus import signal_bus
 from utils import resource_path
 
@@ -31,7 +30,6 @@ class ProductsPage(QWidget):
 
         top_layout = QHBoxLayout()
         self.search_input = QLineEdit(placeholderText="جستجو بر اساس نام یا توضیحات...")
-        self.search_input.textChanged.connect(self.search_products)
         self.add_btn = QPushButton(" افزودن کالا/خدمات", objectName="primaryButton")
         self.add_btn.setIcon(QIcon(resource_path("assets/icons/package.svg")))
         self.add_btn.clicked.connect(self.open_add_dialog)
@@ -39,72 +37,42 @@ class ProductsPage(QWidget):
         top_layout.addWidget(self.add_btn)
         layout.addLayout(top_layout)
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels(
-            ["ID", "نام کالا/خدمات", "توضیحات", "واحد", "قیمت واحد", "موجودی", "عملیات"]
-        )
-        self.table.horizontalHeader().setSectionResizeMode(
-            QHeaderView.ResizeMode.Stretch
+        self.db_runner = DbRunner(self.db_manager, self)
+        self.model = RecordTableModel(
+            [
+                Column("نام کالا/خدمات", "name"),
+                Column("توضیحات", "description"),
+                Column("واحد", "unit"),
+                Column("قیمت واحد", lambda p: f"{p['unit_price']:,.0f} ریال"),
+                Column("موجودی", "stock_quantity"),
+                Column("عملیات"),
+            ],
+            fetch_page=self.db_manager.get_products_page,
+            runner=self.db_runner,
+            parent=self,
         )
-        self.table.horizontalHeader().setSectionResizeMode(
-            6, QHeaderView.ResizeMode.ResizeToContents
+        self.table = RecordTableView(self.model)
+        self.table.set_actions(
+            5,
+            [
+                RowAction(
+                    "edit-2.svg", "ویرایش", lambda p: self.open_edit_dialog(p["id"])
+                ),
+                RowAction("trash-2.svg", "حذف", lambda p: self.delete_product(p["id"])),
+            ],
         )
-        self.table.verticalHeader().setVisible(False)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.setLayoutDirection(Qt.LayoutDirection.RightToLeft)
+        layout.addWidget(BusyIndicator(self.db_runner))
         layout.addWidget(self.table)
 
-        self.load_products()
-
-    def load_products(self, search_term=None):
-        products = (
-            self.db_manager.search_products(search_term)
-            if search_term
-            else self.db_manager.get_all_products()
-        )
-        self.table.setRowCount(len(products))
-        for row, product in enumerate(products):
-            self.table.setItem(row, 0, QTableWidgetItem(str(product["id"])))
-            self.table.setItem(row, 1, QTableWidgetItem(product["name"]))
-            self.table.setItem(row, 2, QTableWidgetItem(product["description"]))
-            self.table.setItem(row, 3, QTableWidgetItem(product["unit"]))
-            self.table.setItem(
-                row, 4, QTableWidgetItem(f"{product['unit_price']:,.0f} ریال")
-            )
-            stock_qty = (
-                product["stock_quantity"] if "stock_quantity" in product.keys() else 0
-            )
-            self.table.setItem(row, 5, QTableWidgetItem(str(stock_qty)))
-
-            self.add_action_buttons(row, product["id"])
-
-        self.table.setColumnHidden(0, True)
-
-    def add_action_buttons(self, row, product_id):
-        widget = QWidget()
-        layout = QHBoxLayout(widget)
-        layout.setContentsMargins(0, 0, 0, 0)
-        layout.setSpacing(5)
-        layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        edit_btn = QPushButton(
-            icon=QIcon(resource_path("assets/icons/edit-2.svg")),
-            toolTip="ویرایش",
+        self.search = SearchController(
+            self.search_input,
+            self.db_runner,
+            self.db_manager.search_products,
+            self.db_manager.get_products_page,
+            self.model.show_result,
             parent=self,
         )
-        edit_btn.setProperty("class", "actionButton")
-        edit_btn.clicked.connect(lambda: self.open_edit_dialog(product_id))
-        delete_btn = QPushButton(
-            icon=QIcon(resource_path("assets/icons/trash-2.svg")),
-            toolTip="حذف",
-            parent=self,
-        )
-        delete_btn.setProperty("class", "actionButton")
-        delete_btn.clicked.connect(lambda: self.delete_product(product_id))
-        layout.addWidget(edit_btn)
-        layout.addWidget(delete_btn)
-        self.table.setCellWidget(row, 6, widget)
+        self.search.refresh()
 
     def open_add_dialog(self):
         dialog = ProductDialog(self.db_manager, parent=self)
@@ -122,13 +90,9 @@ class ProductsPage(QWidget):
             success, msg = self.db_manager.delete_product(product_id)
             if success:
                 QMessageBox.information(self, "موفق", msg)
-                self.refresh_data()
+                signal_bus.product_saved.emit()
             else:
                 QMessageBox.critical(self, "خطا", msg)
 
-    def search_products(self):
-        self.load_products(self.search_input.text())
-
     def refresh_data(self):
-        self.search_input.clear()
-        self.load_products()
+        self.search.reset()
@@ -17,7 +17,9 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont
 
+from db_worker import BusyIndicator, DbRunner
 from signal_bus import signal_bus
+from utils import normalize_date
 
 
 class ReportsPage(QWidget):
@@ -81,6 +83,12 @@ class ReportsPage(QWidget):
         self.result_display = QTextEdit(readOnly=True)
         self.result_display.setFont(QFont("Vazirmatn-Regular", 11))
         main_layout.addWidget(QLabel("نتیجه گزارش:"))
+
+        # کوئری‌های گزارش روی ترد کارگر اجرا می‌شوند؛ تا پایان هر گزارش دکمه‌ها غیرفعال‌اند.
+        self.db_runner = DbRunner(self.db_manager, self)
+        self.db_runner.busy_changed.connect(self.generate_profit_loss_btn.setDisabled)
+        self.db_runner.busy_changed.connect(self.generate_report_btn.setDisabled)
+        main_layout.addWidget(BusyIndicator(self.db_runner))
         main_layout.addWidget(self.result_display, 1)
 
         signal_bus.invoice_saved.connect(self.refresh_dashboard)
@@ -91,17 +99,46 @@ class ReportsPage(QWidget):
         """این متد برای سازگاری با سیگنال‌ها باقی مانده و در آینده می‌تواند آمارها را رفرش کند."""
         pass
 
+    def _read_date_range(self):
+        """
+        تاریخ‌های ورودی را خوانده و به شکل استاندارد (مثلاً 1403/1/5 به 1403/01/05) تبدیل می‌کند.
+        در صورت نامعتبر بودن پیام خطا نمایش داده و (None, None) برمی‌گرداند.
+        """
+        start_date = normalize_date(self.start_date_input.text())
+        end_date = normalize_date(self.end_date_input.text())
+        if not start_date or not end_date:
+            QMessageBox.warning(
+                self,
+                "خطا",
+                "لطفاً تاریخ شروع و پایان را به شکل صحیح (مثلاً 1403/01/01) وارد کنید.",
+            )
+            return None, None
+        self.start_date_input.setText(start_date)
+        self.end_date_input.setText(end_date)
+        return start_date, end_date
+
     def generate_profit_loss_report(self):
         """گزارش نهایی سود و زیان را با تمام جزئیات نمایش می‌دهد."""
-        start_date = self.start_date_input.text().strip()
-        end_date = self.end_date_input.text().strip()
+        start_date, end_date = self._read_date_range()
         if not start_date or not end_date:
-            QMessageBox.warning(self, "خطا", "لطفاً تاریخ شروع و پایان را مشخص کنید.")
             return
 
-        try:
-            data = self.db_manager.get_detailed_financial_summary(start_date, end_date)
+        self.db_runner.submit(
+            self.db_manager.get_detailed_financial_summary,
+            start_date,
+            end_date,
+            on_result=lambda data: self.show_profit_loss_report(
+                data, start_date, end_date
+            ),
+            on_error=self._show_profit_loss_error,
+        )
 
+    def _show_profit_loss_error(self, e):
+        QMessageBox.critical(self, "خطا در تهیه گزارش", str(e))
+        self.result_display.setText(f"خطا در تولید گزارش: {e}")
+
+    def show_profit_loss_report(self, data, start_date, end_date):
+        try:
             html = f"""<h3 align="center">گزارش سود و زیان نهایی</h3>
                       <p align="center">از تاریخ {start_date} تا {end_date}</p><hr>"""
 
@@ -145,8 +182,7 @@ class ReportsPage(QWidget):
             import traceback
 
             traceback.print_exc()
-            QMessageBox.critical(self, "خطا در تهیه گزارش", str(e))
-            self.result_display.setText(f"خطا در تولید گزارش: {e}")
+            self._show_profit_loss_error(e)
 
     def generate_general_report(self):
         """گزارش‌های عمومی را تولید می‌کند."""
@@ -161,8 +197,17 @@ class ReportsPage(QWidget):
             self.generate_customers_list_report()
 
     def generate_financial_summary(self):
+        self.db_runner.submit(
+            self.db_manager.get_financial_summary,
+            on_result=self.show_financial_summary,
+            on_error=self._show_report_error,
+        )
+
+    def _show_report_error(self, e):
+        self.result_display.setText(f"خطا در تولید گزارش: {e}")
+
+    def show_financial_summary(self, summary):
         try:
-            summary = self.db_manager.get_financial_summary()
             report_text = f"""<h3 align="center">خلاصه عملکرد مالی کل</h3>
                                  <p align="right" style="font-size:14px; direction:rtl;"><b>کل درآمد وصول شده:</b> {summary.get("total_income", 0):,.0f} ریال</p>
                                  <p align="right" style="font-size:14px; direction:rtl;"><b>کل هزینه‌های ثبت شده:</b> {summary.get("total_expenses", 0):,.0f} ریال</p>
@@ -172,8 +217,14 @@ class ReportsPage(QWidget):
             self.result_display.setText(f"خطا در تولید گزارش: {e}")
 
     def generate_invoices_list_report(self):
+        self.db_runner.submit(
+            self.db_manager.get_all_invoices,
+            on_result=self.show_invoices_list_report,
+            on_error=self._show_report_error,
+        )
+
+    def show_invoices_list_report(self, invoices):
         try:
-            invoices = self.db_manager.get_all_invoices()
             if not invoices:
                 self.result_display.setText("هیچ فاکتوری برای نمایش وجود ندارد.")
                 return
@@ -199,8 +250,14 @@ class ReportsPage(QWidget):
             self.result_display.setText(f"خطا در تولید گزارش: {e}")
 
     def generate_customers_list_report(self):
+        self.db_runner.submit(
+            self.db_manager.get_all_customers,
+            on_result=self.show_customers_list_report,
+            on_error=self._show_report_error,
+        )
+
+    def show_customers_list_report(self, customers):
         try:
-            customers = self.db_manager.get_all_customers()
             if not customers:
                 self.result_display.setText("هیچ مشتری برای نمایش وجود ندارد.")
                 return
@@ -223,15 +280,24 @@ class ReportsPage(QWidget):
 
     def generate_journal_report(self):
         """گزارش دفتر روزنامه را برای بازه زمانی انتخابی تولید و نمایش می‌دهد."""
-        start_date = self.start_date_input.text().strip()
-        end_date = self.end_date_input.text().strip()
-
+        start_date, end_date = self._read_date_range()
         if not start_date or not end_date:
-            QMessageBox.warning(self, "خطا", "لطفاً تاریخ شروع و پایان را مشخص کنید.")
             return
 
+        self.db_runner.submit(
+            self.db_manager.get_general_journal,
+            start_date,
+            end_date,
+            on_result=lambda transactions: self.show_journal_report(
+                transactions, start_date, end_date
+            ),
+            on_error=lambda e: self.result_display.setText(
+                f"خطا در تولید گزارش دفتر روزنامه: {e}"
+            ),
+        )
+
+    def show_journal_report(self, transactions, start_date, end_date):
         try:
-            transactions = self.db_manager.get_general_journal(start_date, end_date)
             if not transactions:
                 self.result_display.setText("هیچ تراکنشی در این بازه زمانی یافت نشد.")
                 return
@@ -1,5 +1,5 @@
 # file: pages/settings_page.py
-import os, csv, json, datetime, traceback, shutil
+import os, datetime, time, traceback
 from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -19,15 +19,31 @@ from PySide6.QtWidgets import (
     QTableWidget,
     QTableWidgetItem,
     QGridLayout,
+    QProgressBar,
+    QCheckBox,
+    QSpinBox,
 )
-from PySide6.QtCore import Qt, QSettings
+from PySide6.QtCore import Qt, QSettings, QTimer
+import jdatetime
 from PySide6.QtGui import QIcon, QPixmap
 from functools import partial
 from dialogs.fee_template_dialog import FeeTemplateDialog
 from dialogs.account_dialog import AccountDialog
+from backup_engine import DatabaseBackup
+from backup_scheduler import load_backup_schedule, save_backup_schedule
+from csv_export import CsvExporter, EXPORT_TABLE_TITLES
 from db_manager import DatabaseManager
+from db_worker import DbRunner, ProgressJob, db_threads_idle
+from incremental_backup import SnapshotJob
+from restore_engine import prepare_restore, staging_path, swap_in_database
+from signal_bus import signal_bus
 from utils import resource_path
 
+# جایگزینی دیتابیس بازیابی شده تا پایان کارهای کوتاه تردهای کارگر به تعویق می‌افتد
+# (بدون قفل کردن پنجره): فاصله بررسی دوباره (میلی‌ثانیه) و حداکثر انتظار (ثانیه).
+RESTORE_SWAP_RETRY_MS = 100
+RESTORE_SWAP_TIMEOUT = 15
+
 
 class SettingsPage(QWidget):
     def __init__(self, parent=None):
@@ -61,6 +77,8 @@ class SettingsPage(QWidget):
             self.load_accounts_data()
         elif self.tabs.widget(index) == self.financial_tab:
             self.load_financial_settings()
+        elif self.tabs.widget(index) == self.backup_tab:
+            self.load_snapshots()
 
     def setup_company_info_tab(self):
         tab_layout = QVBoxLayout(self.company_info_tab)
@@ -134,6 +152,7 @@ class SettingsPage(QWidget):
         settings.setValue("address", self.company_address_input.text())
         settings.setValue("logo_path", self.logo_path_input.text())
         settings.endGroup()
+        signal_bus.company_settings_saved.emit()
         QMessageBox.information(self, "موفقیت", "تنظیمات شرکت با موفقیت ذخیره شد.")
 
     def browse_logo(self):
@@ -423,7 +442,88 @@ class SettingsPage(QWidget):
         buttons_layout.addWidget(self.restore_btn)
         buttons_layout.addStretch()
         frame_layout.addLayout(buttons_layout)
+
+        backup_progress_layout = QHBoxLayout()
+        self.backup_progress = QProgressBar()
+        self.cancel_backup_btn = QPushButton("لغو")
+        backup_progress_layout.addWidget(self.backup_progress, 1)
+        backup_progress_layout.addWidget(self.cancel_backup_btn)
+        frame_layout.addLayout(backup_progress_layout)
+
+        # پشتیبان‌گیری با API پشتیبان SQLite و روی ترد کارگر انجام می‌شود.
+        self.database_backup = DatabaseBackup(self.db_manager, self)
+        self.database_backup.progress.connect(self.show_backup_progress)
+        self.database_backup.finished.connect(self.on_backup_finished)
+        self.database_backup.failed.connect(self.on_backup_failed)
+        self.database_backup.cancelled.connect(self.on_backup_cancelled)
+        # بررسی و آماده‌سازی فایل بازیابی هم روی ترد کارگر انجام می‌شود.
+        self.restore_job = ProgressJob(self.db_manager, self)
+        self.restore_job.progress.connect(self.show_backup_progress)
+        self.restore_job.finished.connect(self.on_restore_prepared)
+        self.restore_job.failed.connect(self.on_restore_failed)
+        self.restore_job.cancelled.connect(self.on_backup_cancelled)
+        self.cancel_backup_btn.clicked.connect(self.database_backup.cancel)
+        self.cancel_backup_btn.clicked.connect(self.restore_job.cancel)
+        self._swap_pending = False
+        self._scheduled_backup_running = False
+        self._set_backup_running(False)
+        signal_bus.database_restored.connect(self.load_snapshots)
+        signal_bus.database_restored.connect(self.load_accounts_data)
+        signal_bus.database_restored.connect(self.load_financial_settings)
         layout.addWidget(backup_frame)
+
+        snapshots_frame = QFrame(objectName="formDialog")
+        snapshots_layout = QVBoxLayout(snapshots_frame)
+        snapshots_layout.addWidget(QLabel("نسخه‌های پشتیبان افزایشی"))
+        snapshots_desc = QLabel(
+            "در هر نسخه افزایشی فقط بخش‌هایی از دیتابیس که از نسخه قبلی تغییر کرده‌اند ذخیره می‌شوند و هر نسخه به طور کامل قابل بازیابی است."
+        )
+        snapshots_desc.setWordWrap(True)
+        snapshots_layout.addWidget(snapshots_desc)
+        self.snapshots_table = QTableWidget()
+        self.snapshots_table.setColumnCount(4)
+        self.snapshots_table.setHorizontalHeaderLabels(
+            ["تاریخ", "حجم دیتابیس", "صفحه‌های تغییر کرده", "حجم ذخیره شده"]
+        )
+        self.snapshots_table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.Stretch
+        )
+        self.snapshots_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.snapshots_table.setSelectionBehavior(
+            QTableWidget.SelectionBehavior.SelectRows
+        )
+        self.snapshots_table.setSelectionMode(
+            QTableWidget.SelectionMode.SingleSelection
+        )
+        self.snapshots_table.setMinimumHeight(160)
+        snapshots_layout.addWidget(self.snapshots_table)
+        snapshot_buttons_layout = QHBoxLayout()
+        self.create_snapshot_btn = QPushButton("تهیه نسخه افزایشی")
+        self.create_snapshot_btn.clicked.connect(self.create_snapshot)
+        self.restore_snapshot_btn = QPushButton("بازیابی نسخه انتخاب شده")
+        self.restore_snapshot_btn.clicked.connect(self.restore_selected_snapshot)
+        snapshot_buttons_layout.addStretch()
+        snapshot_buttons_layout.addWidget(self.create_snapshot_btn)
+        snapshot_buttons_layout.addWidget(self.restore_snapshot_btn)
+        snapshots_layout.addLayout(snapshot_buttons_layout)
+        snapshot_progress_layout = QHBoxLayout()
+        self.snapshot_progress = QProgressBar()
+        self.cancel_snapshot_btn = QPushButton("لغو")
+        snapshot_progress_layout.addWidget(self.snapshot_progress, 1)
+        snapshot_progress_layout.addWidget(self.cancel_snapshot_btn)
+        snapshots_layout.addLayout(snapshot_progress_layout)
+
+        self.snapshots_runner = DbRunner(self.db_manager, self)
+        self.snapshot_job = SnapshotJob(self.db_manager, self)
+        self.snapshot_job.progress.connect(self.show_snapshot_progress)
+        self.snapshot_job.finished.connect(self.on_snapshot_job_finished)
+        self.snapshot_job.failed.connect(self.on_snapshot_job_failed)
+        self.snapshot_job.cancelled.connect(self.on_snapshot_job_cancelled)
+        self.cancel_snapshot_btn.clicked.connect(self.snapshot_job.cancel)
+        self._snapshot_restore_path = None
+        self._set_snapshot_job_running(False)
+        layout.addWidget(snapshots_frame)
+        layout.addWidget(self._create_backup_schedule_frame())
         export_frame = QFrame(objectName="formDialog")
         export_layout = QVBoxLayout(export_frame)
         export_title = QLabel("خروجی گرفتن از داده‌ها (CSV)")
@@ -442,14 +542,184 @@ class SettingsPage(QWidget):
         self.export_invoices_btn.clicked.connect(self.export_invoices)
         self.export_expenses_btn = QPushButton("خروجی هزینه‌ها")
         self.export_expenses_btn.clicked.connect(self.export_expenses)
+        self.export_all_btn = QPushButton("خروجی همه جدول‌ها")
+        self.export_all_btn.clicked.connect(self.export_all_tables)
         csv_buttons_layout.addWidget(self.export_customers_btn, 0, 0)
         csv_buttons_layout.addWidget(self.export_products_btn, 0, 1)
         csv_buttons_layout.addWidget(self.export_invoices_btn, 1, 0)
         csv_buttons_layout.addWidget(self.export_expenses_btn, 1, 1)
+        csv_buttons_layout.addWidget(self.export_all_btn, 2, 0, 1, 2)
         export_layout.addLayout(csv_buttons_layout)
+        self.csv_export_buttons = [
+            self.export_customers_btn,
+            self.export_products_btn,
+            self.export_invoices_btn,
+            self.export_expenses_btn,
+            self.export_all_btn,
+        ]
+
+        progress_layout = QHBoxLayout()
+        self.csv_export_progress = QProgressBar()
+        self.cancel_csv_export_btn = QPushButton("لغو خروجی")
+        progress_layout.addWidget(self.csv_export_progress, 1)
+        progress_layout.addWidget(self.cancel_csv_export_btn)
+        export_layout.addLayout(progress_layout)
+
+        # خروجی CSV روی ترد کارگر و به صورت استریمی نوشته می‌شود.
+        self.csv_exporter = CsvExporter(self.db_manager, self)
+        self.csv_exporter.progress.connect(self.show_csv_export_progress)
+        self.csv_exporter.finished.connect(self.on_csv_export_finished)
+        self.csv_exporter.failed.connect(self.on_csv_export_failed)
+        self.csv_exporter.cancelled.connect(self.on_csv_export_cancelled)
+        self.cancel_csv_export_btn.clicked.connect(self.csv_exporter.cancel)
+        self._set_csv_export_running(False)
         layout.addWidget(export_frame)
         layout.addStretch()
 
+        # بازیابی تا پایان کارهای طولانی دیگر روی دیتابیس ممکن نیست.
+        for job in (
+            self.database_backup,
+            self.restore_job,
+            self.snapshot_job,
+            self.csv_exporter,
+        ):
+            job.runner.busy_changed.connect(self._update_restore_buttons)
+        signal_bus.backup_started.connect(self.on_scheduled_backup_started)
+        self._update_restore_buttons()
+
+    def _create_backup_schedule_frame(self):
+        frame = QFrame(objectName="formDialog")
+        frame_layout = QVBoxLayout(frame)
+        frame_layout.addWidget(QLabel("پشتیبان‌گیری خودکار"))
+        description = QLabel(
+            "نسخه‌های فشرده به صورت خودکار و در پس‌زمینه (زمانی که اطلاعاتی ثبت نمی‌شود) تهیه شده و نسخه‌های قدیمی طبق تنظیمات نگهداری حذف می‌شوند."
+        )
+        description.setWordWrap(True)
+        frame_layout.addWidget(description)
+
+        form_layout = QFormLayout()
+        self.schedule_enabled_check = QCheckBox("فعال")
+        self.schedule_interval_spin = QSpinBox()
+        self.schedule_interval_spin.setRange(1, 168)
+        self.schedule_interval_spin.setSuffix(" ساعت")
+        self.schedule_on_exit_check = QCheckBox("تهیه نسخه هنگام بستن برنامه")
+        self.schedule_folder_input = QLineEdit()
+        browse_folder_btn = QPushButton("انتخاب پوشه")
+        browse_folder_btn.clicked.connect(self.browse_backup_folder)
+        folder_layout = QHBoxLayout()
+        folder_layout.addWidget(self.schedule_folder_input, 1)
+        folder_layout.addWidget(browse_folder_btn)
+        self.keep_daily_spin = QSpinBox()
+        self.keep_weekly_spin = QSpinBox()
+        self.keep_monthly_spin = QSpinBox()
+        for spin in (
+            self.keep_daily_spin,
+            self.keep_weekly_spin,
+            self.keep_monthly_spin,
+        ):
+            spin.setRange(0, 365)
+        keep_layout = QHBoxLayout()
+        keep_layout.addWidget(QLabel("روزانه:"))
+        keep_layout.addWidget(self.keep_daily_spin)
+        keep_layout.addWidget(QLabel("هفتگی:"))
+        keep_layout.addWidget(self.keep_weekly_spin)
+        keep_layout.addWidget(QLabel("ماهانه:"))
+        keep_layout.addWidget(self.keep_monthly_spin)
+        keep_layout.addStretch()
+        self.last_backup_label = QLabel()
+        form_layout.addRow("پشتیبان‌گیری خودکار:", self.schedule_enabled_check)
+        form_layout.addRow("فاصله پشتیبان‌گیری:", self.schedule_interval_spin)
+        form_layout.addRow("", self.schedule_on_exit_check)
+        form_layout.addRow("پوشه پشتیبان‌ها:", folder_layout)
+        form_layout.addRow("تعداد نسخه‌های نگهداری:", keep_layout)
+        form_layout.addRow("آخرین پشتیبان خودکار:", self.last_backup_label)
+        frame_layout.addLayout(form_layout)
+
+        buttons_layout = QHBoxLayout()
+        save_btn = QPushButton("ذخیره تنظیمات پشتیبان‌گیری خودکار")
+        save_btn.clicked.connect(self.save_backup_schedule_settings)
+        self.run_scheduled_backup_btn = QPushButton("تهیه نسخه فشرده اکنون")
+        self.run_scheduled_backup_btn.clicked.connect(self.run_scheduled_backup_now)
+        buttons_layout.addStretch()
+        buttons_layout.addWidget(save_btn)
+        buttons_layout.addWidget(self.run_scheduled_backup_btn)
+        frame_layout.addLayout(buttons_layout)
+
+        signal_bus.backup_completed.connect(self.on_scheduled_backup_completed)
+        signal_bus.backup_failed.connect(self.on_scheduled_backup_failed)
+        self.load_backup_schedule_settings()
+        return frame
+
+    def load_backup_schedule_settings(self):
+        schedule = load_backup_schedule()
+        self.schedule_enabled_check.setChecked(schedule["enabled"])
+        self.schedule_interval_spin.setValue(schedule["interval_hours"])
+        self.schedule_on_exit_check.setChecked(schedule["on_exit"])
+        self.schedule_folder_input.setText(schedule["folder"])
+        self.keep_daily_spin.setValue(schedule["keep_daily"])
+        self.keep_weekly_spin.setValue(schedule["keep_weekly"])
+        self.keep_monthly_spin.setValue(schedule["keep_monthly"])
+        if schedule["last_run"] is None:
+            self.last_backup_label.setText("-")
+        else:
+            last_run = jdatetime.datetime.fromgregorian(datetime=schedule["last_run"])
+            self.last_backup_label.setText(last_run.strftime("%Y/%m/%d %H:%M"))
+
+    def browse_backup_folder(self):
+        folder = QFileDialog.getExistingDirectory(
+            self, "انتخاب پوشه پشتیبان‌ها", self.schedule_folder_input.text()
+        )
+        if folder:
+            self.schedule_folder_input.setText(folder)
+
+    def _store_backup_schedule(self):
+        folder = self.schedule_folder_input.text().strip()
+        if not folder:
+            QMessageBox.warning(self, "خطا", "لطفاً پوشه پشتیبان‌ها را مشخص کنید.")
+            return False
+        save_backup_schedule(
+            {
+                "enabled": self.schedule_enabled_check.isChecked(),
+                "interval_hours": self.schedule_interval_spin.value(),
+                "on_exit": self.schedule_on_exit_check.isChecked(),
+                "folder": folder,
+                "keep_daily": self.keep_daily_spin.value(),
+                "keep_weekly": self.keep_weekly_spin.value(),
+                "keep_monthly": self.keep_monthly_spin.value(),
+            }
+        )
+        return True
+
+    def save_backup_schedule_settings(self):
+        if self._store_backup_schedule():
+            QMessageBox.information(
+                self, "موفقیت", "تنظیمات پشتیبان‌گیری خودکار با موفقیت ذخیره شد."
+            )
+
+    def run_scheduled_backup_now(self):
+        if not self._store_backup_schedule():
+            return
+        self.run_scheduled_backup_btn.setEnabled(False)
+        self.last_backup_label.setText("در حال تهیه نسخه فشرده...")
+        signal_bus.backup_requested.emit()
+
+    def on_scheduled_backup_started(self):
+        self._scheduled_backup_running = True
+        self._update_restore_buttons()
+
+    def on_scheduled_backup_completed(self, path):
+        self._scheduled_backup_running = False
+        self._update_restore_buttons()
+        self.run_scheduled_backup_btn.setEnabled(True)
+        self.load_backup_schedule_settings()
+
+    def on_scheduled_backup_failed(self, message):
+        self._scheduled_backup_running = False
+        self._update_restore_buttons()
+        self.run_scheduled_backup_btn.setEnabled(True)
+        self.load_backup_schedule_settings()
+        QMessageBox.critical(self, "خطا در پشتیبان‌گیری", f"خطایی رخ داد: {message}")
+
     def handle_backup(self):
         db_path = self.db_manager.db_name
         if not os.path.exists(db_path):
@@ -462,19 +732,90 @@ class SettingsPage(QWidget):
         save_path, _ = QFileDialog.getSaveFileName(
             self, "ذخیره فایل پشتیبان", default_filename, "Database Files (*.db)"
         )
-        if save_path:
-            try:
-                shutil.copy(db_path, save_path)
-                QMessageBox.information(
-                    self,
-                    "موفقیت",
-                    f"نسخه پشتیبان با موفقیت در مسیر زیر ذخیره شد:\n{save_path}",
-                )
-            except Exception as e:
-                QMessageBox.critical(self, "خطا در پشتیبان‌گیری", f"خطایی رخ داد: {e}")
+        if not save_path:
+            return
+        if os.path.abspath(save_path) == os.path.abspath(db_path):
+            QMessageBox.warning(
+                self, "خطا", "فایل پشتیبان نمی‌تواند همان فایل دیتابیس برنامه باشد."
+            )
+            return
+        self._set_backup_running(True)
+        self.backup_progress.setRange(0, 0)
+        self.database_backup.start(save_path)
+
+    def _set_backup_running(self, running):
+        self.backup_btn.setEnabled(not running)
+        self.backup_progress.setVisible(running)
+        self.cancel_backup_btn.setVisible(running)
+
+    def _restore_blocker(self):
+        """نام کار طولانی‌ای که بازیابی باید تا پایان آن صبر کند، یا None."""
+        if self.restore_job.is_running() or self._swap_pending:
+            return "بازیابی در حال انجام"
+        if self.database_backup.is_running():
+            return "تهیه نسخه پشتیبان"
+        if self.snapshot_job.is_running():
+            return "کار نسخه افزایشی"
+        if self.csv_exporter.is_running():
+            return "خروجی CSV"
+        if self._scheduled_backup_running:
+            return "پشتیبان‌گیری خودکار"
+        return None
+
+    def _update_restore_buttons(self, *args):
+        enabled = self._restore_blocker() is None
+        self.restore_btn.setEnabled(enabled)
+        self.restore_snapshot_btn.setEnabled(enabled)
+
+    def _check_restore_allowed(self):
+        blocker = self._restore_blocker()
+        if blocker is None:
+            return True
+        QMessageBox.warning(
+            self,
+            "بازیابی ممکن نیست",
+            f"تا پایان «{blocker}» نمی‌توان اطلاعات را بازیابی کرد.\n"
+            "لطفاً صبر کنید یا آن کار را لغو کنید و دوباره تلاش کنید.",
+        )
+        return False
+
+    def show_backup_progress(self, done, total):
+        if not (self.database_backup.is_running() or self.restore_job.is_running()):
+            return
+        self.backup_progress.setRange(0, max(total, 1))
+        self.backup_progress.setValue(done)
+
+    def on_backup_finished(self, result):
+        self._set_backup_running(False)
+        size_mb = result["size"] / (1024 * 1024)
+        QMessageBox.information(
+            self,
+            "موفقیت",
+            f"نسخه پشتیبان با موفقیت در مسیر زیر ذخیره شد:\n{result['path']}\n"
+            f"حجم: {size_mb:,.1f} مگابایت - صحت فایل بررسی شد.",
+        )
+
+    def on_backup_failed(self, message):
+        self._set_backup_running(False)
+        QMessageBox.critical(self, "خطا در پشتیبان‌گیری", f"خطایی رخ داد: {message}")
+
+    def on_backup_cancelled(self):
+        self._set_backup_running(False)
 
     def handle_restore(self):
-        db_path = self.db_manager.db_name
+        if not self._check_restore_allowed() or not self._confirm_restore():
+            return
+        restore_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "انتخاب فایل پشتیبان برای بازیابی",
+            os.path.expanduser("~"),
+            "Backup Files (*.db *.db.gz);;All Files (*)",
+        )
+        if not restore_path:
+            return
+        self._start_restore(restore_path)
+
+    def _confirm_restore(self):
         warning_message = "توجه!\nاین عمل تمام اطلاعات فعلی شما را حذف کرده و اطلاعات فایل پشتیبان را جایگزین آن می‌کند.\nاین عمل غیرقابل بازگشت است.\nآیا از ادامه کار مطمئن هستید؟"
         reply = QMessageBox.critical(
             self,
@@ -485,144 +826,259 @@ class SettingsPage(QWidget):
         )
         if reply != QMessageBox.StandardButton.Yes:
             QMessageBox.information(self, "لغو شد", "عملیات بازیابی لغو شد.")
+            return False
+        return True
+
+    def _start_restore(self, restore_path):
+        """فایل پشتیبان روی ترد کارگر کپی و بررسی شده و سپس جایگزین دیتابیس می‌شود."""
+        # کار دیگری ممکن است پس از آماده شدن نسخه افزایشی شروع شده باشد.
+        if not self._check_restore_allowed():
+            if restore_path == staging_path(self.db_manager.db_name) and (
+                os.path.exists(restore_path)
+            ):
+                os.remove(restore_path)
             return
-        restore_path, _ = QFileDialog.getOpenFileName(
-            self,
-            "انتخاب فایل پشتیبان برای بازیابی",
-            os.path.expanduser("~"),
-            "Database Files (*.db)",
-        )
-        if not restore_path:
-            return
-        try:
-            shutil.copy(restore_path, db_path)
-            QMessageBox.information(
-                self,
-                "موفقیت",
-                "اطلاعات با موفقیت بازیابی شد.\nلطفاً برای اعمال تغییرات، برنامه را ببندید و دوباره اجرا کنید.",
-            )
-        except Exception as e:
-            QMessageBox.critical(
-                self, "خطا در بازیابی", f"خطایی در هنگام بازیابی اطلاعات رخ داد: {e}"
-            )
+        self._set_backup_running(True)
+        self.backup_progress.setRange(0, 0)
+        self.restore_job.run(prepare_restore, restore_path, self.db_manager.db_name)
 
-    def _export_data_to_csv(self, data_method, table_name, file_path):
+    def on_restore_prepared(self, result):
+        self._swap_pending = True
+        self._update_restore_buttons()
+        # از این مرحله لغو ممکن نیست؛ جایگزینی فقط منتظر کارهای کوتاه باقی‌مانده است.
+        self.cancel_backup_btn.setVisible(False)
+        self._swap_deadline = time.monotonic() + RESTORE_SWAP_TIMEOUT
+        self._swap_in_restored(result)
+
+    def _swap_in_restored(self, result):
+        """
+        جایگزینی فایل فقط وقتی انجام می‌شود که هیچ کار دیتابیسی روی تردهای کارگر در
+        حال اجرا نباشد؛ تا آن زمان با QTimer دوباره بررسی می‌شود و پنجره قفل نمی‌شود.
+        """
+        if not db_threads_idle() and time.monotonic() < self._swap_deadline:
+            QTimer.singleShot(
+                RESTORE_SWAP_RETRY_MS, lambda: self._swap_in_restored(result)
+            )
+            return
+        self._swap_pending = False
+        db_path = self.db_manager.db_name
         try:
-            data_list = data_method()
-            if not data_list:
-                QMessageBox.information(
-                    self,
-                    "اطلاعاتی وجود ندارد",
-                    f"هیچ داده‌ای در جدول '{table_name}' برای خروجی گرفتن ثبت نشده است.",
+            if not db_threads_idle():
+                raise RuntimeError(
+                    "برنامه هنوز مشغول کار با دیتابیس است. لطفاً چند لحظه بعد دوباره تلاش کنید."
                 )
-                return False
-            headers = data_list[0].keys()
-            with open(file_path, "w", newline="", encoding="utf-8-sig") as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(headers)
-                for item in data_list:
-                    row_values = []
-                    for key in headers:
-                        value = item.get(key)
-                        row_values.append(
-                            json.dumps(value, ensure_ascii=False)
-                            if isinstance(value, (dict, list))
-                            else str(value) if value is not None else ""
-                        )
-                    writer.writerow(row_values)
-            return True
+            safety_path = swap_in_database(result["staged_path"], db_path)
         except Exception as e:
-            QMessageBox.critical(
-                self,
-                "خطا در ذخیره‌سازی",
-                f"خطایی در هنگام ذخیره فایل '{os.path.basename(file_path)}' رخ داد:\n{traceback.format_exc()}",
-            )
-            return False
+            traceback.print_exc()
+            if os.path.exists(result["staged_path"]):
+                os.remove(result["staged_path"])
+            self.on_restore_failed(str(e))
+            return
+        self._set_backup_running(False)
+        self._update_restore_buttons()
+        signal_bus.database_restored.emit()
+        QMessageBox.information(
+            self,
+            "موفقیت",
+            "اطلاعات با موفقیت بازیابی شد.\n"
+            f"نسخه قبلی دیتابیس در مسیر زیر نگه داشته شد:\n{safety_path}",
+        )
 
-    def export_customers(self):
-        today_str = datetime.date.today().strftime("%Y-%m-%d")
-        default_filename = f"مشتریان_export_{today_str}.csv"
-        file_path, _ = QFileDialog.getSaveFileName(
+    def on_restore_failed(self, message):
+        self._set_backup_running(False)
+        self._update_restore_buttons()
+        QMessageBox.critical(
             self,
-            "ذخیره فایل خروجی مشتریان",
-            default_filename,
-            "CSV Files (*.csv);;All Files (*)",
+            "خطا در بازیابی",
+            f"بازیابی انجام نشد و اطلاعات فعلی دست نخورده باقی ماند.\n{message}",
         )
-        if file_path and self._export_data_to_csv(
-            self.db_manager.get_all_customers, "مشتریان", file_path
-        ):
+
+    def load_snapshots(self):
+        self.snapshots_runner.cancel()
+        self.snapshots_runner.submit(
+            self.snapshot_job.store.list_snapshots,
+            on_result=self.show_snapshots,
+            on_error=lambda e: print(f"Error loading snapshots: {e}"),
+        )
+
+    def show_snapshots(self, snapshots):
+        self.snapshots_table.setRowCount(len(snapshots))
+        for row, snapshot in enumerate(snapshots):
+            created = jdatetime.datetime.fromgregorian(
+                datetime=datetime.datetime.fromisoformat(snapshot["created"])
+            )
+            date_item = QTableWidgetItem(created.strftime("%Y/%m/%d %H:%M:%S"))
+            date_item.setData(Qt.ItemDataRole.UserRole, snapshot["id"])
+            self.snapshots_table.setItem(row, 0, date_item)
+            self.snapshots_table.setItem(
+                row,
+                1,
+                QTableWidgetItem(f"{snapshot['db_size'] / (1024 * 1024):,.1f} MB"),
+            )
+            self.snapshots_table.setItem(
+                row,
+                2,
+                QTableWidgetItem(
+                    f"{snapshot['changed_pages']:,} از {snapshot['page_count']:,}"
+                ),
+            )
+            self.snapshots_table.setItem(
+                row,
+                3,
+                QTableWidgetItem(f"{snapshot['stored_bytes'] / (1024 * 1024):,.2f} MB"),
+            )
+
+    def create_snapshot(self):
+        self._snapshot_restore_path = None
+        self._set_snapshot_job_running(True)
+        self.snapshot_progress.setRange(0, 0)
+        self.snapshot_job.create()
+
+    def restore_selected_snapshot(self):
+        row = self.snapshots_table.currentRow()
+        if row < 0:
+            QMessageBox.warning(
+                self, "خطا", "لطفاً یک نسخه را برای بازیابی انتخاب کنید."
+            )
+            return
+        snapshot_id = self.snapshots_table.item(row, 0).data(Qt.ItemDataRole.UserRole)
+        if not self._check_restore_allowed() or not self._confirm_restore():
+            return
+        # نسخه مستقیم در فایل staging بازیابی (کنار دیتابیس) بازسازی می‌شود.
+        self._snapshot_restore_path = staging_path(self.db_manager.db_name)
+        self._set_snapshot_job_running(True)
+        self.snapshot_progress.setRange(0, 0)
+        self.snapshot_job.restore(snapshot_id, self._snapshot_restore_path)
+
+    def _set_snapshot_job_running(self, running):
+        self.create_snapshot_btn.setEnabled(not running)
+        self.snapshot_progress.setVisible(running)
+        self.cancel_snapshot_btn.setVisible(running)
+
+    def show_snapshot_progress(self, done, total):
+        if not self.snapshot_job.is_running():
+            return
+        self.snapshot_progress.setRange(0, max(total, 1))
+        self.snapshot_progress.setValue(done)
+
+    def on_snapshot_job_finished(self, result):
+        self._set_snapshot_job_running(False)
+        restore_path, self._snapshot_restore_path = self._snapshot_restore_path, None
+        if restore_path is None:
+            self.load_snapshots()
             QMessageBox.information(
                 self,
                 "موفقیت",
-                f"اطلاعات مشتریان با موفقیت در فایل زیر ذخیره شد:\n{file_path}",
+                f"نسخه افزایشی با موفقیت تهیه شد.\n"
+                f"صفحه‌های تغییر کرده: {result['changed_pages']:,} - "
+                f"حجم ذخیره شده: {result['stored_bytes'] / (1024 * 1024):,.2f} مگابایت",
             )
+            return
+        self._start_restore(restore_path)
 
-    def export_products(self):
-        today_str = datetime.date.today().strftime("%Y-%m-%d")
-        default_filename = f"کالاها_export_{today_str}.csv"
-        file_path, _ = QFileDialog.getSaveFileName(
+    def on_snapshot_job_failed(self, message):
+        self._set_snapshot_job_running(False)
+        self._snapshot_restore_path = None
+        QMessageBox.critical(self, "خطا", f"خطایی رخ داد: {message}")
+
+    def on_snapshot_job_cancelled(self):
+        self._set_snapshot_job_running(False)
+        self._snapshot_restore_path = None
+
+    def _start_csv_export(self, jobs, success_message):
+        """jobs لیست (جدول، مسیر فایل) است که در یک نوبت روی ترد کارگر نوشته می‌شوند."""
+        self._csv_success_message = success_message
+        self._set_csv_export_running(True)
+        self.csv_export_progress.setRange(0, 0)
+        self.csv_exporter.start(jobs)
+
+    def _set_csv_export_running(self, running):
+        for button in self.csv_export_buttons:
+            button.setEnabled(not running)
+        self.csv_export_progress.setVisible(running)
+        self.cancel_csv_export_btn.setVisible(running)
+
+    def show_csv_export_progress(self, done, total):
+        if not self.csv_exporter.is_running():
+            return
+        self.csv_export_progress.setRange(0, max(total, 1))
+        self.csv_export_progress.setValue(done)
+        self.csv_export_progress.setFormat(f"{done:,} از {total:,} ردیف")
+
+    def on_csv_export_finished(self, results):
+        self._set_csv_export_running(False)
+        details = "\n".join(
+            f"{os.path.basename(file_path)} ({rows:,} ردیف)"
+            for _, file_path, rows in results
+        )
+        QMessageBox.information(
+            self, "موفقیت", f"{self._csv_success_message}\n{details}"
+        )
+
+    def on_csv_export_failed(self, message):
+        self._set_csv_export_running(False)
+        QMessageBox.critical(
             self,
-            "ذخیره فایل خروجی کالاها",
-            default_filename,
-            "CSV Files (*.csv);;All Files (*)",
+            "خطا در ذخیره‌سازی",
+            f"خطایی در هنگام ذخیره فایل CSV رخ داد:\n{message}",
         )
-        if file_path and self._export_data_to_csv(
-            self.db_manager.get_all_products, "کالاها", file_path
-        ):
-            QMessageBox.information(
-                self,
-                "موفقیت",
-                f"اطلاعات کالاها با موفقیت در فایل زیر ذخیره شد:\n{file_path}",
-            )
 
-    def export_expenses(self):
+    def on_csv_export_cancelled(self):
+        self._set_csv_export_running(False)
+
+    def _export_single_table(self, table, dialog_title):
+        title = EXPORT_TABLE_TITLES[table]
         today_str = datetime.date.today().strftime("%Y-%m-%d")
-        default_filename = f"هزینه‌ها_export_{today_str}.csv"
+        default_filename = f"{title}_export_{today_str}.csv"
         file_path, _ = QFileDialog.getSaveFileName(
             self,
-            "ذخیره فایل خروجی هزینه‌ها",
+            dialog_title,
             default_filename,
             "CSV Files (*.csv);;All Files (*)",
         )
-        if file_path and self._export_data_to_csv(
-            self.db_manager.get_all_expenses, "هزینه‌ها", file_path
-        ):
-            QMessageBox.information(
-                self,
-                "موفقیت",
-                f"اطلاعات هزینه‌ها با موفقیت در فایل زیر ذخیره شد:\n{file_path}",
+        if file_path:
+            self._start_csv_export(
+                [(table, file_path)],
+                f"اطلاعات {title} با موفقیت در فایل زیر ذخیره شد:\n{file_path}",
             )
 
-    def export_invoices(self):
-        invoices = self.db_manager.get_all_invoices()
-        if not invoices:
-            QMessageBox.information(
-                self,
-                "اطلاعاتی وجود ندارد",
-                "هیچ فاکتوری برای خروجی گرفتن ثبت نشده است.",
-            )
-            return
-        folder_path = QFileDialog.getExistingDirectory(
-            self, "انتخاب پوشه برای ذخیره فایل‌های خروجی فاکتورها"
-        )
+    def export_customers(self):
+        self._export_single_table("customers", "ذخیره فایل خروجی مشتریان")
+
+    def export_products(self):
+        self._export_single_table("products", "ذخیره فایل خروجی کالاها")
+
+    def export_expenses(self):
+        self._export_single_table("expenses", "ذخیره فایل خروجی هزینه‌ها")
+
+    def _export_tables_to_folder(self, tables, dialog_title):
+        folder_path = QFileDialog.getExistingDirectory(self, dialog_title)
         if not folder_path:
             return
         today_str = datetime.date.today().strftime("%Y-%m-%d")
-        invoices_path = os.path.join(folder_path, f"فاکتورها_{today_str}.csv")
-        items_path = os.path.join(folder_path, f"اقلام_فاکتورها_{today_str}.csv")
-        success1 = self._export_data_to_csv(lambda: invoices, "فاکتورها", invoices_path)
-        success2 = True
-        invoice_items = self.db_manager.get_all_invoice_items()
-        if invoice_items:
-            success2 = self._export_data_to_csv(
-                lambda: invoice_items, "اقلام_فاکتورها", items_path
-            )
-        if success1 and success2:
-            QMessageBox.information(
-                self,
-                "موفقیت",
-                f"فایل‌های خروجی با موفقیت در پوشه زیر ذخیره شدند:\n{folder_path}",
+        jobs = [
+            (
+                table,
+                os.path.join(
+                    folder_path, f"{EXPORT_TABLE_TITLES[table]}_{today_str}.csv"
+                ),
             )
+            for table in tables
+        ]
+        self._start_csv_export(
+            jobs, f"فایل‌های خروجی با موفقیت در پوشه زیر ذخیره شدند:\n{folder_path}"
+        )
+
+    def export_invoices(self):
+        self._export_tables_to_folder(
+            ["invoices", "invoice_items"],
+            "انتخاب پوشه برای ذخیره فایل‌های خروجی فاکتورها",
+        )
+
+    def export_all_tables(self):
+        self._export_tables_to_folder(
+            list(EXPORT_TABLE_TITLES), "انتخاب پوشه برای ذخیره خروجی همه جدول‌ها"
+        )
 
     def load_settings(self):
         settings = QSettings("MySoft", "HesabYar")
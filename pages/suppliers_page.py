@@ -5,17 +5,16 @@ from PySide6.QtWidgets import (
     QHBoxLayout,
     QPushButton,
     QLineEdit,
-    QTableWidget,
-    QTableWidgetItem,
-    QHeaderView,
     QMessageBox,
     QDialog,
 )
 from PySide6.QtGui import QIcon
-from PySide6.QtCore import Qt
 
 from dialogs.supplier_dialog import SupplierDialog
 from dialogs.custom_message_box import CustomMessageBox
+from db_worker import BusyIndicator, DbRunner
+from record_table import Column, RecordTableModel, RecordTableView, RowAction
+from search_controller import SearchController
 from signal_bus import signal_bus
 from utils import resource_path
 
@@ -36,52 +35,47 @@ class SuppliersPage(QWidget):
         top_layout.addWidget(add_btn)
         layout.addLayout(top_layout)
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(
-            ["ID", "نام تامین‌کننده", "تلفن", "آدرس", "کد ملی/شناسه", "عملیات"]
+        self.db_runner = DbRunner(self.db_manager, self)
+        self.model = RecordTableModel(
+            [
+                Column("نام تامین‌کننده", "name"),
+                Column("تلفن", "phone"),
+                Column("آدرس", "address"),
+                Column("کد ملی/شناسه", "national_id"),
+                Column("عملیات"),
+            ],
+            fetch_page=self.db_manager.get_suppliers_page,
+            runner=self.db_runner,
+            parent=self,
         )
-        self.table.horizontalHeader().setSectionResizeMode(
-            QHeaderView.ResizeMode.Stretch
+        self.table = RecordTableView(self.model)
+        self.table.set_actions(
+            4,
+            [
+                RowAction(
+                    "edit-2.svg", "ویرایش", lambda s: self.edit_supplier(s["id"])
+                ),
+                RowAction(
+                    "trash-2.svg", "حذف", lambda s: self.delete_supplier(s["id"])
+                ),
+            ],
         )
-        self.table.horizontalHeader().setSectionResizeMode(
-            5, QHeaderView.ResizeMode.ResizeToContents
-        )
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.table.setColumnHidden(0, True)
-        self.table.setLayoutDirection(Qt.LayoutDirection.RightToLeft)
+        layout.addWidget(BusyIndicator(self.db_runner))
         layout.addWidget(self.table)
 
+        self.search = SearchController(
+            self.search_input,
+            self.db_runner,
+            self.db_manager.search_suppliers,
+            self.db_manager.get_suppliers_page,
+            self.model.show_result,
+            parent=self,
+        )
+
         add_btn.clicked.connect(self.add_new_supplier)
         signal_bus.supplier_saved.connect(self.refresh_data)
 
-        self.load_suppliers()
-
-    def load_suppliers(self):
-        suppliers = self.db_manager.get_all_suppliers()
-        self.table.setRowCount(len(suppliers))
-        for row, supplier in enumerate(suppliers):
-            self.table.setItem(row, 0, QTableWidgetItem(str(supplier["id"])))
-            self.table.setItem(row, 1, QTableWidgetItem(supplier["name"]))
-            self.table.setItem(row, 2, QTableWidgetItem(supplier["phone"]))
-            self.table.setItem(row, 3, QTableWidgetItem(supplier["address"]))
-            self.table.setItem(row, 4, QTableWidgetItem(supplier["national_id"]))
-            self.add_action_buttons(row, supplier["id"])
-
-    def add_action_buttons(self, row, supplier_id):
-        widget = QWidget()
-        layout = QHBoxLayout(widget)
-        layout.setContentsMargins(0, 0, 0, 0)
-
-        edit_btn = QPushButton(icon=QIcon(resource_path("assets/icons/edit-2.svg")), toolTip="ویرایش")
-        delete_btn = QPushButton(icon=QIcon(resource_path("assets/icons/trash-2.svg")), toolTip="حذف")
-
-        edit_btn.clicked.connect(lambda: self.edit_supplier(supplier_id))
-        delete_btn.clicked.connect(lambda: self.delete_supplier(supplier_id))
-
-        layout.addWidget(edit_btn)
-        layout.addWidget(delete_btn)
-        self.table.setCellWidget(row, 5, widget)
+        self.search.refresh()
 
     def add_new_supplier(self):
         dialog = SupplierDialog(self.db_manager, parent=self)
@@ -104,5 +98,4 @@ class SuppliersPage(QWidget):
                 QMessageBox.critical(self, "خطا", msg)
 
     def refresh_data(self):
-        self.search_input.clear()
-        self.load_suppliers()
+        self.search.reset()
@@ -1,4 +1,5 @@
 # file: pdf_generator.py
+import io
 import os
 import datetime
 import traceback
@@ -11,29 +12,57 @@ from reportlab.platypus import (
     TableStyle,
     PageTemplate,
     Image,
+    PageBreak,
 )
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4, A5
-from reportlab.lib.units import mm
+from reportlab.lib.units import inch, mm
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
-import arabic_reshaper
 from num2words import num2words
-from bidi.algorithm import get_display
 from pathlib import Path
-from utils import resource_path
-
-
-def rtl(text):
-    reshaped_text = arabic_reshaper.reshape(text)
-    return get_display(reshaped_text)
-
-
-def rp(text):
-    reshaped_text = arabic_reshaper.reshape(str(text))
-    bidi_text = get_display(reshaped_text)
-    return bidi_text
+from money import Money, invoice_line
+from text_shaping import shape, shape_all
+from utils import resource_path, to_persian_digits
+
+# عنوان‌های ثابت فاکتور یک بار هنگام import شکل‌دهی می‌شوند.
+_LABEL_TEXTS = [
+    "صورتحساب فروش کالا و خدمات",
+    "فروشنده:",
+    "خریدار:",
+    "کد اقتصادی:",
+    "شناسه ملی:",
+    "شناسه/کد ملی:",
+    "آدرس:",
+    "تلفن:",
+    "کد پستی:",
+    "جمع کل",
+    "مبلغ کل به حروف:",
+    "روش پرداخت:",
+    "توضیحات:",
+    "وضعیت پرداخت:",
+    "نامشخص",
+    "پرداخت شده",
+    "پرداخت نشده",
+    "مهر و امضای خریدار",
+    "مهر و امضای فروشنده",
+    "ریال",
+    "صفر ریال",
+]
+LABELS = dict(zip(_LABEL_TEXTS, shape_all(_LABEL_TEXTS)))
+_ITEMS_HEADER_TEXTS = [
+    "جمع کل (ریال)",
+    "مالیات",
+    "جمع پس از تخفیف",
+    "تخفیف",
+    "مبلغ کل",
+    "مبلغ واحد",
+    "مقدار",
+    "شرح کالا / خدمات",
+    "ردیف",
+]
+ITEMS_HEADER = shape_all(_ITEMS_HEADER_TEXTS)
 
 
 def setup_fonts():
@@ -47,15 +76,6 @@ def setup_fonts():
         )
 
 
-def to_persian_digits(text):
-    return str(text or "").translate(str.maketrans("0123456789", "۰۱۲۳۴۵۶۷۸۹"))
-
-
-def rp(text):
-    return get_display(arabic_reshaper.reshape(str(text)))
-    return text
-
-
 def P(text, style):
     return Paragraph(text, style)
 
@@ -63,10 +83,10 @@ def P(text, style):
 def num_to_words_persian(number):
     try:
         words = num2words(int(number), lang="fa")
-        words = rp(words)
-        return f"{rp('ریال')} {words}"
+        words = shape(words)
+        return f"{LABELS['ریال']} {words}"
     except (ValueError, TypeError):
-        return rp("صفر ریال")
+        return LABELS["صفر ریال"]
 
 
 class InvoiceDocTemplate(BaseDocTemplate):
@@ -82,279 +102,121 @@ class InvoiceDocTemplate(BaseDocTemplate):
         canvas.saveState()
         canvas.setFont("Vazir", 9)
         canvas.drawCentredString(
-            doc.pagesize[0] / 2, 10 * mm, rp(f"صفحه {to_persian_digits(doc.page)}")
+            doc.pagesize[0] / 2, 10 * mm, shape(f"صفحه {to_persian_digits(doc.page)}")
         )
         canvas.restoreState()
 
 
-def generate_invoice_pdf(invoice_details, items_data, company_info, page_size_str="A4"):
-    setup_fonts()
+def default_invoices_folder():
     output_folder = Path.home() / "Documents" / "HesabYar_Invoices"
     output_folder.mkdir(parents=True, exist_ok=True)
+    return output_folder
 
-    file_path = os.path.join(
-        output_folder,
-        f"invoice_{invoice_details.get('id', 'NA')}_{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}.pdf",
-    )
-
-    page_size = A5 if page_size_str == "A5" else A4
-    doc = InvoiceDocTemplate(
-        file_path,
-        pagesize=page_size,
-        rightMargin=10 * mm,
-        leftMargin=10 * mm,
-        topMargin=10 * mm,
-        bottomMargin=20 * mm,
-    )
 
-    style_right_bold = ParagraphStyle(
-        name="right_bold", fontName="Vazir-Bold", fontSize=8.5, alignment=2
-    )
-    style_right_normal = ParagraphStyle(
-        name="right_normal", fontName="Vazir", fontSize=8.5, alignment=2, leading=12
-    )
-    style_left_normal = ParagraphStyle(
-        name="left_normal", fontName="Vazir", fontSize=8.5, alignment=0, leading=12
-    )
-    style_center_bold = ParagraphStyle(
-        name="center_bold", fontName="Vazir-Bold", fontSize=8, alignment=1
-    )
-    style_center_normal = ParagraphStyle(
-        name="center_normal", fontName="Vazir", fontSize=8, alignment=1
-    )
-    style_fee = ParagraphStyle(
-        name="fee_style",
-        fontName="Vazir",
-        fontSize=7,
-        alignment=2,
-        textColor=colors.dimgrey,
-    )
-    style_footer = ParagraphStyle(
-        name="footer_style", fontName="Vazir", fontSize=9, alignment=2, leading=14
-    )
-    title_style = ParagraphStyle(
-        name="title", fontName="Vazir-Bold", fontSize=16, alignment=1
-    )
+# اندازه پیش‌فرض لوگو در سربرگ فاکتور و وضوح نسخه کوچک‌شده آن.
+LOGO_SIZE = 25 * mm
+LOGO_DPI = 300
 
-    visible_table_style = TableStyle(
-        [
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
-            ("VALIGN", (0, 0), (-1, -1), "TOP"),
-            ("LEFTPADDING", (0, 0), (-1, -1), 5),
-            ("RIGHTPADDING", (0, 0), (-1, -1), 5),
-        ]
-    )
 
-    story = []
+def _load_scaled_logo(logo_path):
+    """
+    لوگو را یک بار باز کرده و به اندازه چاپ (LOGO_SIZE با وضوح LOGO_DPI) کوچک می‌کند
+    تا لازم نباشد تصویر اصلی (که ممکن است چند مگاپیکسل باشد) در هر PDF رمزگشایی و
+    جاسازی شود. خروجی محتوای PNG است یا None اگر لوگو وجود نداشته یا قابل خواندن نباشد.
+    """
+    if not logo_path or not os.path.exists(logo_path):
+        return None
+    try:
+        from PIL import Image as PILImage
+
+        max_pixels = round(LOGO_SIZE / inch * LOGO_DPI)
+        with PILImage.open(logo_path) as image:
+            image.thumbnail((max_pixels, max_pixels))
+            if image.mode not in ("RGB", "RGBA", "L", "LA"):
+                image = image.convert("RGBA")
+            buffer = io.BytesIO()
+            image.save(buffer, format="PNG")
+        return buffer.getvalue()
+    except Exception:
+        traceback.print_exc()
+        return None
+
+
+class InvoiceRenderer:
+    """
+    تنظیمات ثابت چاپ فاکتور: فونت‌ها، استایل‌ها، بلوک شکل‌داده شده اطلاعات فروشنده و
+    لوگوی کوچک‌شده. یک بار برای هر جلسه کاری یا هر خروجی گروهی ساخته می‌شود و تا
+    تغییر اطلاعات شرکت یا سایز صفحه دوباره قابل استفاده است؛ به این ترتیب هزینه
+    ساخت هر فاکتور عمدتاً همان جدول اقلام آن است.
+    """
+
+    def __init__(self, company_info, page_size_str="A4"):
+        setup_fonts()
+        self.company_info = dict(company_info)
+        self.page_size_str = page_size_str
+        self.page_size = A5 if page_size_str == "A5" else A4
+        self.margins = {
+            "rightMargin": 10 * mm,
+            "leftMargin": 10 * mm,
+            "topMargin": 10 * mm,
+            "bottomMargin": 20 * mm,
+        }
+        self.width = (
+            self.page_size[0] - self.margins["rightMargin"] - self.margins["leftMargin"]
+        )
 
-    logo_path = company_info.get("logo_path")
-    if logo_path and os.path.exists(logo_path):
-        logo_image = Image(
-            logo_path, width=25 * mm, height=25 * mm, kind="proportional"
+        self.style_right_bold = ParagraphStyle(
+            name="right_bold", fontName="Vazir-Bold", fontSize=8.5, alignment=2
         )
-        header_content = [
-            [P(rp("صورتحساب فروش کالا و خدمات"), title_style), logo_image]
-        ]
-        header_table = Table(header_content, colWidths=[doc.width - 35 * mm, 30 * mm])
-        header_table.setStyle(TableStyle([("VALIGN", (0, 0), (-1, -1), "MIDDLE")]))
-        story.append(header_table)
-    else:
-        story.append(P(rp("صورتحساب فروش کالا و خدمات"), title_style))
-        story.append(Spacer(1, 4 * mm))
-
-    formatted_invoice_id = f"INV-{invoice_details.get('id', 0):04d}"
-
-    info_data = [
-        [
-            P(
-                rtl(
-                    f"تاریخ صدور: {to_persian_digits(invoice_details.get('issue_date', '-'))}"
-                ),
-                style_right_normal,
-            ),
-            P(
-                rtl(f"شماره فاکتور: {to_persian_digits(formatted_invoice_id)}"),
-                style_right_normal,
-            ),
-        ]
-    ]
-
-    story.append(Table(info_data, colWidths=[doc.width / 2, doc.width / 2]))
-    story.append(Spacer(1, 2 * mm))
-
-    seller_data_table = [
-        [
-            P(rp(company_info.get("name", "-")), style_right_normal),
-            P(f"<b>{rp('فروشنده:')}</b>", style_right_bold),
-        ],
-        [
-            P(
-                to_persian_digits(company_info.get("economic_code", "-")),
-                style_right_normal,
-            ),
-            P(f"<b>{rp('کد اقتصادی:')}</b>", style_right_normal),
-        ],
-        [
-            P(
-                to_persian_digits(company_info.get("national_id", "-")),
-                style_right_normal,
-            ),
-            P(f"<b>{rp('شناسه ملی:')}</b>", style_right_normal),
-        ],
-        [
-            P(rp(company_info.get("address", "-")), style_right_normal),
-            P(f"<b>{rp('آدرس:')}</b>", style_right_normal),
-        ],
-        [
-            P(to_persian_digits(company_info.get("phone", "-")), style_right_normal),
-            P(f"<b>{rp('تلفن:')}</b>", style_right_normal),
-        ],
-        [
-            P(
-                to_persian_digits(company_info.get("postal_code", "-")),
-                style_right_normal,
-            ),
-            P(f"<b>{rp('کد پستی:')}</b>", style_right_normal),
-        ],
-    ]
-
-    buyer_data_table = [
-        [
-            P(rp(invoice_details.get("customer_name", "-")), style_right_normal),
-            P(f"<b>{rp('خریدار:')}</b>", style_right_bold),
-        ],
-        [
-            P(
-                to_persian_digits(invoice_details.get("economic_code", "-")),
-                style_right_normal,
-            ),
-            P(f"<b>{rp('کد اقتصادی:')}</b>", style_right_normal),
-        ],
-        [
-            P(
-                to_persian_digits(invoice_details.get("national_id", "-")),
-                style_right_normal,
-            ),
-            P(f"<b>{rp('شناسه/کد ملی:')}</b>", style_right_normal),
-        ],
-        [
-            P(rp(invoice_details.get("address", "-")), style_right_normal),
-            P(f"<b>{rp('آدرس:')}</b>", style_right_normal),
-        ],
-        [
-            P(to_persian_digits(invoice_details.get("phone", "-")), style_right_normal),
-            P(f"<b>{rp('تلفن:')}</b>", style_right_normal),
-        ],
-        [
-            P(
-                to_persian_digits(invoice_details.get("postal_code", "-")),
-                style_right_normal,
-            ),
-            P(f"<b>{rp('کد پستی:')}</b>", style_right_normal),
-        ],
-    ]
-
-    col_widths_contact = [doc.width * 0.3, doc.width * 0.2]
-    seller_table_final = Table(seller_data_table, colWidths=col_widths_contact)
-
-    seller_table_final.setStyle(visible_table_style)
-
-    buyer_table_final = Table(buyer_data_table, colWidths=col_widths_contact)
-    buyer_table_final.setStyle(visible_table_style)
-
-    contact_container_table = Table(
-        [[buyer_table_final, seller_table_final]],
-        colWidths=[doc.width / 2, doc.width / 2],
-    )
-    contact_container_table.setStyle(TableStyle([("VALIGN", (0, 0), (-1, -1), "TOP")]))
-    story.append(contact_container_table)
-    story.append(Spacer(1, 5 * mm))
-
-    items_header = [
-        P(rp(h), style_center_bold)
-        for h in [
-            "جمع کل (ریال)",
-            "مالیات",
-            "جمع پس از تخفیف",
-            "تخفیف",
-            "مبلغ کل",
-            "مبلغ واحد",
-            "مقدار",
-            "شرح کالا / خدمات",
-            "ردیف",
-        ]
-    ]
-    pdf_table_data = [items_header]
-    totals = {"c5": 0, "c6": 0, "c7": 0, "c8": 0, "c9": 0}
-
-    for i, item in enumerate(items_data):
-        quantity, unit_price = item.get("quantity", 0), item.get("unit_price", 0)
-        discount_p, tax_p = item.get("discount_percent", 0), item.get("tax_percent", 0)
-        c5, c6 = quantity * unit_price, (quantity * unit_price) * (discount_p / 100)
-        c7, c8 = c5 - c6, (c5 - c6) * (tax_p / 100)
-
-        item_extra_costs, extra_costs_details = 0, []
-        for fee in item.get("extra_costs", []):
-            fee_amount = (
-                fee.get("value", 0)
-                if fee.get("type") == "amount"
-                else c7 * (fee.get("value", 0) / 100)
-            )
-            item_extra_costs += fee_amount
-            extra_costs_details.append(
-                P(
-                    rp(
-                        f"{fee.get('name', '')} (+{to_persian_digits(f'{fee_amount:,.0f}')}) └"
-                    ),
-                    style_fee,
-                )
+        self.style_right_normal = ParagraphStyle(
+            name="right_normal", fontName="Vazir", fontSize=8.5, alignment=2, leading=12
+        )
+        self.style_center_bold = ParagraphStyle(
+            name="center_bold", fontName="Vazir-Bold", fontSize=8, alignment=1
+        )
+        self.style_center_normal = ParagraphStyle(
+            name="center_normal", fontName="Vazir", fontSize=8, alignment=1
+        )
+        self.style_fee = ParagraphStyle(
+            name="fee_style",
+            fontName="Vazir",
+            fontSize=7,
+            alignment=2,
+            textColor=colors.dimgrey,
+        )
+        self.style_footer = ParagraphStyle(
+            name="footer_style", fontName="Vazir", fontSize=9, alignment=2, leading=14
+        )
+        self.title_style = ParagraphStyle(
+            name="title", fontName="Vazir-Bold", fontSize=16, alignment=1
+        )
+        self.status_styles = {
+            color: ParagraphStyle(
+                name=f"status_{name}",
+                fontName="Vazir-Bold",
+                fontSize=10,
+                alignment=2,
+                textColor=color,
             )
+            for name, color in [
+                ("unknown", colors.black),
+                ("paid", colors.darkgreen),
+                ("unpaid", colors.red),
+                ("partial", colors.orange),
+            ]
+        }
 
-        c9 = c7 + c8 + item_extra_costs
-        for k, v in zip(totals.keys(), [c5, c6, c7, c8, c9]):
-            totals[k] += v
-
-        description_cell = [
-            P(rp(item.get("description", "")), style_right_normal)
-        ] + extra_costs_details
-
-        pdf_table_data.append(
+        self.visible_table_style = TableStyle(
             [
-                P(to_persian_digits(f"{c9:,.0f}"), style_center_normal),
-                P(to_persian_digits(f"{c8:,.0f}"), style_center_normal),
-                P(to_persian_digits(f"{c7:,.0f}"), style_center_normal),
-                P(to_persian_digits(f"{c6:,.0f}"), style_center_normal),
-                P(to_persian_digits(f"{c5:,.0f}"), style_center_normal),
-                P(to_persian_digits(f"{unit_price:,.0f}"), style_center_normal),
-                P(to_persian_digits(quantity), style_center_normal),
-                description_cell,
-                P(to_persian_digits(i + 1), style_center_normal),
+                ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+                ("VALIGN", (0, 0), (-1, -1), "TOP"),
+                ("LEFTPADDING", (0, 0), (-1, -1), 5),
+                ("RIGHTPADDING", (0, 0), (-1, -1), 5),
             ]
         )
-
-    summary_row = [
-        P(f"<b>{to_persian_digits(f'{totals["c9"]:,.0f}')}</b>", style_center_bold),
-        P(f"<b>{to_persian_digits(f'{totals["c8"]:,.0f}')}</b>", style_center_bold),
-        P(f"<b>{to_persian_digits(f'{totals["c7"]:,.0f}')}</b>", style_center_bold),
-        P(f"<b>{to_persian_digits(f'{totals["c6"]:,.0f}')}</b>", style_center_bold),
-        P(f"<b>{to_persian_digits(f'{totals["c5"]:,.0f}')}</b>", style_center_bold),
-        P(f"<b>{rp('جمع کل')}</b>", style_center_bold),
-        "",
-        "",
-        "",
-    ]
-
-    pdf_table_data.append(summary_row)
-
-    items_table = Table(
-        pdf_table_data,
-        colWidths=[
-            doc.width * w for w in [0.15, 0.11, 0.14, 0.1, 0.12, 0.1, 0.06, 0.17, 0.06]
-        ],
-        repeatRows=1,
-    )
-    items_table.setStyle(
-        TableStyle(
+        self.top_aligned_style = TableStyle([("VALIGN", (0, 0), (-1, -1), "TOP")])
+        self.middle_aligned_style = TableStyle([("VALIGN", (0, 0), (-1, -1), "MIDDLE")])
+        self.items_table_style = TableStyle(
             [
                 ("GRID", (0, 0), (-1, -1), 1, colors.black),
                 ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
@@ -363,96 +225,321 @@ def generate_invoice_pdf(invoice_details, items_data, company_info, page_size_st
                 ("SPAN", (5, -1), (8, -1)),
             ]
         )
-    )
-    story.append(items_table)
-    story.append(Spacer(1, 5 * mm))
-
-    footer_data = [
-        [
-            P(
-                num_to_words_persian(invoice_details.get("total_amount", 0)),
-                style_right_normal,
-            ),
-            P(f"<b>{rp('مبلغ کل به حروف:')}</b>", style_footer),
-        ],
-    ]
-
-    pay_method = invoice_details.get("payment_method", "نقدی")
-    pay_text = pay_method
-
-    if pay_method == "چکی":
-        cheque_number = to_persian_digits(invoice_details.get("cheque_number", "-"))
-        cheque_due = to_persian_digits(invoice_details.get("cheque_due_date", "-"))
-        pay_text += f" (شماره چک: {cheque_number} | تاریخ سررسید: {cheque_due})"
-
-    footer_data.append(
-        [
-            P(rtl(pay_text), style_right_normal),
-            P(rtl("روش پرداخت:"), style_footer),
+        self.signature_table_style = TableStyle(
+            [
+                ("GRID", (0, 0), (-1, -1), 1, colors.black),
+                ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ]
+        )
+
+        # متن‌های فروشنده برای همه فاکتورها یکسان است و فقط یک بار شکل‌دهی می‌شود.
+        info = self.company_info
+        self.seller_rows = self._contact_rows(
+            [
+                (info.get("name", "-"), "فروشنده:", True),
+                (info.get("economic_code", "-"), "کد اقتصادی:", False),
+                (info.get("national_id", "-"), "شناسه ملی:", False),
+                (info.get("address", "-"), "آدرس:", True),
+                (info.get("phone", "-"), "تلفن:", False),
+                (info.get("postal_code", "-"), "کد پستی:", False),
+            ]
+        )
+        self.logo_data = _load_scaled_logo(info.get("logo_path"))
+
+    @staticmethod
+    def _contact_rows(fields):
+        """
+        fields لیست (مقدار، عنوان، متنی بودن) است؛ مقدارهای متنی شکل‌دهی و بقیه با
+        ارقام فارسی نوشته می‌شوند. عنوان ردیف اول (نام) پررنگ است.
+        """
+        return [
+            (
+                shape(value) if is_text else to_persian_digits(value),
+                f"<b>{LABELS[label]}</b>",
+                index == 0,
+            )
+            for index, (value, label, is_text) in enumerate(fields)
         ]
-    )
 
-    notes = invoice_details.get("notes", "")
-    if notes:
-        footer_data.append(
+    def create_doc(self, file_path):
+        return InvoiceDocTemplate(file_path, pagesize=self.page_size, **self.margins)
+
+    def _contact_table(self, rows):
+        table = Table(
             [
-                P(rp(notes), style_right_normal),
-                P(f"<b>{rp('توضیحات:')}</b>", style_footer),
+                [
+                    P(value, self.style_right_normal),
+                    P(
+                        label,
+                        self.style_right_bold if bold else self.style_right_normal,
+                    ),
+                ]
+                for value, label, bold in rows
+            ],
+            colWidths=[self.width * 0.3, self.width * 0.2],
+        )
+        table.setStyle(self.visible_table_style)
+        return table
+
+    def build_story(self, invoice_details, items_data):
+        """لیست flowableهای یک فاکتور را برمی‌گرداند."""
+        width = self.width
+        story = []
+
+        title = P(LABELS["صورتحساب فروش کالا و خدمات"], self.title_style)
+        if self.logo_data:
+            logo_image = Image(
+                io.BytesIO(self.logo_data),
+                width=LOGO_SIZE,
+                height=LOGO_SIZE,
+                kind="proportional",
+            )
+            header_table = Table(
+                [[title, logo_image]], colWidths=[width - 35 * mm, 30 * mm]
+            )
+            header_table.setStyle(self.middle_aligned_style)
+            story.append(header_table)
+        else:
+            story.append(title)
+            story.append(Spacer(1, 4 * mm))
+
+        formatted_invoice_id = f"INV-{invoice_details.get('id', 0):04d}"
+
+        info_data = [
+            [
+                P(
+                    shape(
+                        f"تاریخ صدور: {to_persian_digits(invoice_details.get('issue_date', '-'))}"
+                    ),
+                    self.style_right_normal,
+                ),
+                P(
+                    shape(f"شماره فاکتور: {to_persian_digits(formatted_invoice_id)}"),
+                    self.style_right_normal,
+                ),
+            ]
+        ]
+
+        story.append(Table(info_data, colWidths=[width / 2, width / 2]))
+        story.append(Spacer(1, 2 * mm))
+
+        buyer_rows = self._contact_rows(
+            [
+                (invoice_details.get("customer_name", "-"), "خریدار:", True),
+                (invoice_details.get("economic_code", "-"), "کد اقتصادی:", False),
+                (invoice_details.get("national_id", "-"), "شناسه/کد ملی:", False),
+                (invoice_details.get("address", "-"), "آدرس:", True),
+                (invoice_details.get("phone", "-"), "تلفن:", False),
+                (invoice_details.get("postal_code", "-"), "کد پستی:", False),
             ]
         )
 
-    status_val = invoice_details.get("status")
-    status_text, status_color = rp("نامشخص"), colors.black
-    if status_val == "پرداخت شده":
-        status_text, status_color = rp("پرداخت شده"), colors.darkgreen
-    elif status_val == "پرداخت نشده":
-        status_text, status_color = rp("پرداخت نشده"), colors.red
-    elif status_val == "کسری":
-        remaining = invoice_details.get("total_amount", 0) - invoice_details.get(
-            "amount_paid", 0
+        contact_container_table = Table(
+            [[self._contact_table(buyer_rows), self._contact_table(self.seller_rows)]],
+            colWidths=[width / 2, width / 2],
         )
-        status_text = rp(f"کسری (مانده: {to_persian_digits(f'{remaining:,.0f}')} ریال)")
-        status_color = colors.orange
-    status_paragraph = P(
-        status_text,
-        ParagraphStyle(
-            name="status",
-            fontName="Vazir-Bold",
-            fontSize=10,
-            alignment=2,
-            textColor=status_color,
-        ),
-    )
-    footer_data.append(
-        [status_paragraph, P(f"<b>{rp('وضعیت پرداخت:')}</b>", style_footer)]
-    )
+        contact_container_table.setStyle(self.top_aligned_style)
+        story.append(contact_container_table)
+        story.append(Spacer(1, 5 * mm))
 
-    story.append(Table(footer_data, colWidths=[doc.width * 0.75, doc.width * 0.25]))
-    story.append(Spacer(1, 8 * mm))
+        story.append(self._items_table(items_data))
+        story.append(Spacer(1, 5 * mm))
+        story.append(self._footer_table(invoice_details))
+        story.append(Spacer(1, 8 * mm))
 
-    # --- امضاها ---
-    signature_table = Table(
-        [
+        # --- امضاها ---
+        signature_table = Table(
             [
-                P(rp("مهر و امضای خریدار"), style_center_bold),
-                P(rp("مهر و امضای فروشنده"), style_center_bold),
+                [
+                    P(LABELS["مهر و امضای خریدار"], self.style_center_bold),
+                    P(LABELS["مهر و امضای فروشنده"], self.style_center_bold),
+                ]
+            ],
+            colWidths=[width * 0.5, width * 0.5],
+            rowHeights=20 * mm,
+        )
+        signature_table.setStyle(self.signature_table_style)
+        story.append(signature_table)
+        return story
+
+    def _items_table(self, items_data):
+        style_center_bold = self.style_center_bold
+        style_center_normal = self.style_center_normal
+        items_header = [P(text, style_center_bold) for text in ITEMS_HEADER]
+        pdf_table_data = [items_header]
+        totals = {key: Money(0) for key in ["c5", "c6", "c7", "c8", "c9"]}
+
+        for i, item in enumerate(items_data):
+            quantity, unit_price = item.get("quantity", 0), Money(
+                item.get("unit_price", 0)
+            )
+            line = invoice_line(
+                quantity,
+                unit_price,
+                item.get("discount_percent", 0),
+                item.get("tax_percent", 0),
+                item.get("extra_costs", []),
+            )
+            c5, c6, c7 = line["total"], line["discount"], line["after_discount"]
+            c8, c9 = line["tax"], line["line_total"]
+
+            extra_costs_details = [
+                P(
+                    shape(
+                        f"{fee.get('name', '')} (+{to_persian_digits(fee_amount)}) └"
+                    ),
+                    self.style_fee,
+                )
+                for fee, fee_amount in line["fees"]
             ]
-        ],
-        colWidths=[doc.width * 0.5, doc.width * 0.5],
-        rowHeights=20 * mm,
-    )
-    signature_table.setStyle(
-        TableStyle(
+            for k, v in zip(totals.keys(), [c5, c6, c7, c8, c9]):
+                totals[k] += v
+
+            description_cell = [
+                P(shape(item.get("description", "")), self.style_right_normal)
+            ] + extra_costs_details
+
+            pdf_table_data.append(
+                [
+                    P(to_persian_digits(c9), style_center_normal),
+                    P(to_persian_digits(c8), style_center_normal),
+                    P(to_persian_digits(c7), style_center_normal),
+                    P(to_persian_digits(c6), style_center_normal),
+                    P(to_persian_digits(c5), style_center_normal),
+                    P(to_persian_digits(unit_price), style_center_normal),
+                    P(to_persian_digits(quantity), style_center_normal),
+                    description_cell,
+                    P(to_persian_digits(i + 1), style_center_normal),
+                ]
+            )
+
+        summary_row = [
+            P(f"<b>{to_persian_digits(totals['c9'])}</b>", style_center_bold),
+            P(f"<b>{to_persian_digits(totals['c8'])}</b>", style_center_bold),
+            P(f"<b>{to_persian_digits(totals['c7'])}</b>", style_center_bold),
+            P(f"<b>{to_persian_digits(totals['c6'])}</b>", style_center_bold),
+            P(f"<b>{to_persian_digits(totals['c5'])}</b>", style_center_bold),
+            P(f"<b>{LABELS['جمع کل']}</b>", style_center_bold),
+            "",
+            "",
+            "",
+        ]
+
+        pdf_table_data.append(summary_row)
+
+        items_table = Table(
+            pdf_table_data,
+            colWidths=[
+                self.width * w
+                for w in [0.15, 0.11, 0.14, 0.1, 0.12, 0.1, 0.06, 0.17, 0.06]
+            ],
+            repeatRows=1,
+        )
+        items_table.setStyle(self.items_table_style)
+        return items_table
+
+    def _footer_table(self, invoice_details):
+        style_right_normal = self.style_right_normal
+        style_footer = self.style_footer
+        footer_data = [
             [
-                ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                ("VALIGN", (0, 0), (-1, -1), "TOP"),
+                P(
+                    num_to_words_persian(invoice_details.get("total_amount", 0)),
+                    style_right_normal,
+                ),
+                P(f"<b>{LABELS['مبلغ کل به حروف:']}</b>", style_footer),
+            ],
+        ]
+
+        pay_method = invoice_details.get("payment_method", "نقدی")
+        pay_text = pay_method
+
+        if pay_method == "چکی":
+            cheque_number = to_persian_digits(invoice_details.get("cheque_number", "-"))
+            cheque_due = to_persian_digits(invoice_details.get("cheque_due_date", "-"))
+            pay_text += f" (شماره چک: {cheque_number} | تاریخ سررسید: {cheque_due})"
+
+        footer_data.append(
+            [
+                P(shape(pay_text), style_right_normal),
+                P(LABELS["روش پرداخت:"], style_footer),
             ]
         )
+
+        notes = invoice_details.get("notes", "")
+        if notes:
+            footer_data.append(
+                [
+                    P(shape(notes), style_right_normal),
+                    P(f"<b>{LABELS['توضیحات:']}</b>", style_footer),
+                ]
+            )
+
+        status_val = invoice_details.get("status")
+        status_text, status_color = LABELS["نامشخص"], colors.black
+        if status_val == "پرداخت شده":
+            status_text, status_color = LABELS["پرداخت شده"], colors.darkgreen
+        elif status_val == "پرداخت نشده":
+            status_text, status_color = LABELS["پرداخت نشده"], colors.red
+        elif status_val == "کسری":
+            remaining = Money(invoice_details.get("total_amount", 0)) - Money(
+                invoice_details.get("amount_paid", 0)
+            )
+            status_text = shape(f"کسری (مانده: {to_persian_digits(remaining)} ریال)")
+            status_color = colors.orange
+        status_paragraph = P(status_text, self.status_styles[status_color])
+        footer_data.append(
+            [status_paragraph, P(f"<b>{LABELS['وضعیت پرداخت:']}</b>", style_footer)]
+        )
+
+        return Table(footer_data, colWidths=[self.width * 0.75, self.width * 0.25])
+
+    def _build(self, doc, story, file_path):
+        try:
+            doc.build(story)
+            return file_path, True
+        except Exception:
+            return traceback.format_exc(), False
+
+    def render(self, invoice_details, items_data, file_path=None):
+        """
+        PDF یک فاکتور را می‌سازد. بدون file_path فایل با نام زمان‌دار در پوشه پیش‌فرض
+        فاکتورها ذخیره می‌شود. خروجی (مسیر فایل، True) یا (متن خطا، False) است.
+        """
+        if file_path is None:
+            file_path = os.path.join(
+                default_invoices_folder(),
+                f"invoice_{invoice_details.get('id', 'NA')}_{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}.pdf",
+            )
+        doc = self.create_doc(file_path)
+        return self._build(
+            doc, self.build_story(invoice_details, items_data), file_path
+        )
+
+    def render_merged(self, invoices, file_path):
+        """
+        چند فاکتور را پشت سر هم (هر کدام از صفحه‌ای تازه) در یک فایل PDF می‌سازد.
+        invoices لیست (جزئیات فاکتور، لیست اقلام) است.
+        """
+        doc = self.create_doc(file_path)
+        story = []
+        for invoice_details, items_data in invoices:
+            if story:
+                story.append(PageBreak())
+            story.extend(self.build_story(invoice_details, items_data))
+        return self._build(doc, story, file_path)
+
+
+def generate_invoice_pdf(
+    invoice_details, items_data, company_info, page_size_str="A4", file_path=None
+):
+    """چاپ تکی بدون نگه داشتن InvoiceRenderer؛ خروجی مثل InvoiceRenderer.render است."""
+    return InvoiceRenderer(company_info, page_size_str).render(
+        invoice_details, items_data, file_path
     )
-    story.append(signature_table)
 
-    try:
-        doc.build(story)
-        return file_path, True
-    except Exception:
-        return traceback.format_exc(), False
+
+def generate_merged_invoices_pdf(invoices, company_info, file_path, page_size_str="A4"):
+    return InvoiceRenderer(company_info, page_size_str).render_merged(
+        invoices, file_path
+    )
@@ -0,0 +1,349 @@
+# file: query_plan_check.py
+"""
+تمام متدهای DatabaseManager را روی یک دیتابیس موقت اجرا می‌کند، کوئری‌های اجرا شده را
+ضبط کرده و با EXPLAIN QUERY PLAN بررسی می‌کند که هیچ کوئری پرتکراری به اسکن کامل
+جدول نیفتد. اگر متدی اسکن کامل انجام دهد و در FULL_SCAN_ALLOWED نباشد، یا متد جدیدی
+بدون نمونه فراخوانی در SAMPLE_CALLS اضافه شده باشد، با کد خروج ۱ تمام می‌شود.
+
+اجرا: python query_plan_check.py
+"""
+import os
+import re
+import sys
+import shutil
+import sqlite3
+import tempfile
+import jdatetime
+
+from db_manager import DatabaseManager
+from db_updater import run_migrations
+
+TODAY = jdatetime.date.today().strftime("%Y/%m/%d")
+MONTH_START = jdatetime.date.today().replace(day=1).strftime("%Y/%m/%d")
+
+# متدهایی که ذاتاً کل جدول را می‌خوانند (لیست کامل، خروجی یا جمع کل جدول).
+FULL_SCAN_ALLOWED = {
+    "get_all_customers": "لیست کامل مشتریان",
+    "get_all_products": "لیست کامل کالاها",
+    "get_distinct_units": "جدول کوچک کالاها",
+    "get_fee_templates": "جدول کوچک تنظیمات",
+    "get_all_expense_categories": "جدول کوچک تنظیمات",
+    "get_all_invoices": "لیست کامل فاکتورها",
+    "get_all_invoice_items": "خروجی کامل اقلام",
+    "get_all_expenses": "لیست کامل هزینه‌ها",
+    "get_all_cheques": "لیست کامل چک‌ها",
+    "get_all_accounts": "جدول کوچک حساب‌ها",
+    "get_all_suppliers": "لیست کامل تامین‌کنندگان",
+    "get_all_purchase_invoices": "لیست کامل فاکتورهای خرید",
+    "get_stats_for_dashboard": "جمع کل ردیف‌های روزانه daily_rollup",
+    "get_dashboard_kpis": "جمع کل ردیف‌های روزانه daily_rollup",
+    "get_financial_summary": "جمع کل ردیف‌های روزانه daily_rollup",
+    "get_extended_kpis": "شمارش کل مشتریان و کالاها",
+    "get_expenses_by_category": "جمع کل هزینه‌ها به تفکیک دسته",
+    "get_dashboard_data": "شمارش و جمع کل جدول‌ها برای شاخص‌های داشبورد",
+    "count_export_rows": "شمارش کل جدول برای پیشرفت خروجی CSV",
+    "iter_export_rows": "خروجی کامل جدول",
+}
+
+# دستورهای داخلی تریگرها و FTS5 با پیشوند '--' در trace گزارش می‌شوند.
+_IGNORED_PREFIXES = (
+    "BEGIN",
+    "COMMIT",
+    "ROLLBACK",
+    "PRAGMA",
+    "SAVEPOINT",
+    "RELEASE",
+    "--",
+)
+# خواندن جدول‌های داخلی FTS5 (مثل *_fts_config) توسط خود SQLite انجام می‌شود.
+_FTS_SHADOW_TABLE = re.compile(r"'\w+_fts_(config|data|idx|content|docsize)'")
+
+
+def _invoice_data():
+    return {
+        "customer_id": 1,
+        "issue_date": TODAY,
+        "total_amount": 1000,
+        "status": "پرداخت نشده",
+        "notes": "",
+        "amount_paid": 0,
+        "payment_method": "نقدی",
+        "payment_date": None,
+        "cheque_number": None,
+        "cheque_due_date": None,
+    }
+
+
+def _invoice_items():
+    return [
+        {
+            "product_id": 1,
+            "description": "کالای نمونه",
+            "quantity": 1,
+            "unit": "عدد",
+            "unit_price": 1000,
+            "discount_percent": 0,
+            "tax_percent": 0,
+            "extra_costs": [],
+        }
+    ]
+
+
+def _cheque_data():
+    return {
+        "type": "دریافتی",
+        "cheque_number": "123",
+        "bank_name": "ملی",
+        "amount": 1000,
+        "issue_date": TODAY,
+        "due_date": TODAY,
+        "status": "در انتظار وصول",
+        "description": "",
+        "invoice_id": 1,
+    }
+
+
+def _cursor(*values):
+    """توکن صفحه‌بندی با مقادیر دلخواه برای بررسی کوئری صفحه‌های بعدی."""
+    return DatabaseManager._encode_cursor(values)
+
+
+# نمونه فراخوانی هر متد به ترتیب اجرا؛ اول ثبت داده، بعد خواندن و در آخر حذف.
+SAMPLE_CALLS = [
+    ("add_user", ("admin", "a@b.c", "pw", "q", "a")),
+    ("check_user_credentials", ("admin", "pw")),
+    ("get_user_info", ("admin",)),
+    ("change_password", ("admin", "pw", "pw2")),
+    ("get_secret_question", ("admin",)),
+    ("check_secret_answer", ("admin", "a")),
+    ("reset_password", ("admin", "pw")),
+    ("update_security_question", ("admin", "q", "a")),
+    ("add_account", ("فروش کالا", "income", "")),
+    ("add_account", ("اجاره", "expense", "")),
+    ("add_customer", ("مشتری", "c@d.e", "0912", "", "001", "", "")),
+    ("add_product", ("کالای نمونه", "", "عدد", 1000, 5, 1)),
+    ("add_fee_template", ("حمل", "amount", 100)),
+    ("add_supplier", ("تامین‌کننده", "", "", "", "", "", "")),
+    ("save_invoice", (_invoice_data(), _invoice_items(), _cheque_data())),
+    ("add_expense", ("اجاره", 500, TODAY, None, 2)),
+    ("add_cheque", (_cheque_data(),)),
+    (
+        "save_purchase_invoice",
+        (
+            {"supplier_id": 1, "issue_date": TODAY, "total_amount": 10, "notes": ""},
+            [
+                {
+                    "product_id": 1,
+                    "product_name": "کالای نمونه",
+                    "quantity": 1,
+                    "purchase_price": 10,
+                }
+            ],
+        ),
+    ),
+    ("update_product_after_purchase", (1, 1, 10)),
+    ("search_customers", ("مشت",)),
+    ("update_customer", (1, "مشتری", "c@d.e", "0912", "", "001", "", "")),
+    ("get_customer_by_id", (1,)),
+    ("get_all_customers", ()),
+    ("get_customers_page", ()),
+    ("get_customers_page", (_cursor("مشتری", 1), 20)),
+    ("check_for_duplicates", ("مشتری", "c@d.e", "0912", 1)),
+    ("search_products", ("کالا",)),
+    ("update_product", (1, "کالای نمونه", "", "عدد", 1000, 5, 1)),
+    ("decrease_product_stock", (1, 1)),
+    ("get_product_by_id", (1,)),
+    ("get_all_products", ()),
+    ("get_products_page", ()),
+    ("get_products_page", (_cursor("کالا", 1), 20)),
+    ("get_distinct_units", ()),
+    ("get_fee_templates", ()),
+    ("update_fee_template", (1, "حمل", "amount", 200)),
+    ("get_fee_template_by_id", (1,)),
+    ("get_all_expense_categories", ()),
+    ("update_expense_category", (1, "عمومی")),
+    ("get_expense_category_by_id", (1,)),
+    ("search_invoices", ("INV-1",)),
+    ("get_all_invoices", ()),
+    ("get_invoices_page", ()),
+    ("get_invoices_page", (_cursor(4, 14050101, 10), 20)),
+    ("get_invoices_page", (_cursor(4, 14050101, 10), 20, 1)),
+    ("get_invoices_for_customer", (1,)),
+    ("get_invoice_details", (1,)),
+    ("get_invoice_items", (1,)),
+    ("count_export_rows", ("invoices",)),
+    ("iter_export_rows", ("customers",)),
+    ("iter_export_rows", ("products",)),
+    ("iter_export_rows", ("invoices",)),
+    ("iter_export_rows", ("invoice_items",)),
+    ("iter_export_rows", ("expenses",)),
+    ("get_invoices_for_export", (MONTH_START, TODAY)),
+    ("get_invoices_for_export", (MONTH_START, TODAY, 1)),
+    ("get_invoices_for_export", (MONTH_START, TODAY, None, "پرداخت نشده")),
+    ("get_all_invoice_items", ()),
+    ("get_invoice_items_page", ()),
+    ("get_invoice_items_page", (_cursor(1, 1), 20)),
+    ("get_invoice_items_page", (None, 20, 1)),
+    ("add_payment", (1, 100)),
+    ("search_expenses", ("اجاره",)),
+    ("get_all_expenses", ()),
+    ("get_expenses_page", ()),
+    ("get_expenses_page", (_cursor(14050101, 10), 20)),
+    ("get_expenses_page", (_cursor(14050101, 10), 20, 2)),
+    ("get_expense_by_id", (1,)),
+    ("update_expense", (1, "اجاره", 600, TODAY, None, 2)),
+    ("get_stats_for_dashboard", ()),
+    ("get_dashboard_kpis", ()),
+    ("get_financial_summary", ()),
+    ("get_recent_open_invoices", ()),
+    ("get_sales_last_n_days", ()),
+    ("get_expenses_by_category", ()),
+    ("get_extended_kpis", ()),
+    ("get_dashboard_data", ()),
+    ("get_dashboard_data", (10, 5, 7, 5)),
+    ("get_financial_summary_by_date_range", (MONTH_START, TODAY)),
+    ("update_cheque", (1, _cheque_data())),
+    ("get_all_cheques", ()),
+    ("get_cheques_page", ()),
+    ("get_cheques_page", (_cursor(14050101, 1), 20)),
+    ("get_cheques_page", (_cursor(14050101, 1), 20, "دریافتی")),
+    ("get_cheque_by_id", (1,)),
+    ("search_cheques", ("123",)),
+    ("get_general_journal", (MONTH_START, TODAY)),
+    ("get_low_stock_products", ()),
+    ("get_upcoming_cheques", ()),
+    ("get_all_accounts", ()),
+    ("get_accounts_by_type", ("income",)),
+    ("update_account", (2, "اجاره", "expense", "")),
+    ("get_account_by_id", (1,)),
+    ("update_supplier", (1, "تامین‌کننده", "", "", "", "", "", "")),
+    ("get_all_suppliers", ()),
+    ("get_suppliers_page", ()),
+    ("get_suppliers_page", (_cursor("تامین", 1), 20)),
+    ("search_suppliers", ("تامین",)),
+    ("get_supplier_by_id", (1,)),
+    ("get_all_purchase_invoices", ()),
+    ("get_purchase_invoices_page", ()),
+    ("get_purchase_invoices_page", (_cursor(14050101, 10), 20)),
+    ("get_purchase_invoices_page", (_cursor(14050101, 10), 20, 1)),
+    ("get_purchase_invoice_details", (1,)),
+    ("get_purchase_invoice_items", (1,)),
+    ("get_detailed_financial_summary", (MONTH_START, TODAY)),
+    ("delete_cheque", (1,)),
+    ("delete_expense", (1,)),
+    ("delete_account", (2,)),
+    ("delete_invoice", (1,)),
+    ("delete_purchase_invoice", (1,)),
+    ("delete_supplier", (1,)),
+    ("delete_fee_template", (1,)),
+    ("delete_expense_category", (1,)),
+    ("delete_product", (1,)),
+    ("delete_customer", (1,)),
+]
+
+# متدهایی که کوئری اجرا نمی‌کنند.
+_NON_QUERY_METHODS = {"close"}
+
+
+def _public_methods():
+    return {
+        name
+        for name in dir(DatabaseManager)
+        if not name.startswith("_")
+        and callable(getattr(DatabaseManager, name))
+        and name not in _NON_QUERY_METHODS
+    }
+
+
+def collect_statements(db_manager):
+    """تمام نمونه‌ها را اجرا کرده و کوئری‌های هر متد را برمی‌گرداند."""
+    conn = db_manager._get_connection()
+    statements = {}
+    for method_name, args in SAMPLE_CALLS:
+        captured = statements.setdefault(method_name, [])
+        conn.set_trace_callback(captured.append)
+        try:
+            getattr(db_manager, method_name)(*args)
+        finally:
+            conn.set_trace_callback(None)
+    return statements
+
+
+def full_scans(conn, sql):
+    """
+    مراحل اسکن کامل جدول در برنامه اجرای یک کوئری را برمی‌گرداند. پیمایش نتیجه
+    زیرکوئری‌ها (MATERIALIZE / CO-ROUTINE)، جستجوی MATCH در جدول‌های FTS5 و پیمایش
+    ایندکس در کوئری دارای LIMIT (صفحه اول لیست‌ها) اسکن جدول حساب نمی‌شوند.
+    """
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    limited = re.search(r"\bLIMIT\b", sql, re.IGNORECASE) is not None
+    subqueries = {
+        row[3].split()[1]
+        for row in plan
+        if row[3].startswith(("MATERIALIZE ", "CO-ROUTINE "))
+    }
+    return [
+        row[3]
+        for row in plan
+        if row[3].startswith("SCAN ")
+        and "CONSTANT ROW" not in row[3]
+        and row[3].split()[1] not in subqueries
+        and ":M" not in row[3]
+        and not (limited and " INDEX " in row[3])
+    ]
+
+
+def check_query_plans():
+    """
+    لیست مشکلات را برمی‌گرداند؛ هر مورد (نام متد، کوئری، توضیح) است.
+    لیست خالی یعنی همه کوئری‌های پرتکرار از ایندکس استفاده می‌کنند.
+    """
+    problems = []
+    missing = _public_methods() - {name for name, _ in SAMPLE_CALLS}
+    for name in sorted(missing):
+        problems.append((name, "", "نمونه فراخوانی در SAMPLE_CALLS تعریف نشده است"))
+
+    temp_dir = tempfile.mkdtemp()
+    db_path = os.path.join(temp_dir, "query_plan_check.db")
+    db_manager = None
+    try:
+        run_migrations(db_path)
+        db_manager = DatabaseManager(db_path)
+        statements = collect_statements(db_manager)
+
+        explain_conn = sqlite3.connect(db_path)
+        try:
+            for method_name, sql_list in statements.items():
+                if method_name in FULL_SCAN_ALLOWED:
+                    continue
+                for sql in sql_list:
+                    if sql.lstrip().upper().startswith(_IGNORED_PREFIXES):
+                        continue
+                    if _FTS_SHADOW_TABLE.search(sql):
+                        continue
+                    for detail in full_scans(explain_conn, sql):
+                        problems.append((method_name, " ".join(sql.split()), detail))
+        finally:
+            explain_conn.close()
+    finally:
+        if db_manager:
+            db_manager.close()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return problems
+
+
+def main():
+    problems = check_query_plans()
+    if not problems:
+        print("تمام کوئری‌های پرتکرار از ایندکس استفاده می‌کنند.")
+        return 0
+    for method_name, sql, detail in problems:
+        print(f"[{method_name}] {detail}")
+        if sql:
+            print(f"    {sql}")
+    print(f"\n{len(problems)} مشکل در برنامه اجرای کوئری‌ها یافت شد.")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
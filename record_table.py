@@ -0,0 +1,298 @@
+# file: record_table.py
+from PySide6.QtCore import (
+    QAbstractTableModel,
+    QEvent,
+    QModelIndex,
+    QRect,
+    QSize,
+    Qt,
+    Signal,
+)
+from PySide6.QtGui import QColor, QCursor, QIcon, QPainter
+from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QHeaderView,
+    QStyle,
+    QStyledItemDelegate,
+    QTableView,
+    QToolTip,
+)
+
+from utils import resource_path
+
+_icon_cache = {}
+
+
+def cached_icon(name):
+    """آیکون assets/icons/<name> را فقط یک بار از دیسک می‌خواند."""
+    icon = _icon_cache.get(name)
+    if icon is None:
+        icon = QIcon(resource_path(f"assets/icons/{name}"))
+        _icon_cache[name] = icon
+    return icon
+
+
+class Column:
+    """
+    تعریف یک ستون جدول. value نام فیلد ردیف یا تابعی است که ردیف را گرفته و متن
+    نمایشی را برمی‌گرداند؛ foreground (تابع رنگ متن) و alignment اختیاری هستند.
+    """
+
+    def __init__(self, title, value=None, foreground=None, alignment=None):
+        self.title = title
+        self.value = value
+        self.foreground = foreground
+        self.alignment = alignment
+
+    def text(self, record):
+        if self.value is None:
+            return ""
+        if callable(self.value):
+            return self.value(record)
+        value = record[self.value]
+        return "" if value is None else str(value)
+
+
+class RowAction:
+    """یک دکمه ستون عملیات: آیکون، راهنما، تابع اجرا با ردیف و شرط نمایش اختیاری."""
+
+    def __init__(self, icon, tooltip, callback, visible=None):
+        self.icon = icon
+        self.tooltip = tooltip
+        self.callback = callback
+        self.visible = visible
+
+    def is_visible(self, record):
+        return self.visible is None or self.visible(record)
+
+
+class RecordTableModel(QAbstractTableModel):
+    """
+    مدل جدول صفحات لیست. فقط ردیف‌هایی که تا به حال به آن‌ها اسکرول شده در حافظه
+    هستند: صفحه بعد با canFetchMore/fetchMore و از fetch_page(cursor=...) (متدهای
+    get_*_page در DatabaseManager) خوانده می‌شود؛ اگر runner (DbRunner) داده شود این
+    خواندن روی ترد کارگر انجام می‌شود. row_background تابع اختیاری رنگ پس‌زمینه هر
+    ردیف است و نتیجه‌اش برای هر ردیف یک بار محاسبه می‌شود.
+    """
+
+    def __init__(
+        self, columns, fetch_page=None, row_background=None, runner=None, parent=None
+    ):
+        super().__init__(parent)
+        self.columns = columns
+        self.fetch_page = fetch_page
+        self.row_background = row_background
+        self.runner = runner
+        self._rows = []
+        self._next_cursor = None
+        self._backgrounds = {}
+        self._fetching = False
+        # با هر جایگزینی محتوا زیاد می‌شود تا صفحه‌ای که برای محتوای قبلی در راه است
+        # به جدول جدید اضافه نشود.
+        self._generation = 0
+
+    def show_result(self, result):
+        """
+        محتوای جدول را جایگزین می‌کند. result یا صفحه اول به شکل (ردیف‌ها، توکن صفحه
+        بعد) است یا لیست کامل نتایج جستجو.
+        """
+        rows, next_cursor = result if isinstance(result, tuple) else (result, None)
+        self.beginResetModel()
+        self._rows = list(rows)
+        self._next_cursor = next_cursor
+        self._backgrounds = {}
+        self._fetching = False
+        self._generation += 1
+        self.endResetModel()
+
+    def row_data(self, row):
+        """ردیف دیتابیس مربوط به یک ردیف جدول را برمی‌گرداند."""
+        return self._rows[row]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if (
+            orientation == Qt.Orientation.Horizontal
+            and role == Qt.ItemDataRole.DisplayRole
+        ):
+            return self.columns[section].title
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        record = self._rows[index.row()]
+        column = self.columns[index.column()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return column.text(record)
+        if role == Qt.ItemDataRole.ForegroundRole and column.foreground:
+            return column.foreground(record)
+        if role == Qt.ItemDataRole.TextAlignmentRole and column.alignment is not None:
+            return column.alignment
+        if role == Qt.ItemDataRole.BackgroundRole and self.row_background:
+            row = index.row()
+            if row not in self._backgrounds:
+                self._backgrounds[row] = self.row_background(record)
+            return self._backgrounds[row]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return (
+            not parent.isValid()
+            and self.fetch_page is not None
+            and self._next_cursor is not None
+            and not self._fetching
+        )
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        if self.runner is None:
+            self._append_page(
+                self._generation, self.fetch_page(cursor=self._next_cursor)
+            )
+            return
+        self._fetching = True
+        generation = self._generation
+        self.runner.submit(
+            self.fetch_page,
+            cursor=self._next_cursor,
+            on_result=lambda page: self._append_page(generation, page),
+            on_error=lambda error: self._fetch_failed(generation),
+        )
+
+    def _append_page(self, generation, page):
+        if generation != self._generation:
+            return
+        rows, self._next_cursor = page
+        self._fetching = False
+        if rows:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            self._rows.extend(rows)
+            self.endInsertRows()
+
+    def _fetch_failed(self, generation):
+        if generation == self._generation:
+            self._fetching = False
+            self._next_cursor = None
+
+
+class ActionDelegate(QStyledItemDelegate):
+    """
+    ستون عملیات را بدون ساخت ویجت و دکمه برای هر ردیف رسم می‌کند: آیکون‌های کش شده
+    نقاشی می‌شوند و کلیک روی هر آیکون callback همان RowAction را با ردیف صدا می‌زند.
+    """
+
+    ICON_SIZE = 18
+    BUTTON_SIZE = 28
+    SPACING = 5
+
+    def __init__(self, actions, parent=None):
+        super().__init__(parent)
+        self.actions = actions
+
+    def _buttons(self, option, index):
+        """لیست (RowAction، مستطیل دکمه) و ردیف دیتابیس را برای یک سلول برمی‌گرداند."""
+        record = index.model().row_data(index.row())
+        actions = [action for action in self.actions if action.is_visible(record)]
+        size, spacing = self.BUTTON_SIZE, self.SPACING
+        width = len(actions) * size + max(len(actions) - 1, 0) * spacing
+        left = option.rect.x() + (option.rect.width() - width) // 2
+        top = option.rect.y() + (option.rect.height() - size) // 2
+        rects = [
+            QRect(left + i * (size + spacing), top, size, size)
+            for i in range(len(actions))
+        ]
+        # مثل QHBoxLayout در چیدمان راست به چپ، اولین دکمه سمت راست است.
+        if option.direction == Qt.LayoutDirection.RightToLeft:
+            rects.reverse()
+        return record, list(zip(actions, rects))
+
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        _, buttons = self._buttons(option, index)
+        hover_pos = None
+        if (
+            option.widget is not None
+            and option.state & QStyle.StateFlag.State_MouseOver
+        ):
+            hover_pos = option.widget.mapFromGlobal(QCursor.pos())
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        for action, rect in buttons:
+            if hover_pos is not None and rect.contains(hover_pos):
+                hover = QColor(option.palette.highlight().color())
+                hover.setAlpha(60)
+                painter.setPen(Qt.PenStyle.NoPen)
+                painter.setBrush(hover)
+                painter.drawRoundedRect(rect, 4, 4)
+            icon_rect = QRect(0, 0, self.ICON_SIZE, self.ICON_SIZE)
+            icon_rect.moveCenter(rect.center())
+            cached_icon(action.icon).paint(painter, icon_rect)
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        count = len(self.actions)
+        width = count * self.BUTTON_SIZE + (count + 1) * self.SPACING
+        return QSize(width, self.BUTTON_SIZE + 2 * self.SPACING)
+
+    def editorEvent(self, event, model, option, index):
+        if (
+            event.type() == QEvent.Type.MouseButtonRelease
+            and event.button() == Qt.MouseButton.LeftButton
+        ):
+            record, buttons = self._buttons(option, index)
+            for action, rect in buttons:
+                if rect.contains(event.position().toPoint()):
+                    action.callback(record)
+                    return True
+        return super().editorEvent(event, model, option, index)
+
+    def helpEvent(self, event, view, option, index):
+        if event.type() == QEvent.Type.ToolTip:
+            _, buttons = self._buttons(option, index)
+            for action, rect in buttons:
+                if rect.contains(event.pos()):
+                    QToolTip.showText(event.globalPos(), action.tooltip, view)
+                    return True
+            QToolTip.hideText()
+            return True
+        return super().helpEvent(event, view, option, index)
+
+
+class RecordTableView(QTableView):
+    """
+    جدول مشترک صفحات لیست با تنظیمات یکسان (انتخاب ردیف، راست به چپ، بدون ویرایش).
+    دوبار کلیک روی هر ستونی جز ستون عملیات record_double_clicked را با ردیف می‌فرستد.
+    """
+
+    record_double_clicked = Signal(object)
+
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.setModel(model)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.setLayoutDirection(Qt.LayoutDirection.RightToLeft)
+        self.setMouseTracking(True)
+        self.verticalHeader().setVisible(False)
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.doubleClicked.connect(self._on_double_clicked)
+
+    def set_actions(self, column, actions):
+        """ستون column را به ستون عملیات با دکمه‌های actions تبدیل می‌کند."""
+        self.setItemDelegateForColumn(column, ActionDelegate(actions, self))
+        self.horizontalHeader().setSectionResizeMode(
+            column, QHeaderView.ResizeMode.ResizeToContents
+        )
+
+    def _on_double_clicked(self, index):
+        if isinstance(self.itemDelegateForColumn(index.column()), ActionDelegate):
+            return
+        self.record_double_clicked.emit(self.model().row_data(index.row()))
@@ -0,0 +1,192 @@
+# file: restore_engine.py
+"""
+بازیابی امن دیتابیس از نسخه پشتیبان. فایل انتخاب شده هیچ‌وقت مستقیم روی دیتابیس
+زنده کپی نمی‌شود:
+    ۱. فایل (یا نسخه فشرده .db.gz پشتیبان‌گیری خودکار) در کنار دیتابیس زنده
+       کپی می‌شود (staging).
+    ۲. نسخه کپی شده فقط‌خواندنی باز شده و با PRAGMA quick_check، نسخه ساختار
+       (user_version) و وجود جدول‌های اصلی بررسی می‌شود؛ نسخه‌های قدیمی‌تر با
+       موتور مهاجرت به‌روز می‌شوند.
+    ۳. روی ترد اصلی، اتصال‌های استخر بسته شده، یک کپی از دیتابیس فعلی نگه داشته
+       می‌شود و فایل آماده با os.replace به صورت اتمیک جایگزین دیتابیس می‌شود.
+هر خطایی پیش از مرحله ۳ فقط فایل staging را حذف می‌کند و دیتابیس زنده دست نمی‌خورد.
+مراحل ۱ و ۲ روی ترد کارگر و مرحله ۳ (که کوتاه است) روی ترد اصلی اجرا می‌شود.
+"""
+import gzip
+import os
+import pathlib
+import shutil
+import sqlite3
+
+from backup_engine import check_database_integrity
+from backup_scheduler import ARCHIVE_SUFFIX, verify_archive_checksum
+from db_pool import close_all_pools
+from db_updater import get_schema_version, latest_version, run_migrations
+
+STAGING_SUFFIX = ".restore"
+PRE_RESTORE_SUFFIX = ".pre-restore"
+COPY_CHUNK_SIZE = 1024 * 1024
+# جدول‌هایی که هر دیتابیس حساب‌یار (حتی پیش از user_version) دارد.
+REQUIRED_TABLES = ("customers", "products", "invoices", "invoice_items")
+
+
+class RestoreError(Exception):
+    pass
+
+
+class RestoreCancelled(Exception):
+    pass
+
+
+def staging_path(db_path):
+    """مسیر فایل staging بازیابی در کنار دیتابیس زنده (روی همان دیسک، برای os.replace)."""
+    return db_path + STAGING_SUFFIX
+
+
+def pre_restore_path(db_path):
+    return db_path + PRE_RESTORE_SUFFIX
+
+
+def _stage_file(candidate_path, target_path, progress=None, is_cancelled=None):
+    """فایل پشتیبان (در صورت فشرده بودن، پس از باز کردن) در target_path کپی می‌شود."""
+    total = max(os.path.getsize(candidate_path), 1)
+    temp_path = target_path + ".part"
+    try:
+        with open(candidate_path, "rb") as raw, open(temp_path, "wb") as target:
+            if candidate_path.endswith(ARCHIVE_SUFFIX):
+                source = gzip.GzipFile(fileobj=raw, mode="rb")
+            else:
+                source = raw
+            while True:
+                if is_cancelled is not None and is_cancelled():
+                    raise RestoreCancelled()
+                chunk = source.read(COPY_CHUNK_SIZE)
+                if not chunk:
+                    break
+                target.write(chunk)
+                if progress is not None:
+                    # پیشرفت بر حسب کیلوبایت فایل ورودی (بایت‌ها در int سیگنال جا نمی‌شوند).
+                    progress(raw.tell() // 1024, total // 1024)
+            target.flush()
+            os.fsync(target.fileno())
+        os.replace(temp_path, target_path)
+    except (OSError, EOFError, gzip.BadGzipFile) as e:
+        raise RestoreError(f"خواندن فایل پشتیبان ناموفق بود: {e}")
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def validate_database_file(path):
+    """
+    فایل را فقط‌خواندنی باز کرده و quick_check، نسخه ساختار و جدول‌های اصلی را بررسی
+    می‌کند. نسخه ساختار فایل را برمی‌گرداند یا RestoreError می‌دهد.
+    """
+    uri = pathlib.Path(path).absolute().as_uri() + "?mode=ro"
+    try:
+        conn = sqlite3.connect(uri, uri=True)
+        try:
+            problems = [row[0] for row in conn.execute("PRAGMA quick_check")]
+            version = get_schema_version(conn)
+            tables = {
+                row[0]
+                for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table'"
+                )
+            }
+        finally:
+            conn.close()
+    except sqlite3.DatabaseError as e:
+        raise RestoreError(f"فایل انتخاب شده یک دیتابیس معتبر نیست: {e}")
+
+    if problems != ["ok"]:
+        raise RestoreError("فایل پشتیبان آسیب دیده است:\n" + "\n".join(problems[:10]))
+    if version > latest_version():
+        raise RestoreError(
+            f"این نسخه پشتیبان با نسخه جدیدتری از برنامه ساخته شده است "
+            f"(نسخه ساختار {version}، نسخه این برنامه {latest_version()})."
+        )
+    missing = [table for table in REQUIRED_TABLES if table not in tables]
+    if missing:
+        raise RestoreError(
+            "فایل انتخاب شده دیتابیس حساب‌یار نیست (جدول‌های "
+            + "، ".join(missing)
+            + " وجود ندارند)."
+        )
+    return version
+
+
+def prepare_restore(candidate_path, db_path, progress=None, is_cancelled=None):
+    """
+    مراحل ۱ و ۲ بازیابی (روی ترد کارگر). اگر candidate_path خود فایل staging باشد
+    (مثلاً نسخه افزایشی بازسازی شده) کپی دوباره انجام نمی‌شود.
+    دیکشنری staged_path، source و schema_version را برمی‌گرداند.
+    """
+    staged = staging_path(db_path)
+    try:
+        if os.path.abspath(candidate_path) != os.path.abspath(staged):
+            if verify_archive_checksum(candidate_path) is False:
+                raise RestoreError(
+                    "checksum فایل پشتیبان با فایل .sha256 آن مطابقت ندارد."
+                )
+            _stage_file(candidate_path, staged, progress, is_cancelled)
+
+        # نسخه staging یک فایل مستقل و بدون -wal است؛ اگر فایل اصلی در حالت WAL بوده
+        # باشد، با این کار باز کردن فقط‌خواندنی آن فایل‌های جانبی نمی‌سازد.
+        try:
+            conn = sqlite3.connect(staged)
+            try:
+                conn.execute("PRAGMA journal_mode = DELETE").fetchone()
+            finally:
+                conn.close()
+        except sqlite3.DatabaseError as e:
+            raise RestoreError(f"فایل انتخاب شده یک دیتابیس معتبر نیست: {e}")
+
+        version = validate_database_file(staged)
+        if version < latest_version():
+            if run_migrations(staged) < latest_version():
+                raise RestoreError("به‌روزرسانی ساختار نسخه پشتیبان ناموفق بود.")
+            problems = check_database_integrity(staged, quick=True)
+            if problems:
+                raise RestoreError(
+                    "بررسی نسخه به‌روز شده ناموفق بود:\n" + "\n".join(problems[:10])
+                )
+    except BaseException:
+        for path in (staged, staged + "-journal"):
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    return {"staged_path": staged, "source": candidate_path, "schema_version": version}
+
+
+def swap_in_database(staged_path, db_path):
+    """
+    مرحله ۳ بازیابی (روی ترد اصلی و وقتی هیچ کار دیتابیسی روی تردهای کارگر در حال
+    اجرا نیست). دیتابیس فعلی در مسیر .pre-restore نگه داشته و فایل آماده جایگزین آن
+    می‌شود. اتصال‌های استخر در اولین استفاده دوباره باز می‌شوند. مسیر کپی دیتابیس
+    قبلی را برمی‌گرداند.
+    """
+    close_all_pools()
+    safety_path = pre_restore_path(db_path)
+    if os.path.exists(db_path):
+        # پس از بسته شدن همه اتصال‌ها، محتوای WAL باید کامل به فایل اصلی منتقل شده باشد؛
+        # WAL قدیمی روی فایل جدید اعمال می‌شد و آن را خراب می‌کرد.
+        conn = sqlite3.connect(db_path)
+        try:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        finally:
+            conn.close()
+        wal_path = db_path + "-wal"
+        if os.path.exists(wal_path) and os.path.getsize(wal_path) > 0:
+            raise RestoreError(
+                "دیتابیس هنوز توسط برنامه دیگری در حال استفاده است. "
+                "لطفاً پنجره‌های دیگر حساب‌یار را ببندید و دوباره تلاش کنید."
+            )
+        shutil.copyfile(db_path, safety_path)
+
+    os.replace(staged_path, db_path)
+    for suffix in ("-wal", "-shm"):
+        path = db_path + suffix
+        if os.path.exists(path):
+            os.remove(path)
+    return safety_path
@@ -0,0 +1,66 @@
+# file: search_controller.py
+from PySide6.QtCore import QObject, QTimer
+
+# فاصله زمانی پس از آخرین کلید تا اجرای جستجو (میلی‌ثانیه).
+SEARCH_DELAY_MS = 250
+
+
+class SearchController(QObject):
+    """
+    جستجوی هم‌زمان با تایپ برای صفحات لیست. تغییرات متن با تاخیر SEARCH_DELAY_MS
+    تجمیع می‌شوند، کوئری با DbRunner صفحه روی تردهای کارگر اجرا می‌شود و فقط نتیجه
+    آخرین متن به apply(result) (روی ترد اصلی) می‌رسد؛ هر تغییر متن کارهای قبلی صفحه
+    را لغو می‌کند. result همان خروجی search یا load_all است (مثلاً صفحه اول یک متد
+    get_*_page).
+
+    search(text) و load_all() روی ترد کارگر اجرا می‌شوند و نباید به ویجت‌ها دست بزنند.
+    """
+
+    def __init__(
+        self,
+        search_input,
+        runner,
+        search,
+        load_all,
+        apply,
+        parent=None,
+        delay_ms=SEARCH_DELAY_MS,
+    ):
+        super().__init__(parent)
+        self.search_input = search_input
+        self.runner = runner
+        self.search = search
+        self.load_all = load_all
+        self.apply = apply
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self._start)
+
+        search_input.textChanged.connect(self._on_text_changed)
+
+    def refresh(self):
+        """بدون تاخیر، لیست را برای متن فعلی دوباره بارگذاری می‌کند."""
+        self._timer.stop()
+        self._start()
+
+    def reset(self):
+        """متن جستجو را پاک کرده و لیست کامل را بارگذاری می‌کند."""
+        self.search_input.blockSignals(True)
+        self.search_input.clear()
+        self.search_input.blockSignals(False)
+        self.refresh()
+
+    def _on_text_changed(self):
+        # نتیجه‌ای که برای متن قبلی در راه است از همین لحظه نامعتبر است.
+        self.runner.cancel()
+        self._timer.start()
+
+    def _start(self):
+        self.runner.cancel()
+        text = self.search_input.text().strip()
+        if text:
+            self.runner.submit(self.search, text, on_result=self.apply)
+        else:
+            self.runner.submit(self.load_all, on_result=self.apply)
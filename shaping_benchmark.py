@@ -0,0 +1,158 @@
+# file: shaping_benchmark.py
+"""
+ریزسنجه هزینه شکل‌دهی متن فارسی (arabic_reshaper و bidi) و تبدیل ارقام در ساخت PDF
+یک فاکتور نمونه. متن‌هایی که InvoiceRenderer.build_story برای یک فاکتور شکل می‌دهد
+ضبط شده و دو حالت مقایسه می‌شوند:
+
+- قبل: هر متن، از جمله عنوان‌های ثابت، بدون کش شکل‌دهی می‌شود و to_persian_digits
+  برای هر فراخوانی جدول تبدیل ارقام را از نو می‌سازد.
+- بعد: عنوان‌های ثابت از پیش شکل گرفته‌اند (LABELS و ITEMS_HEADER)، بقیه متن‌ها از
+  کش LRU ماژول text_shaping خوانده می‌شوند و جدول ارقام یک بار ساخته شده است.
+
+اجرا: python shaping_benchmark.py [تعداد اقلام فاکتور]
+"""
+import sys
+import time
+
+import pdf_generator
+from text_shaping import cache_info, shape, shape_uncached
+from utils import to_persian_digits
+
+REPEAT = 200
+ROUNDS = 5
+# شرح کالاها مثل یک فروشگاه واقعی بین فاکتورها تکرار می‌شوند.
+SAMPLE_PRODUCTS = [f"کالای نمونه شماره {i} - بسته‌بندی ویژه" for i in range(15)]
+
+
+def _sample_invoice(item_count):
+    details = {
+        "id": 12,
+        "issue_date": "1404/05/01",
+        "customer_name": "شرکت بازرگانی نمونه",
+        "economic_code": "411111111111",
+        "national_id": "10101010101",
+        "address": "تهران، خیابان آزادی، پلاک ۱۰",
+        "phone": "02155555555",
+        "postal_code": "1234567890",
+        "total_amount": 12500000,
+        "amount_paid": 5000000,
+        "status": "کسری",
+        "payment_method": "نقدی",
+        "notes": "تحویل در محل مشتری",
+    }
+    items = [
+        {
+            "description": SAMPLE_PRODUCTS[i % len(SAMPLE_PRODUCTS)],
+            "quantity": i % 5 + 1,
+            "unit_price": 125000 + i * 1000,
+            "discount_percent": 5,
+            "tax_percent": 10,
+            "extra_costs": (
+                [{"name": "هزینه حمل", "amount": 20000}] if i % 3 == 0 else []
+            ),
+        }
+        for i in range(item_count)
+    ]
+    return details, items
+
+
+class _RecordingLabels(dict):
+    def __init__(self, labels, used):
+        super().__init__(labels)
+        self.used = used
+
+    def __getitem__(self, key):
+        self.used.append(key)
+        return super().__getitem__(key)
+
+
+def record_texts(renderer, details, items):
+    """
+    build_story را یک بار اجرا کرده و متن‌های شکل‌داده شده، عنوان‌های ثابت استفاده شده
+    و ورودی‌های to_persian_digits را برمی‌گرداند.
+    """
+    shaped, labels, digits = [], [], []
+    originals = (
+        pdf_generator.shape,
+        pdf_generator.to_persian_digits,
+        pdf_generator.LABELS,
+    )
+
+    def recording_shape(text):
+        shaped.append(text)
+        return originals[0](text)
+
+    def recording_digits(text):
+        digits.append(text)
+        return originals[1](text)
+
+    pdf_generator.shape = recording_shape
+    pdf_generator.to_persian_digits = recording_digits
+    pdf_generator.LABELS = _RecordingLabels(originals[2], labels)
+    try:
+        renderer.build_story(details, items)
+    finally:
+        (
+            pdf_generator.shape,
+            pdf_generator.to_persian_digits,
+            pdf_generator.LABELS,
+        ) = originals
+    return shaped, labels, digits
+
+
+def _old_to_persian_digits(text):
+    text = "" if text is None else str(text)
+    return text.translate(str.maketrans("0123456789", "۰۱۲۳۴۵۶۷۸۹"))
+
+
+def _best_per_call_us(fn):
+    best = None
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            fn()
+        elapsed = (time.perf_counter() - start) / REPEAT * 1_000_000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    item_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    renderer = pdf_generator.InvoiceRenderer({"name": "فروشگاه نمونه"})
+    details, items = _sample_invoice(item_count)
+    shaped, labels, digits = record_texts(renderer, details, items)
+    # در حالت قبل، عنوان‌های ثابت هم برای هر فاکتور دوباره شکل‌دهی می‌شدند.
+    before_texts = shaped + labels + pdf_generator._ITEMS_HEADER_TEXTS
+
+    def before():
+        for text in before_texts:
+            shape_uncached(text)
+        for text in digits:
+            _old_to_persian_digits(text)
+
+    def after():
+        for text in shaped:
+            shape(text)
+        for text in digits:
+            to_persian_digits(text)
+
+    after()  # گرم کردن کش، مثل فاکتور دوم به بعد یک خروجی گروهی
+    before_us = _best_per_call_us(before)
+    after_us = _best_per_call_us(after)
+    story_us = _best_per_call_us(lambda: renderer.build_story(details, items))
+
+    print(f"فاکتور نمونه با {item_count} قلم:")
+    print(
+        f"  متن‌های شکل‌دهی شده: {len(before_texts)} (قبل) / {len(shaped)} (بعد)، "
+        f"تبدیل ارقام: {len(digits)}"
+    )
+    print(f"  هزینه شکل‌دهی هر فاکتور قبل: {before_us:10.1f} µs")
+    print(f"  هزینه شکل‌دهی هر فاکتور بعد: {after_us:10.1f} µs")
+    print(f"  بهبود: {before_us / after_us:.1f} برابر")
+    print(f"  ساخت کامل story فاکتور (با کش): {story_us:10.1f} µs")
+    print(f"  {cache_info()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,11 +9,25 @@ class _SignalBus(QObject):
     """
 
     customer_saved = Signal(int)
+    # مشتری حذف شده است (فاکتورهای او هم با ON DELETE CASCADE حذف شده‌اند).
+    customer_deleted = Signal(int)
     product_saved = Signal()
     invoice_saved = Signal()
     expense_saved = Signal()
     supplier_saved = Signal()
     purchase_invoice_saved = Signal()
+    # چکی ثبت، ویرایش یا حذف شده است.
+    cheque_saved = Signal()
+    # اطلاعات شرکت (فروشنده و لوگوی فاکتور) در تنظیمات تغییر کرده است.
+    company_settings_saved = Signal()
+    # درخواست پشتیبان‌گیری فشرده فوری، شروع پشتیبان‌گیری خودکار و اعلام نتیجه آن
+    # (مسیر فایل یا متن خطا).
+    backup_requested = Signal()
+    backup_started = Signal()
+    backup_completed = Signal(str)
+    backup_failed = Signal(str)
+    # دیتابیس از نسخه پشتیبان بازیابی شده است؛ تمام صفحه‌ها باید اطلاعات را دوباره بخوانند.
+    database_restored = Signal()
 
 
 signal_bus = _SignalBus()
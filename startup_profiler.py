@@ -0,0 +1,233 @@
+# file: startup_profiler.py
+"""
+پروفایل زمان شروع برنامه. با آرگومان --profile-startup یا متغیر محیطی
+HESABYAR_PROFILE_STARTUP=1 فعال می‌شود: زمان import هر ماژول (مثل خروجی
+python -X importtime، به تفکیک زمان خود ماژول و زمان تجمعی با زیرماژول‌ها) و زمان
+مراحل اصلی شروع برنامه ثبت شده و در startup_profile.json و خروجی استاندارد گزارش
+می‌شود. این ماژول باید پیش از هر import دیگری در main.py فعال شود.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+PROFILE_FLAG = "--profile-startup"
+PROFILE_ENV = "HESABYAR_PROFILE_STARTUP"
+REPORT_FILE_NAME = "startup_profile.json"
+# تعداد ماژول‌های کندی که در خلاصه چاپی نمایش داده می‌شوند.
+SUMMARY_TOP_IMPORTS = 15
+
+_profiler = None
+
+
+class _TimedLoader:
+    """loader اصلی ماژول را می‌پوشاند تا زمان ساخت و اجرای ماژول اندازه‌گیری شود."""
+
+    def __init__(self, loader, profiler):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        # ماژول‌های C (مثل PySide6 و sqlite3) بیشتر زمانشان را اینجا صرف می‌کنند.
+        with self._profiler.timing(spec.name):
+            return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        try:
+            with self._profiler.timing(module.__name__):
+                self._loader.exec_module(module)
+        finally:
+            # پس از بارگذاری، loader اصلی به ماژول برگردانده می‌شود.
+            module.__loader__ = self._loader
+            if getattr(module, "__spec__", None) is not None:
+                module.__spec__.loader = self._loader
+
+
+class _ImportTimer:
+    """finder ابتدای sys.meta_path که loader ماژول‌های تازه را با _TimedLoader می‌پوشاند."""
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self:
+                continue
+            find_spec = getattr(finder, "find_spec", None)
+            if find_spec is None:
+                continue
+            spec = find_spec(name, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, self.profiler)
+            return spec
+        return None
+
+
+class StartupProfiler:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.imports = {}
+        self.import_order = []
+        self.phases = []
+        self.marks = []
+        self._stack = []
+        # فقط importهای ترد اصلی ثبت می‌شوند تا پشته زمان‌ها بین تردها قاطی نشود.
+        self._thread_id = threading.get_ident()
+        self._finder = _ImportTimer(self)
+
+    def install(self):
+        sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self):
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+
+    def _elapsed_ms(self, start):
+        return round((time.perf_counter() - start) * 1000, 3)
+
+    @contextmanager
+    def timing(self, module_name):
+        # مثل -X importtime: زمان زیرماژول‌ها از زمان «خود» ماژول والد کم می‌شود.
+        if threading.get_ident() != self._thread_id:
+            yield
+            return
+        frame = {"children_us": 0}
+        self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            cumulative = int((time.perf_counter() - start) * 1_000_000)
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1]["children_us"] += cumulative
+            entry = self.imports.get(module_name)
+            if entry is None:
+                entry = {
+                    "module": module_name,
+                    "self_us": 0,
+                    "cumulative_us": 0,
+                    "depth": len(self._stack),
+                }
+                self.imports[module_name] = entry
+                self.import_order.append(module_name)
+            entry["self_us"] += cumulative - frame["children_us"]
+            entry["cumulative_us"] += cumulative
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append(
+                {
+                    "phase": name,
+                    "started_ms": round((start - self.started) * 1000, 3),
+                    "duration_ms": self._elapsed_ms(start),
+                }
+            )
+
+    def mark(self, name):
+        self.marks.append({"mark": name, "at_ms": self._elapsed_ms(self.started)})
+
+    def report(self):
+        imports = [self.imports[name] for name in self.import_order]
+        top_level_us = sum(
+            entry["cumulative_us"] for entry in imports if entry["depth"] == 0
+        )
+        return {
+            "python": sys.version.split()[0],
+            "total_ms": self._elapsed_ms(self.started),
+            "imports_total_ms": round(top_level_us / 1000, 3),
+            "import_count": len(imports),
+            "phases": self.phases,
+            "marks": self.marks,
+            "imports": imports,
+        }
+
+
+def enable_if_requested(argv):
+    """
+    اگر پروفایل درخواست شده باشد آن را فعال کرده و آرگومان --profile-startup را از
+    argv حذف می‌کند (تا به QApplication نرسد).
+    """
+    global _profiler
+    requested = PROFILE_FLAG in argv or os.environ.get(PROFILE_ENV, "") not in ("", "0")
+    while PROFILE_FLAG in argv:
+        argv.remove(PROFILE_FLAG)
+    if requested and _profiler is None:
+        _profiler = StartupProfiler()
+        _profiler.install()
+    return _profiler is not None
+
+
+def is_enabled():
+    return _profiler is not None
+
+
+@contextmanager
+def phase(name):
+    """زمان یک مرحله شروع برنامه را ثبت می‌کند؛ بدون پروفایل فعال هیچ کاری نمی‌کند."""
+    if _profiler is None:
+        yield
+        return
+    with _profiler.phase(name):
+        yield
+
+
+def mark(name):
+    """لحظه‌ای مثل نمایش اولین پنجره را (نسبت به شروع پروفایل) ثبت می‌کند."""
+    if _profiler is not None:
+        _profiler.mark(name)
+
+
+def finish(report_path=None):
+    """
+    پروفایل را متوقف کرده، گزارش JSON را ذخیره و خلاصه آن را چاپ می‌کند.
+    مسیر فایل گزارش را برمی‌گرداند (یا None اگر پروفایل فعال نبوده است).
+    """
+    global _profiler
+    if _profiler is None:
+        return None
+    profiler, _profiler = _profiler, None
+    profiler.uninstall()
+    report = profiler.report()
+
+    if report_path is None:
+        from utils import get_app_data_path
+
+        report_path = get_app_data_path(REPORT_FILE_NAME)
+    try:
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        print(f"خطا در ذخیره گزارش پروفایل شروع برنامه: {e}")
+        report_path = None
+
+    print(f"--- پروفایل شروع برنامه ({report['total_ms']:.1f} ms) ---")
+    print(
+        f"import ماژول‌ها: {report['imports_total_ms']:.1f} ms "
+        f"({report['import_count']} ماژول)"
+    )
+    for item in report["phases"]:
+        print(f"  {item['phase']:<24} {item['duration_ms']:>10.1f} ms")
+    for item in report["marks"]:
+        print(f"  [{item['mark']}] در {item['at_ms']:.1f} ms")
+    print("کندترین importها (تجمعی | خود ماژول، میکروثانیه):")
+    slowest = sorted(report["imports"], key=lambda e: e["cumulative_us"], reverse=True)
+    for entry in slowest[:SUMMARY_TOP_IMPORTS]:
+        print(
+            f"  {entry['cumulative_us']:>9} | {entry['self_us']:>9} | "
+            f"{'  ' * entry['depth']}{entry['module']}"
+        )
+    if report_path:
+        print(f"گزارش کامل: {report_path}")
+    return report_path
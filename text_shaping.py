@@ -0,0 +1,44 @@
+# file: text_shaping.py
+"""
+شکل‌دهی متن فارسی برای خروجی‌هایی مثل PDF که خودشان از راست‌به‌چپ پشتیبانی نمی‌کنند:
+حروف با arabic_reshaper به شکل چسبیده درمی‌آیند و ترتیب نمایش با الگوریتم bidi تعیین
+می‌شود. این کار برای هر رشته چند ده میکروثانیه طول می‌کشد و عنوان‌های ثابت فاکتورها
+و گزارش‌ها بارها تکرار می‌شوند، پس نتیجه در یک کش LRU با اندازه محدود نگه داشته می‌شود.
+
+تمام خروجی‌های PDF و گزارش‌ها باید از shape استفاده کنند تا کش مشترک باشد.
+"""
+from functools import lru_cache
+
+import arabic_reshaper
+from bidi.algorithm import get_display
+
+# حداکثر تعداد رشته‌های شکل‌داده شده در کش (عنوان‌ها، نام مشتریان، شرح کالاها و...).
+SHAPING_CACHE_SIZE = 4096
+
+
+def shape_uncached(text):
+    """شکل‌دهی بدون کش؛ برای مقایسه در shaping_benchmark.py."""
+    return get_display(arabic_reshaper.reshape(str(text)))
+
+
+@lru_cache(maxsize=SHAPING_CACHE_SIZE)
+def _shape_str(text):
+    return get_display(arabic_reshaper.reshape(text))
+
+
+def shape(text):
+    """متن (یا هر مقدار دیگری پس از تبدیل به رشته) را برای چاپ راست‌به‌چپ شکل می‌دهد."""
+    return _shape_str(str(text))
+
+
+def shape_all(texts):
+    """لیست متن‌های ثابت را یک بار (هنگام import ماژول استفاده‌کننده) شکل می‌دهد."""
+    return [shape(text) for text in texts]
+
+
+def cache_info():
+    return _shape_str.cache_info()
+
+
+def clear_cache():
+    _shape_str.cache_clear()
@@ -32,3 +32,65 @@ def get_app_data_path(file_name):
         os.makedirs(app_data_dir)
 
     return os.path.join(app_data_dir, file_name)
+
+
+_DIGITS_TO_LATIN = str.maketrans("۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩", "01234567890123456789")
+
+
+def to_latin_digits(text):
+    """ارقام فارسی و عربی متن را به ارقام لاتین تبدیل می‌کند."""
+    return str(text).translate(_DIGITS_TO_LATIN)
+
+
+_DIGITS_TO_PERSIAN = str.maketrans("0123456789", "۰۱۲۳۴۵۶۷۸۹")
+
+
+def to_persian_digits(text):
+    """ارقام لاتین متن را فارسی می‌کند؛ None به رشته خالی تبدیل می‌شود."""
+    return ("" if text is None else str(text)).translate(_DIGITS_TO_PERSIAN)
+
+
+# نویسه‌هایی که در جستجو یکسان فرض می‌شوند: ی/ک عربی، نیم‌فاصله (حذف) و ارقام فارسی و عربی.
+SEARCH_CHAR_MAP = {"ي": "ی", "ى": "ی", "ك": "ک", "\u200c": ""}
+SEARCH_CHAR_MAP.update(
+    {
+        persian: latin
+        for persian, latin in zip("۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩", "01234567890123456789")
+    }
+)
+_SEARCH_TRANSLATION = str.maketrans(SEARCH_CHAR_MAP)
+
+
+def normalize_search_text(text):
+    """متن را برای نمایه جستجو یکسان‌سازی می‌کند (هم هنگام ذخیره و هم هنگام جستجو)."""
+    return str(text or "").translate(_SEARCH_TRANSLATION)
+
+
+def date_key(value):
+    """
+    تاریخ شمسی را به عدد صحیح yyyymmdd تبدیل می‌کند تا بازه‌ها و مرتب‌سازی عددی باشند.
+    تاریخ بدون صفر ('1403/1/5')، با خط تیره، ارقام فارسی یا شیء jdatetime.date هم پذیرفته می‌شود.
+    برای ورودی نامعتبر None برمی‌گرداند.
+    """
+    if value is None:
+        return None
+    if hasattr(value, "year"):
+        return value.year * 10000 + value.month * 100 + value.day
+    parts = to_latin_digits(value).strip().replace("-", "/").split("/")
+    if len(parts) != 3:
+        return None
+    try:
+        year, month, day = (int(part) for part in parts)
+    except ValueError:
+        return None
+    if not (1 <= month <= 12 and 1 <= day <= 31):
+        return None
+    return year * 10000 + month * 100 + day
+
+
+def normalize_date(value):
+    """تاریخ را به شکل استاندارد 'YYYY/MM/DD' برمی‌گرداند؛ برای ورودی نامعتبر None."""
+    key = date_key(value)
+    if key is None:
+        return None
+    return f"{key // 10000:04d}/{key // 100 % 100:02d}/{key % 100:02d}"